@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks of the hot paths of both games, with fixed seeds, hands and
+patterns so that two runs time the same work.
+
+Every benchmark is run repeat times, each run calling it as many times as
+needed to last at least MIN_RUN_TIME, and the best time per call is kept.
+The benchmarks doing a known number of items of work per call, like the
+moves generated on the mid-game boards, also report the items per second.
+The results are printed as JSON, or written to a file with --output, and
+a table is printed to stderr. With --compare the results are compared
+against a previous JSON output and the benchmarks slower than the baseline
+by more than the threshold are reported as regressions, making the exit
+status 1.
+
+Run it from the terminal-games directory:
+
+    python benchmark.py --output baseline.json
+    python benchmark.py --compare baseline.json --threshold 0.25
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+from hangman import main as hangman
+from scrabble import board as scrabble_board
+from scrabble import main as scrabble
+from scrabble.dawg import Dawg, dawg_path, load_dawg
+from scrabble.hand import Hand
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SEED = 42
+MIN_RUN_TIME = 0.05
+REPEAT = 5
+
+# Mid-game boards are reached by the computer playing this many turns
+BOARD_GAMES = 4
+BOARD_TURNS = 8
+
+# (word, hand) pairs, the hands have exactly the letters of the words
+SCRABBLE_HITS = [
+    ("hello", "hello*"),
+    ("rapture", "rapture"),
+    ("quail", "quail*"),
+    ("characters", "characters"),
+]
+SCRABBLE_MISSES = [
+    ("helo", "helo*"),
+    ("rapchute", "rapchute"),
+    ("xyzzy", "xyzzy"),
+    ("chayote", "cayote*"),
+]
+SCRABBLE_WILDCARDS = [
+    ("h*ney", "h*ney"),
+    ("c*ws", "c*ws"),
+    ("e*m", "e*m"),
+    ("qu*ll", "qu*ll"),
+]
+
+HANGMAN_PATTERNS = ["a_ _ le", "_ _ _ _ _ t", "g_ _ p_ _ _ _ _ t", "_ _ _ _ _ _ _ _ "]
+HANGMAN_PAIRS = [
+    ("a_ple", "apple"),
+    ("a_ple", "ample"),
+    ("____t", "tacit"),
+    ("g__p_f__it", "grapefruit"),
+    ("te_t", "tact"),
+]
+
+
+def quiet(func: Callable) -> Callable:
+    """
+    Returns func with its output to stdout discarded.
+    """
+
+    def wrapper(*args, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def scrabble_hands(hand_size: int, count: int = 5) -> List[Hand]:
+    rng = random.Random(f"{SEED}:{hand_size}")
+    return [scrabble.deal_hand(hand_size, rng) for _ in range(count)]
+
+
+def board_positions(dawg: Dawg) -> List[Tuple]:
+    """
+    Returns (board, rack) of mid-game positions, reached by the computer
+    playing against itself from seeded bags.
+    """
+    positions = []
+    for game_number in range(BOARD_GAMES):
+        rng = random.Random(f"{SEED}:board:{game_number}")
+        game = scrabble_board.BoardGame(dawg, rng=rng)
+        for _ in range(BOARD_TURNS):
+            move = scrabble_board.comp_choose_board_move(game.board, game.rack, dawg)
+            if move is None:
+                game.exchange()
+            else:
+                game.play_move(move)
+        positions.append((game.board, game.rack))
+    return positions
+
+
+def scrabble_benchmarks() -> Dict[str, Callable[[], object]]:
+    scrabble.WORDS_FILENAME = os.path.join(HERE, "scrabble", "words.json")
+    load_words = quiet(scrabble.load_words)
+    word_dict = load_words()
+    # Build the indexes on first use outside of the timed calls
+    scrabble.comp_choose_word(scrabble_hands(7)[0], word_dict, 7)
+
+    def valid_words(pairs: List[Tuple[str, str]]) -> Callable[[], None]:
+        hands = [(word, Hand(letters)) for word, letters in pairs]
+        return lambda: [
+            scrabble.is_valid_word(word, hand, word_dict) for word, hand in hands
+        ]
+
+    def choose_words(hand_size: int) -> Callable[[], None]:
+        hands = scrabble_hands(hand_size)
+
+        def run():
+            for hand in hands:
+                # Time the search, not the cache of moves
+                scrabble.MOVE_CACHE.clear()
+                scrabble.comp_choose_word(hand, word_dict, len(hand))
+
+        return run
+
+    def play_hands() -> None:
+        for hand in scrabble_hands(scrabble.HAND_SIZE):
+            scrabble.MOVE_CACHE.clear()
+            comp_play_hand(hand, word_dict)
+
+    def plan_hands(hand_size: int) -> Callable[[], None]:
+        hands = scrabble_hands(hand_size)
+        return lambda: [scrabble.comp_plan_hand(hand, word_dict) for hand in hands]
+
+    comp_play_hand = quiet(scrabble.comp_play_hand)
+    benchmarks = {
+        "scrabble.load_words": load_words,
+        "scrabble.is_valid_word.hits": valid_words(SCRABBLE_HITS),
+        "scrabble.is_valid_word.misses": valid_words(SCRABBLE_MISSES),
+        "scrabble.is_valid_word.wildcards": valid_words(SCRABBLE_WILDCARDS),
+    }
+    for hand_size in range(3, 16):
+        benchmarks[f"scrabble.comp_choose_word.{hand_size}"] = choose_words(hand_size)
+    benchmarks["scrabble.comp_play_hand"] = play_hands
+    for hand_size in (7, 10):
+        benchmarks[f"scrabble.comp_plan_hand.{hand_size}"] = plan_hands(hand_size)
+
+    path = dawg_path(scrabble.WORDS_FILENAME)
+    dawg = load_dawg(word_dict.store, path)
+    positions = board_positions(dawg)
+
+    def generate_moves() -> None:
+        for board, rack in positions:
+            scrabble_board.generate_moves(board, rack, dawg)
+
+    # Reported as moves generated per second as well
+    generate_moves.items = sum(
+        len(scrabble_board.generate_moves(board, rack, dawg))
+        for board, rack in positions
+    )
+    benchmarks["scrabble.board.load_dawg"] = lambda: load_dawg(word_dict.store, path)
+    benchmarks["scrabble.board.generate_moves"] = generate_moves
+    return benchmarks
+
+
+def hangman_benchmarks() -> Dict[str, Callable[[], object]]:
+    hangman.WORDS_FILENAME = os.path.join(HERE, "hangman", "words.json")
+    load_words = quiet(hangman.load_words)
+    word_dict = load_words()
+    # Build the positional index on first use outside of the timed calls
+    for pattern in HANGMAN_PATTERNS:
+        word_dict.matches(pattern)
+    hangman.choose_word(word_dict, None, (5, 9), "s", 5)
+
+    def choose_words() -> None:
+        random.seed(SEED)
+        for _ in range(100):
+            hangman.choose_word(word_dict)
+
+    def choose_rated_words() -> None:
+        rng = random.Random(SEED)
+        for _ in range(100):
+            hangman.choose_word(word_dict, rng, difficulty=(85, 170))
+
+    def choose_filtered_words() -> None:
+        rng = random.Random(SEED)
+        for _ in range(100):
+            hangman.choose_word(word_dict, rng, (5, 9), "s", 5)
+
+    def match_words() -> None:
+        for pattern, word in HANGMAN_PAIRS:
+            hangman.match_with_gaps(pattern, word)
+
+    show_possible_matches = quiet(hangman.show_possible_matches)
+
+    def show_matches() -> None:
+        for pattern in HANGMAN_PATTERNS:
+            word_length = str(len(pattern.replace(" ", "")))
+            show_possible_matches(pattern, word_length, word_dict)
+
+    benchmarks = {
+        "hangman.load_words": load_words,
+        "hangman.choose_word": choose_words,
+        "hangman.choose_word.filtered": choose_filtered_words,
+        "hangman.match_with_gaps": match_words,
+        "hangman.show_possible_matches": show_matches,
+    }
+    if word_dict.ratings is not None:
+        benchmarks["hangman.choose_word.difficulty"] = choose_rated_words
+    return benchmarks
+
+
+def time_benchmark(func: Callable[[], object], repeat: int = REPEAT) -> Dict:
+    """
+    Returns the best and median time per call of func in seconds, with the
+    number of calls per run and the number of runs.
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_RUN_TIME:
+            break
+        number *= 2
+
+    times = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        times.append((time.perf_counter() - start) / number)
+    return {
+        "best": min(times),
+        "median": statistics.median(times),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def run(name_filter: str = "", repeat: int = REPEAT) -> Dict:
+    """
+    Runs the benchmarks whose name contains name_filter and returns the
+    results along with a description of the machine they ran on.
+    """
+    results = {}
+    for benchmarks in (scrabble_benchmarks, hangman_benchmarks):
+        for name, func in benchmarks().items():
+            if name_filter in name:
+                results[name] = time_benchmark(func, repeat)
+                items = getattr(func, "items", 0)
+                if items:
+                    results[name]["per_second"] = items / results[name]["best"]
+                print_result(name, results[name])
+    return {
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "seed": SEED,
+        "results": results,
+    }
+
+
+def print_result(name: str, result: Dict) -> None:
+    per_second = f" {result['per_second']:>10.0f}/s" if "per_second" in result else ""
+    print(
+        f"{name:<36} {result['best'] * 1e3:>10.3f} ms"
+        f" {result['median'] * 1e3:>10.3f} ms (median){per_second}",
+        file=sys.stderr,
+    )
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    Returns the names of the benchmarks whose best time is more than
+    threshold (a fraction) above their best time in baseline, and prints
+    the ratio of every benchmark in both to stderr.
+    """
+    regressions = []
+    for name, result in results["results"].items():
+        if name not in baseline["results"]:
+            continue
+        ratio = result["best"] / baseline["results"][name]["best"]
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<36} {ratio:>8.2f}x{flag}", file=sys.stderr)
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--output", help="file to write the JSON results to")
+    parser.add_argument(
+        "--compare", metavar="BASELINE", help="JSON results to compare with"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="slowdown over the baseline reported as a regression (default 0.25)",
+    )
+    parser.add_argument("--filter", default="", help="only run the benchmarks matching")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="runs per benchmark")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = run(args.filter, args.repeat)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        print(f"\nCompared with {args.compare}:", file=sys.stderr)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
@@ -1,6 +1,15 @@
 import os.path
 import sys
 
+PATH = os.path.abspath(os.path.dirname(__file__))
+# The words package is shared by the games and lives next to them
+sys.path.insert(1, os.path.dirname(PATH))
+
+from words.instrument import setup
+
+# --profile[=events.jsonl] records the time spent in the hot paths
+sys.argv[1:] = setup(sys.argv[1:])
+
 try:
     import main
 except ImportError:
@@ -10,7 +19,6 @@ except ImportError:
     )
     sys.exit(1)
 
-PATH = os.path.abspath(os.path.dirname(__file__))
 main.WORDS_FILENAME = os.path.join(PATH, "words.json")
 main.INSTRUCTION_FILENAME = os.path.join(PATH, "instructions.txt")
 main.play()
@@ -1,8 +1,15 @@
-import json
 import random
-from itertools import chain
 from string import ascii_lowercase, digits, punctuation, whitespace
-from typing import Iterable, Tuple
+from typing import Iterable, List, Optional, Tuple
+
+from words.instrument import PROFILER, timed
+from words.ratings import load_ratings
+from words.wordfile import WordStore, load_word_dict
+
+try:
+    from .patterns import Candidates, PatternIndex
+except ImportError:  # Started as a script with `python hangman`
+    from patterns import Candidates, PatternIndex
 
 # Globals
 INSTRUCTION_FILENAME = "instructions.txt"
@@ -10,6 +17,8 @@ WORDS_FILENAME = "words.json"
 INPUT_CHECK = punctuation + digits + whitespace
 VOWELS = "aeiou"
 LINE_SEP = "-" * 70
+# Bands of difficulty ratings (see rate_words.py) the player picks from
+DIFFICULTY_BANDS = {"e": (0, 84), "m": (85, 170), "h": (171, 255)}
 
 
 def display_hangman(guess_rem: int, guessed: str, word: str = "") -> None:
@@ -111,7 +120,8 @@ def display_hangman(guess_rem: int, guessed: str, word: str = "") -> None:
     print(stages[guess_rem])
 
 
-def load_words() -> dict:
+@timed("hangman.load_words")
+def load_words() -> PatternIndex:
     """
     Returns a dictionary of valid words with keys being the length of the
     words. Words are strings of lowercase letters.
@@ -120,19 +130,45 @@ def load_words() -> dict:
     take a while to finish.
     """
     print(f"Loading words from the file...")
-    with open(WORDS_FILENAME) as word_file:
-        word_dict = json.load(word_file)
+    # Uses the compiled words.bin when it is up to date with words.json, and
+    # words.ratings likewise
+    word_dict = PatternIndex(
+        load_word_dict(WORDS_FILENAME), load_ratings(WORDS_FILENAME)
+    )
     print(f"Words loaded. Game on!\n{LINE_SEP}")
     return word_dict
 
 
-def choose_word(word_dict: dict) -> str:
+def choose_word(
+    word_dict: WordStore,
+    rng: Optional[random.Random] = None,
+    lengths: Optional[Tuple[int, int]] = None,
+    first_letter: Optional[str] = None,
+    distinct_letters: Optional[int] = None,
+    difficulty: Optional[Tuple[int, int]] = None,
+) -> str:
     """
-    word_list (list): list of words (strings)
-    Returns a word from wordlist at random
+    word_dict (WordStore): all the words, grouped by length
+    rng (random.Random)(Optional): drawn from instead of the global random state
+    lengths (tuple)(Optional): smallest and largest length of the word
+    first_letter (str)(Optional): letter the word starts with
+    distinct_letters (int)(Optional): number of different letters in the word
+    difficulty (tuple)(Optional): lowest and highest difficulty rating of the
+        word, not combined with the other filters
+    Returns a word from word_dict at random, among the words allowed by the
+    filters if any (see selection.py). Raises ValueError if there is none.
     """
-    word_list = list(chain(*word_dict.values()))
-    return random.choice(word_list)
+    if difficulty is not None:
+        ratings = PatternIndex.of(word_dict).ratings
+        if ratings is None:
+            raise ValueError("The words have no difficulty ratings.")
+        if (lengths, first_letter, distinct_letters) != (None, None, None):
+            raise ValueError("The difficulty can't be combined with other filters.")
+        return word_dict.word(ratings.choose(*difficulty, rng))
+    if lengths is None and first_letter is None and distinct_letters is None:
+        return word_dict.word((rng or random).randrange(word_dict.num_words))
+    selector = PatternIndex.of(word_dict).selector
+    return selector.choose(rng, lengths, first_letter, distinct_letters)
 
 
 def is_word_guessed(secret_word: str, letters_guessed: list) -> bool:
@@ -272,10 +308,29 @@ def match_with_gaps(my_word_string: str, other_word: str) -> bool:
     return True
 
 
-def show_possible_matches(my_word: str, word_length: str, word_dict: dict) -> None:
+def possible_matches(my_word: str, word_dict: WordStore) -> List[str]:
+    """
+    my_word: string with _ characters, current guess of secret word
+    returns: list, every word in wordlist that matches myWord
+
+    The words are looked up in the positional index of word_dict (see
+    patterns.py) instead of matching every word of the length.
+    """
+    return PatternIndex.of(word_dict).matches(my_word)
+
+
+@timed("hangman.show_possible_matches")
+def show_possible_matches(
+    my_word: str,
+    word_length: str,
+    word_dict: WordStore,
+    candidates: Optional[Candidates] = None,
+) -> None:
     """
     my_word: string with _ characters, current guess of secret word
     word_length: integer, length of the secretWord
+    candidates: Candidates of the game, the words shown instead of the
+    words matching my_word when given
     returns: None, prints out every word in wordlist that matches myWord
 
     Keep in mind that in hangman when a letter is guessed, all the positions
@@ -285,21 +340,37 @@ def show_possible_matches(my_word: str, word_length: str, word_dict: dict) -> No
 
     """
     word_matches = ""
-    my_word_string = "".join([letter for letter in my_word if letter != " "])
     letter_count = 0
 
-    for word in word_dict[word_length]:
-        if match_with_gaps(my_word_string, word):
-            letter_count += len(word) + 1
-            if letter_count > len(LINE_SEP):
-                word_matches += "\n"
-                letter_count = len(word) + 1
-            word_matches += word + " "
+    if candidates is not None:
+        words = candidates.words()
+    else:
+        words = possible_matches(my_word, word_dict)
+    for word in words:
+        letter_count += len(word) + 1
+        if letter_count > len(LINE_SEP):
+            word_matches += "\n"
+            letter_count = len(word) + 1
+        word_matches += word + " "
 
     print(f"\nPossible word matches for [ {my_word} ] are:\n{word_matches}")
 
 
-def hangman_game(secret_word: str, word_dict: dict, hint_choice: str) -> int:
+def narrow_candidates(
+    candidates: Candidates, secret_word: str, letter: str, hint_choice: str
+) -> None:
+    """
+    Narrows the candidates of the game after a new guess of the letter and,
+    when playing with hints, tells how many words are left.
+    """
+    positions = [i for i, other in enumerate(secret_word) if other == letter]
+    ruled_out = candidates.guess(letter, positions)
+    PROFILER.count("hangman.candidates_ruled_out", ruled_out)
+    if hint_choice == "y":
+        print(f"That leaves {len(candidates)} possible words ({ruled_out} ruled out).")
+
+
+def hangman_game(secret_word: str, word_dict: WordStore, hint_choice: str) -> int:
     """
     secret_word: string, the secret word to guess.
     Starts up an interactive game of Hangman.
@@ -327,6 +398,9 @@ def hangman_game(secret_word: str, word_dict: dict, hint_choice: str) -> int:
     print(f"I am thinking of a word that is {len(secret_word)} letters long.")
     print(f"You have {num_warnings} warnings left.")
 
+    # Words the secret word can still be, read by the hint
+    candidates = Candidates(PatternIndex.of(word_dict), len(secret_word))
+
     while num_guess > 0:
         guessed_word = get_guessed_word(secret_word, letters_guessed)
         display_hangman(num_guess, guessed_word)
@@ -340,7 +414,7 @@ def hangman_game(secret_word: str, word_dict: dict, hint_choice: str) -> int:
         if len(user_letter) > 1 or user_letter in INPUT_CHECK:
             if hint_choice == "y" and user_letter == "*" and hint_count == 1:
                 word_length = str(len(secret_word))
-                show_possible_matches(guessed_word, word_length, word_dict)
+                show_possible_matches(guessed_word, word_length, word_dict, candidates)
                 hint_count -= 1
                 continue
 
@@ -358,11 +432,13 @@ def hangman_game(secret_word: str, word_dict: dict, hint_choice: str) -> int:
             print(f"\nOops! That letter is not in my word:")
             letters_guessed.append(user_letter)
             num_guess = num_guess - 2 if user_letter in VOWELS else num_guess - 1
+            narrow_candidates(candidates, secret_word, user_letter, hint_choice)
 
         elif user_letter in secret_word:
             letters_guessed.append(user_letter)
             guessed_word = get_guessed_word(secret_word, letters_guessed)
             print(f"\nGood guess:")
+            narrow_candidates(candidates, secret_word, user_letter, hint_choice)
 
             if is_word_guessed(secret_word, letters_guessed):
                 game_score = num_guess * len(set(secret_word))
@@ -392,10 +468,16 @@ def play():
     final_score = 0
 
     hint_choice = input_handling("Do you want to play with hints? [y/n]", "yn")
+    difficulty = None
+    if WORD_DICT.ratings is not None:
+        band = input_handling(
+            "Which words do you want? [e]asy, [m]edium, [h]ard or [a]ny", "emha"
+        )
+        difficulty = DIFFICULTY_BANDS.get(band)
 
     user_choice = "y"
     while user_choice == "y":
-        secret_word = choose_word(WORD_DICT)
+        secret_word = choose_word(WORD_DICT, difficulty=difficulty)
         total_score = hangman_game(secret_word, WORD_DICT, hint_choice)
         final_score += total_score
         user_choice = input_handling("Do you want to play again? [y/n]", "yn")
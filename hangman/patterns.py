@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Positional index of the words of hangman, to find the words matching a
+guessed word like "a_ _ le" without comparing it with every word.
+
+For every word length the index holds a bitset (an int) per position and
+letter, whose bit k is set if the k-th word of that length has the letter
+at the position. The words matching a guessed word are the intersection of
+the bitsets of its revealed letters, a few operations on ints whatever the
+number of words.
+
+The words of a length are stored one after the other with the same stride,
+so the letters of all the words at a position are one slice of the store
+and a bitset is built without a Python loop over the words: the slice is
+translated to a string of 0s and 1s which int() parses. Building the index
+of a length takes tens of milliseconds, it is built on first use.
+"""
+from collections.abc import Mapping
+from string import ascii_lowercase
+from typing import Collection, Dict, Iterator, List, Optional
+
+from words.ratings import Ratings
+from words.wordfile import WordStore
+
+try:
+    from .selection import WordSelector
+except ImportError:  # Started as a script with `python hangman`
+    from selection import WordSelector
+
+# Translation of a letter to "1" and of every other byte to "0"
+ONES = {
+    letter: bytes(49 if byte == ord(letter) else 48 for byte in range(256))
+    for letter in ascii_lowercase
+}
+
+
+def bit_positions(bits: int) -> Iterator[int]:
+    """
+    Yields the positions of the bits set in bits, lowest first.
+    """
+    digits = bin(bits)[:1:-1]
+    position = digits.find("1")
+    while position >= 0:
+        yield position
+        position = digits.find("1", position + 1)
+
+
+class PatternIndex(Mapping):
+    """
+    The words of hangman as loaded from the words file, keyed by their
+    length as a string, with the positional index of every length on top.
+
+    The index is built once and must not be mutated afterwards. ratings are
+    the difficulty ratings of the words, if they have been computed.
+    """
+
+    def __init__(self, store: WordStore, ratings: Optional[Ratings] = None) -> None:
+        self.store = store
+        self.ratings = ratings
+        self.num_words = store.num_words
+        # Per length: the words as stored and bits[position][letter]
+        self._raw: Dict[int, bytes] = {}
+        self._bits: Dict[int, List[Dict[str, int]]] = {}
+        self._contains: Dict[int, Dict[str, int]] = {}
+        self._selector: Optional[WordSelector] = None
+
+    def __getitem__(self, key: str) -> List[str]:
+        return self.store[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store)
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    @classmethod
+    def of(cls, word_dict: WordStore) -> "PatternIndex":
+        """
+        Returns word_dict itself if it is already an index, otherwise builds
+        one on it. Build the index once (see load_words) and pass it around
+        to keep the bitsets built from one call to the next.
+        """
+        return word_dict if isinstance(word_dict, cls) else cls(word_dict)
+
+    def word(self, word_id: int) -> str:
+        return self.store.word(word_id)
+
+    @property
+    def selector(self) -> WordSelector:
+        """
+        The random draws of words, with their filters kept from one draw to
+        the next.
+        """
+        if self._selector is None:
+            self._selector = WordSelector(self.store)
+        return self._selector
+
+    def count(self, length: int) -> int:
+        """
+        Returns the number of words of the length.
+        """
+        return len(self._raw_words(length)) // (length + 1)
+
+    def _raw_words(self, length: int) -> bytes:
+        raw = self._raw.get(length)
+        if raw is None:
+            key = str(length)
+            start, stop = self.store.bucket_range(key) if key in self else (0, 0)
+            raw = self.store.raw_slice(start, stop)
+            if len(raw) != (stop - start) * (length + 1):
+                raise ValueError(f"The words of {key!r} aren't {length} letters long.")
+            self._raw[length] = raw
+        return raw
+
+    def letter_bits(self, length: int) -> List[Dict[str, int]]:
+        """
+        Returns the bitsets of the words of the length: item [position][letter]
+        has the bits of the words with the letter at the position set.
+        """
+        bits = self._bits.get(length)
+        if bits is None:
+            raw = self._raw_words(length)
+            bits = []
+            for position in range(length):
+                # Bit k is the last digit of the reversed column
+                column = raw[position :: length + 1][::-1]
+                bits.append(
+                    {
+                        letter: int(column.translate(ONES[letter]), 2)
+                        for letter in ascii_lowercase
+                        if ord(letter) in column
+                    }
+                )
+            self._bits[length] = bits
+        return bits
+
+    def contains_bits(self, length: int) -> Dict[str, int]:
+        """
+        Returns the bitsets of the words of the length containing each letter,
+        at any position.
+        """
+        contains = self._contains.get(length)
+        if contains is None:
+            contains = {}
+            for position_bits in self.letter_bits(length):
+                for letter, bits in position_bits.items():
+                    contains[letter] = contains.get(letter, 0) | bits
+            self._contains[length] = contains
+        return contains
+
+    def matching(self, guessed_word: str) -> int:
+        """
+        Returns the bitset of the words with the letters of the guessed word
+        at their positions, "_" standing for any letter.
+        """
+        pattern = guessed_word.replace(" ", "")
+        length = len(pattern)
+        matching = (1 << self.count(length)) - 1
+        bits = self.letter_bits(length)
+        for position, letter in enumerate(pattern):
+            if letter != "_":
+                matching &= bits[position].get(letter, 0)
+        return matching
+
+    def words(self, length: int, bits: int) -> List[str]:
+        """
+        Returns the words of the length whose bits are set in bits.
+        """
+        raw = self._raw_words(length)
+        stride = length + 1
+        if bits == (1 << len(raw) // stride) - 1:
+            # Nothing revealed yet, decoding the whole bucket at once is faster
+            return raw.decode("ascii").split("\n")[:-1]
+        return [
+            raw[k * stride : k * stride + length].decode("ascii")
+            for k in bit_positions(bits)
+        ]
+
+    def matches(self, guessed_word: str) -> List[str]:
+        """
+        Returns the words matching the guessed word, as match_with_gaps does,
+        in the order of the words file.
+        """
+        length = len(guessed_word.replace(" ", ""))
+        return self.words(length, self.matching(guessed_word))
+
+
+def popcount(bits: int) -> int:
+    """
+    Returns the number of bits set in bits.
+    """
+    return bin(bits).count("1")
+
+
+if hasattr(int, "bit_count"):  # Python 3.10+
+    popcount = int.bit_count  # noqa: F811
+
+
+class Candidates:
+    """
+    The words which can still be the secret word of a game of hangman,
+    narrowed down after every guess instead of being matched again against
+    the guessed word.
+
+    sizes holds the number of candidates at the start of the game and after
+    every guess.
+    """
+
+    def __init__(self, index: PatternIndex, length: int) -> None:
+        self.index = index
+        self.length = length
+        self.bits = (1 << index.count(length)) - 1
+        self.sizes = [index.count(length)]
+
+    def __len__(self) -> int:
+        return self.sizes[-1]
+
+    def guess(self, letter: str, positions: Collection[int]) -> int:
+        """
+        Narrows the candidates after guessing the letter, found at the
+        positions of the secret word (none if it isn't in the word), and
+        returns the number of candidates ruled out.
+
+        As all the occurrences of a letter are revealed at once, the words
+        left have the letter at those positions and nowhere else.
+        """
+        if positions:
+            letter_bits = self.index.letter_bits(self.length)
+            for position in range(self.length):
+                bits = letter_bits[position].get(letter, 0)
+                self.bits &= bits if position in positions else ~bits
+        else:
+            self.bits &= ~self.index.contains_bits(self.length).get(letter, 0)
+        self.sizes.append(popcount(self.bits))
+        return self.sizes[-2] - self.sizes[-1]
+
+    def words(self) -> List[str]:
+        """
+        Returns the candidates in the order of the words file.
+        """
+        return self.index.words(self.length, self.bits)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Offline stage run after words/extract_words.py: rates how hard every word
+of the words.json of hangman is to guess and writes the ratings next to it,
+as words.ratings (see words/ratings.py), for the game to draw words of a
+chosen difficulty.
+
+The difficulty of a word is the sum of
+
+    the wrong letters the solver of hangman (see solver.py) guesses
+    before finding the word, given as many guesses as it needs,
+    RARITY_WEIGHT times the rarity of its letters: the mean over its
+    different letters of -log2 of the share of words with the letter,
+    DISTINCT_WEIGHT times the number of its different letters,
+
+and its rating is its rank among all the words by difficulty, scaled to
+range(LEVELS): a rating of 128 means half of the words are easier. Words
+of the same difficulty have the same rating.
+
+Playing every word takes about a minute per worker process. Run it from the
+terminal-games directory:
+
+    python -m hangman.rate_words hangman/words.json --workers 4
+"""
+import argparse
+import math
+import os
+import time
+from bisect import bisect_left
+from string import ascii_lowercase
+from typing import Dict, List, Sequence
+
+from words.ratings import LEVELS, write_ratings
+from words.wordfile import load_word_dict
+
+from . import solver
+
+RARITY_WEIGHT = 0.5
+DISTINCT_WEIGHT = 0.1
+
+# Enough guesses for the solver to always find the word
+SOLVER_GUESSES = 2 * len(ascii_lowercase)
+
+
+def letter_rarity(words: Sequence[str]) -> Dict[str, float]:
+    """
+    Returns -log2 of the share of the words containing each letter.
+    """
+    counts = dict.fromkeys(ascii_lowercase, 0)
+    for word in words:
+        for letter in set(word):
+            counts[letter] += 1
+    return {
+        letter: -math.log2(count / len(words)) if count else 0.0
+        for letter, count in counts.items()
+    }
+
+
+def difficulty(word: str, wrong: int, rarity: Dict[str, float]) -> float:
+    """
+    Returns the difficulty of the word, found by the solver after wrong
+    wrong letters.
+    """
+    letters = set(word)
+    mean_rarity = sum(rarity[letter] for letter in letters) / len(letters)
+    return wrong + RARITY_WEIGHT * mean_rarity + DISTINCT_WEIGHT * len(letters)
+
+
+def rank_levels(difficulties: Sequence[float]) -> List[int]:
+    """
+    Returns the rating of every difficulty: its rank scaled to range(LEVELS).
+    """
+    ordered = sorted(difficulties)
+    return [
+        bisect_left(ordered, value) * LEVELS // len(ordered) for value in difficulties
+    ]
+
+
+def rate_words(json_path: str, workers: int = 0) -> List[int]:
+    """
+    Returns the rating of every word of the words.json at json_path, by id.
+    """
+    store = load_word_dict(json_path)
+    words = [store.word(word_id) for word_id in range(store.num_words)]
+    games = solver.play_all(
+        "frequency", workers, guesses=SOLVER_GUESSES, json_path=json_path
+    )
+    rarity = letter_rarity(words)
+    return rank_levels(
+        [difficulty(word, wrong, rarity) for word, (_, _, wrong) in zip(words, games)]
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Rate the difficulty of the words of hangman."
+    )
+    parser.add_argument("words_json", help="words.json of hangman")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="worker processes, 0 to play the words in this process",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    start_time = time.perf_counter()
+    ratings = rate_words(args.words_json, args.workers)
+    print(
+        f"Rated {len(ratings)} words in {time.perf_counter() - start_time:.1f} s, "
+        f"wrote {write_ratings(args.words_json, ratings)}."
+    )
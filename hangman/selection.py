@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Random draws of hangman words, optionally restricted to a range of lengths,
+a starting letter or a number of distinct letters, without building the
+list of the words allowed.
+
+The words allowed by a filter are a few ranges of word ids: one per length,
+as the words of a length have consecutive ids and are sorted, so the ones
+starting with a letter are consecutive too. A draw picks one integer below
+the number of words allowed and finds its range in the cumulative counts of
+the ranges. The ranges of a filter are computed once and kept.
+
+For the number of distinct letters, the ids of the words of a length are
+also kept grouped by that number (4 bytes per word, built on first use),
+so the words of a length with a given number of distinct letters are a
+range of that grouping.
+"""
+import random
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Callable, Dict, List, Optional, Tuple
+
+from words.wordfile import WordStore
+
+# A range of word ids: (ids, start, stop), ids[start:stop] if ids is an array
+# of grouped ids, range(start, stop) if it is None
+IdRange = Tuple[Optional[array], int, int]
+
+# The ranges of a filter and the cumulative counts of their words
+Selection = Tuple[List[IdRange], List[int]]
+
+# The ids of the words of a length grouped by number of distinct letters,
+# and the (start, stop) of every group in them
+Groups = Tuple[array, Dict[int, Tuple[int, int]]]
+
+
+def first_true(lo: int, hi: int, pred: Callable[[int], bool]) -> int:
+    """
+    Returns the first index in range(lo, hi) for which pred is true, hi if
+    there is none, pred being false then true over the range.
+    """
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if pred(mid):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+class WordSelector:
+    """
+    Draws words at random from the words of hangman, keyed by their length.
+    """
+
+    def __init__(self, store: WordStore) -> None:
+        self.store = store
+        # The lengths with at least one word
+        self.lengths: List[int] = []
+        for key in store:
+            start, stop = store.bucket_range(key)
+            if start < stop:
+                self.lengths.append(int(key))
+        self.lengths.sort()
+        self._selections: Dict[Tuple, Selection] = {}
+        self._groups: Dict[int, Groups] = {}
+
+    def _distinct_groups(self, length: int) -> Groups:
+        groups = self._groups.get(length)
+        if groups is None:
+            start, _ = self.store.bucket_range(str(length))
+            distinct = [len(set(word)) for word in self.store[str(length)]]
+            # Sorting is stable, the ids stay sorted inside a group
+            order = sorted(range(len(distinct)), key=distinct.__getitem__)
+            ids = array("I", (start + position for position in order))
+            bounds: Dict[int, Tuple[int, int]] = {}
+            for position, word_position in enumerate(order):
+                count = distinct[word_position]
+                bounds[count] = (bounds.get(count, (position,))[0], position + 1)
+            groups = self._groups[length] = (ids, bounds)
+        return groups
+
+    def _id_range(
+        self, length: int, first_letter: Optional[str], distinct: Optional[int]
+    ) -> IdRange:
+        key = str(length)
+        if key not in self.store:
+            return None, 0, 0
+        ids: Optional[array] = None
+        lo, hi = self.store.bucket_range(key)
+        if distinct is not None:
+            ids, bounds = self._distinct_groups(length)
+            lo, hi = bounds.get(distinct, (0, 0))
+        if first_letter is not None:
+
+            def word(position: int) -> str:
+                return self.store.word(position if ids is None else ids[position])
+
+            lo = first_true(lo, hi, lambda position: word(position) >= first_letter)
+            hi = first_true(lo, hi, lambda position: word(position)[0] > first_letter)
+        return ids, lo, hi
+
+    def selection(
+        self,
+        lengths: Optional[Tuple[int, int]] = None,
+        first_letter: Optional[str] = None,
+        distinct: Optional[int] = None,
+    ) -> Selection:
+        """
+        Returns the ranges of ids of the words allowed by the filter and
+        the cumulative counts of their words.
+        """
+        key = (lengths, first_letter, distinct)
+        selection = self._selections.get(key)
+        if selection is None:
+            low, high = lengths or (self.lengths[0], self.lengths[-1])
+            id_ranges = [
+                self._id_range(length, first_letter, distinct)
+                for length in self.lengths
+                if low <= length <= high
+            ]
+            id_ranges = [
+                id_range for id_range in id_ranges if id_range[2] > id_range[1]
+            ]
+            counts = list(accumulate(hi - lo for _, lo, hi in id_ranges))
+            selection = self._selections[key] = (id_ranges, counts)
+        return selection
+
+    def count(
+        self,
+        lengths: Optional[Tuple[int, int]] = None,
+        first_letter: Optional[str] = None,
+        distinct: Optional[int] = None,
+    ) -> int:
+        """
+        Returns the number of words allowed by the filter.
+        """
+        _, counts = self.selection(lengths, first_letter, distinct)
+        return counts[-1] if counts else 0
+
+    def choose(
+        self,
+        rng: Optional[random.Random] = None,
+        lengths: Optional[Tuple[int, int]] = None,
+        first_letter: Optional[str] = None,
+        distinct: Optional[int] = None,
+    ) -> str:
+        """
+        Returns a word at random among the words allowed by the filter: with
+        a length in the inclusive range lengths, starting with first_letter
+        and made of distinct different letters. Raises ValueError if there
+        is no such word.
+        """
+        id_ranges, counts = self.selection(lengths, first_letter, distinct)
+        if not counts:
+            raise ValueError("No word matches the filter.")
+        pick = (rng or random).randrange(counts[-1])
+        number = bisect_right(counts, pick)
+        ids, lo, _ = id_ranges[number]
+        position = lo + pick - (counts[number - 1] if number else 0)
+        return self.store.word(position if ids is None else ids[position])
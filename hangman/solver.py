@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Automatic player of hangman, to measure how hard the words are and how good
+a guessing strategy is.
+
+The solver keeps the words the secret word can still be (see Candidates in
+patterns.py) and guesses the letter which is the best over them:
+
+    frequency   the letter in the most candidates
+    entropy     the letter whose answer tells the most about the secret word,
+                the answers being "not in the word" or the positions of the
+                letter (the information gain of guessing it)
+
+The candidates are bitsets, so counting the candidates with a letter, or
+splitting them by the positions of a letter, takes a few operations on ints
+per letter rather than a loop over the words: a decision over the 30,000
+words of a length takes milliseconds.
+
+The decisions only depend on what has been revealed, so they are kept and
+the games of a batch share them. The batch mode plays every word of
+words.json, spread over worker processes which load the words once each,
+and reports the win rate, the mean number of guesses and the words solved
+per second. Run it from the terminal-games directory:
+
+    python -m hangman.solver --strategy entropy --workers 4
+"""
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from words.wordfile import load_word_dict
+
+from . import main
+from .patterns import Candidates, PatternIndex, popcount
+
+STRATEGIES = ("frequency", "entropy")
+
+# Guesses at the start of a game, as in hangman_game
+GUESSES = 6
+
+# Letters by frequency in English, to break ties between letters
+LETTER_ORDER = "etaoinshrdlucmfwypvbgkjqxz"
+
+# Number of words a worker plays per task
+CHUNK_SIZE = 2000
+
+# Decisions kept by a worker process, at most
+MAX_DECISIONS = 200_000
+
+# A game played by the solver: (won, letters guessed, wrong letters)
+Game = Tuple[bool, int, int]
+
+# Letters chosen, keyed by strategy, revealed word and letters guessed
+Decisions = Dict[Tuple[str, str, FrozenSet[str]], str]
+
+# Words of the worker process, loaded once by init_worker
+WORD_DICT: Optional[PatternIndex] = None
+
+# Decisions taken on WORD_DICT, shared by the games of the worker process
+DECISIONS: Decisions = {}
+
+
+def init_worker(json_path: Optional[str] = None) -> None:
+    """
+    Loads the words of a worker process, from the words.json of hangman by
+    default.
+    """
+    global WORD_DICT
+    if json_path is None:
+        here = os.path.dirname(os.path.abspath(__file__))
+        json_path = os.path.join(here, main.WORDS_FILENAME)
+    WORD_DICT = PatternIndex(load_word_dict(json_path))
+    DECISIONS.clear()
+
+
+def letter_counts(candidates: Candidates, letters: str) -> Dict[str, int]:
+    """
+    Returns the number of candidates containing each of the letters.
+    """
+    contains = candidates.index.contains_bits(candidates.length)
+    return {
+        letter: popcount(candidates.bits & contains.get(letter, 0))
+        for letter in letters
+    }
+
+
+def answer_sizes(candidates: Candidates, letter: str) -> List[int]:
+    """
+    Returns the number of candidates giving each possible answer to the
+    guess of the letter: the ones without it, then the ones with it at the
+    same positions.
+    """
+    bits = candidates.bits
+    with_letter = bits & candidates.index.contains_bits(candidates.length).get(
+        letter, 0
+    )
+    groups = [with_letter] if with_letter else []
+    for position_bits in candidates.index.letter_bits(candidates.length):
+        at_position = position_bits.get(letter, 0)
+        if not at_position & with_letter:
+            continue
+        groups = [
+            group
+            for whole in groups
+            for group in (whole & at_position, whole & ~at_position)
+            if group
+        ]
+    return [popcount(bits & ~with_letter)] + [popcount(group) for group in groups]
+
+
+def information_gain(sizes: List[int]) -> float:
+    """
+    Returns the entropy in bits of the answer whose outcomes have the sizes.
+    """
+    total = sum(sizes)
+    return (
+        math.log2(total) - sum(size * math.log2(size) for size in sizes if size) / total
+    )
+
+
+def choose_letter(
+    candidates: Candidates, guessed: str, strategy: str = "frequency"
+) -> str:
+    """
+    Returns the letter to guess next over the candidates, among the letters
+    not guessed yet.
+    """
+    letters = [letter for letter in LETTER_ORDER if letter not in guessed]
+    if len(candidates) == 0:
+        return letters[0]
+    if strategy == "frequency":
+        counts = letter_counts(candidates, "".join(letters))
+        # max keeps the first of the letters with the most candidates
+        return max(letters, key=counts.__getitem__)
+    if strategy == "entropy":
+        counts = letter_counts(candidates, "".join(letters))
+        # A letter in none of the candidates tells nothing
+        useful = [letter for letter in letters if counts[letter]]
+        return max(
+            useful,
+            key=lambda letter: information_gain(answer_sizes(candidates, letter)),
+        )
+    raise ValueError(f"Unknown strategy: {strategy!r}")
+
+
+def solve_word(
+    secret_word: str,
+    word_dict: PatternIndex,
+    strategy: str = "frequency",
+    decisions: Optional[Decisions] = None,
+    guesses: int = GUESSES,
+) -> Game:
+    """
+    Plays a game of hangman with the secret word, with the rules of
+    hangman_game but starting with the given guesses, and returns whether it
+    was won, the number of letters guessed and the number of them not in the
+    word. The letters chosen are looked up in and added to decisions, which
+    must only hold decisions taken on word_dict.
+    """
+    if decisions is None:
+        decisions = {}
+    candidates = Candidates(word_dict, len(secret_word))
+    guessed = ""
+    wrong = 0
+    num_guess = guesses
+    while num_guess > 0:
+        revealed = "".join(
+            letter if letter in guessed else "_" for letter in secret_word
+        )
+        if "_" not in revealed:
+            return True, len(guessed), wrong
+        key = (strategy, revealed, frozenset(guessed))
+        letter = decisions.get(key)
+        if letter is None:
+            if len(decisions) >= MAX_DECISIONS:
+                decisions.clear()
+            letter = decisions[key] = choose_letter(candidates, guessed, strategy)
+
+        guessed += letter
+        positions = [i for i, other in enumerate(secret_word) if other == letter]
+        candidates.guess(letter, positions)
+        if not positions:
+            wrong += 1
+            num_guess -= 2 if letter in main.VOWELS else 1
+    return False, len(guessed), wrong
+
+
+def play_words(
+    start: int, stop: int, strategy: str, guesses: int = GUESSES
+) -> List[Game]:
+    """
+    Plays the words with ids in range(start, stop) and returns their games.
+    """
+    if WORD_DICT is None:
+        init_worker()
+    return [
+        solve_word(WORD_DICT.word(word_id), WORD_DICT, strategy, DECISIONS, guesses)
+        for word_id in range(start, stop)
+    ]
+
+
+def play_all(
+    strategy: str = "frequency",
+    workers: int = 0,
+    start: int = 0,
+    stop: Optional[int] = None,
+    guesses: int = GUESSES,
+    json_path: Optional[str] = None,
+) -> List[Game]:
+    """
+    Returns the games of the words with ids in range(start, stop), every
+    word by default, in the order of the words. The words are the ones of
+    the words.json at json_path, hangman's by default. With workers set to
+    0 the words are played in this process.
+    """
+    if json_path is not None or WORD_DICT is None:
+        init_worker(json_path)
+    if stop is None:
+        stop = WORD_DICT.num_words
+    chunks = [
+        (chunk_start, min(chunk_start + CHUNK_SIZE, stop), strategy, guesses)
+        for chunk_start in range(start, stop, CHUNK_SIZE)
+    ]
+    if workers == 0:
+        return [game for chunk in chunks for game in play_words(*chunk)]
+
+    games = []
+    with ProcessPoolExecutor(
+        workers, initializer=init_worker, initargs=(json_path,)
+    ) as executor:
+        for chunk_games in executor.map(play_words, *zip(*chunks)):
+            games.extend(chunk_games)
+    return games
+
+
+def print_report(games: List[Game], elapsed: float) -> None:
+    """
+    Prints the win rate, the mean number of guesses and the number of words
+    solved per second.
+    """
+    print(f"Words:        {len(games)}")
+    print(f"Time:         {elapsed:.2f} s ({len(games) / elapsed:.1f} words/s)")
+    if not games:
+        return
+    wins = [guesses for won, guesses, _ in games if won]
+    print(f"Win rate:     {len(wins) / len(games):.2%}")
+    mean = sum(guesses for _, guesses, _ in games) / len(games)
+    print(f"Mean guesses: {mean:.2f}", end="")
+    if wins:
+        print(f" ({sum(wins) / len(wins):.2f} in the games won)", end="")
+    print(f", {sum(wrong for _, _, wrong in games) / len(games):.2f} wrong")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Let a solver play hangman with every word of words.json."
+    )
+    parser.add_argument(
+        "--strategy", choices=STRATEGIES, default="frequency", help="letter choice"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="worker processes, 0 to play in this process",
+    )
+    parser.add_argument("--length", type=int, help="only play the words of this length")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    start, stop = 0, None
+    if args.length is not None:
+        init_worker()
+        start, stop = WORD_DICT.store.bucket_range(str(args.length))
+    start_time = time.perf_counter()
+    games = play_all(args.strategy, args.workers, start, stop)
+    print_report(games, time.perf_counter() - start_time)
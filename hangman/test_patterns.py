@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+from words.wordfile import WordStore, load_word_dict
+
+from .main import WORDS_FILENAME, match_with_gaps, possible_matches
+from .patterns import Candidates, PatternIndex, bit_positions
+
+WORD_DICT = {
+    "4": ["tact", "test", "text", "tilt", "bolt", "zest"],
+    "5": ["apple", "ample", "amble", "tacit"],
+    "2": [],
+}
+
+TEST_MATCHES = [
+    "t_ _ t",
+    "_ _ _ t",
+    "_ _ _ _ ",
+    "z_ _ _ ",
+    "q_ _ _ ",
+    "a_ ple",
+    "am_ le",
+    "apple",
+    "_ _ ",
+    "_ _ _ ",
+]
+
+TEST_REAL_MATCHES = ["a_ _ le", "_ _ _ _ _ t", "g_ _ p_ _ _ _ _ t", "_ _ _ _ _ _ _ _ "]
+
+TEST_CANDIDATES = [
+    ("test", "t", [6, 4]),
+    ("test", "zet", [6, 5, 2, 2]),
+    ("tact", "aoc", [6, 1, 1, 1]),
+    ("apple", "plm", [4, 1, 1, 1]),
+    ("bolt", "xyz", [6, 5, 5, 4]),
+]
+
+TEST_BIT_POSITIONS = [(0, []), (1, [0]), (0b101100, [2, 3, 5]), (1 << 70, [70])]
+
+
+def brute_force(word_dict, guessed_word):
+    pattern = guessed_word.replace(" ", "")
+    return [
+        word
+        for word in word_dict.get(str(len(pattern)), [])
+        if match_with_gaps(pattern, word)
+    ]
+
+
+def consistent(word, secret_word, letters):
+    """
+    Returns True if word reveals the same letters as secret_word.
+    """
+    return all(
+        (letter == other) == (letter == secret_letter)
+        for letter in letters
+        for other, secret_letter in zip(word, secret_word)
+    )
+
+
+@pytest.mark.parametrize("secret_word, letters, sizes", TEST_CANDIDATES)
+def test_candidates(secret_word, letters, sizes):
+    index = PatternIndex(WordStore.from_word_dict(WORD_DICT))
+    candidates = Candidates(index, len(secret_word))
+    for number, letter in enumerate(letters, 1):
+        positions = [i for i, other in enumerate(secret_word) if other == letter]
+        ruled_out = candidates.guess(letter, positions)
+        assert ruled_out == candidates.sizes[-2] - len(candidates)
+        assert candidates.words() == [
+            word
+            for word in index[str(len(secret_word))]
+            if consistent(word, secret_word, letters[:number])
+        ]
+    assert candidates.sizes == sizes
+
+
+@pytest.mark.parametrize("bits, expected", TEST_BIT_POSITIONS)
+def test_bit_positions(bits, expected):
+    assert list(bit_positions(bits)) == expected
+
+
+@pytest.mark.parametrize("guessed_word", TEST_MATCHES)
+def test_matches(guessed_word):
+    index = PatternIndex(WordStore.from_word_dict(WORD_DICT))
+    expected = brute_force({k: sorted(v) for k, v in WORD_DICT.items()}, guessed_word)
+    assert index.matches(guessed_word) == expected
+
+
+def test_count():
+    index = PatternIndex(WordStore.from_word_dict(WORD_DICT))
+    assert [index.count(length) for length in (2, 3, 4, 5)] == [0, 0, 6, 4]
+
+
+def test_uneven_bucket():
+    index = PatternIndex(WordStore.from_word_dict({"3": ["abc", "de"]}))
+    with pytest.raises(ValueError):
+        index.matches("_ _ _ ")
+
+
+@pytest.mark.parametrize("guessed_word", TEST_REAL_MATCHES)
+def test_real_matches(guessed_word):
+    here = os.path.dirname(os.path.abspath(__file__))
+    word_dict = PatternIndex(load_word_dict(os.path.join(here, WORDS_FILENAME)))
+    assert possible_matches(guessed_word, word_dict) == brute_force(
+        word_dict, guessed_word
+    )
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from . import solver
+from .rate_words import difficulty, letter_rarity, rank_levels, rate_words
+
+TEST_RANK_LEVELS = [
+    ([1.0, 2.0, 3.0, 4.0], [0, 64, 128, 192]),
+    ([2.0, 1.0, 2.0, 0.5], [128, 64, 128, 0]),
+    ([7.0], [0]),
+]
+
+
+@pytest.mark.parametrize("difficulties, expected", TEST_RANK_LEVELS)
+def test_rank_levels(difficulties, expected):
+    assert rank_levels(difficulties) == expected
+
+
+def test_letter_rarity():
+    rarity = letter_rarity(["abb", "ac", "ad", "be"])
+    assert rarity["a"] == pytest.approx(0.415, abs=1e-3)
+    assert rarity["b"] == 1.0 and rarity["c"] == 2.0 and rarity["z"] == 0.0
+
+
+def test_difficulty():
+    rarity = letter_rarity(["abb", "ac", "ad", "be"])
+    assert difficulty("ac", 1, rarity) > difficulty("ab", 1, rarity)
+    assert difficulty("ab", 2, rarity) > difficulty("ac", 1, rarity)
+
+
+def test_rate_words(tmp_path, monkeypatch):
+    # The words are loaded as the ones of the solver, put them back after
+    monkeypatch.setattr(solver, "WORD_DICT", None)
+    monkeypatch.setattr(solver, "DECISIONS", {})
+    path = tmp_path / "words.json"
+    path.write_text(json.dumps({"3": ["zzz", "ate", "tea", "eat", "qua"]}))
+    ratings = rate_words(str(path))
+    assert len(ratings) == 5
+    # Sorted words: ate eat qua tea zzz
+    assert ratings[4] == max(ratings) and ratings[0] < ratings[2]
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import random
+
+import pytest
+
+from words.ratings import Ratings, pack_ratings
+from words.wordfile import WordStore
+
+from .main import choose_word
+from .patterns import PatternIndex
+from .selection import WordSelector
+
+WORD_DICT = {
+    "2": ["an", "at", "be"],
+    "4": ["tact", "test", "text", "tilt", "bolt", "zest", "abba"],
+    "5": ["apple", "ample", "amble", "tacit", "bloat"],
+    "3": [],
+}
+
+TEST_FILTERS = [
+    (None, None, None),
+    ((2, 2), None, None),
+    ((3, 3), None, None),
+    ((4, 5), None, None),
+    ((6, 9), None, None),
+    (None, "a", None),
+    (None, "b", None),
+    (None, "c", None),
+    (None, "z", None),
+    ((4, 4), "t", None),
+    (None, None, 2),
+    (None, None, 3),
+    (None, None, 4),
+    (None, "a", 4),
+    ((5, 5), "b", 5),
+    ((4, 4), "t", 4),
+    (None, None, 7),
+]
+
+
+def allowed(lengths, first_letter, distinct):
+    """
+    Returns the words of WORD_DICT allowed by the filter, the slow way.
+    """
+    low, high = lengths or (0, 100)
+    return sorted(
+        word
+        for words in WORD_DICT.values()
+        for word in words
+        if low <= len(word) <= high
+        and (first_letter is None or word[0] == first_letter)
+        and (distinct is None or len(set(word)) == distinct)
+    )
+
+
+@pytest.mark.parametrize("lengths, first_letter, distinct", TEST_FILTERS)
+def test_selection(lengths, first_letter, distinct):
+    selector = WordSelector(WordStore.from_word_dict(WORD_DICT))
+    expected = allowed(lengths, first_letter, distinct)
+    assert selector.count(lengths, first_letter, distinct) == len(expected)
+
+    id_ranges, _ = selector.selection(lengths, first_letter, distinct)
+    words = [
+        selector.store.word(position if ids is None else ids[position])
+        for ids, lo, hi in id_ranges
+        for position in range(lo, hi)
+    ]
+    assert sorted(words) == expected
+
+    rng = random.Random(0)
+    if expected:
+        drawn = {
+            selector.choose(rng, lengths, first_letter, distinct) for _ in range(200)
+        }
+        assert drawn == set(expected)
+    else:
+        with pytest.raises(ValueError):
+            selector.choose(rng, lengths, first_letter, distinct)
+
+
+def test_selector_lengths():
+    # The bucket of 3 letter words is empty
+    assert WordSelector(WordStore.from_word_dict(WORD_DICT)).lengths == [2, 4, 5]
+
+
+def test_choose_word():
+    word_dict = PatternIndex(WordStore.from_word_dict(WORD_DICT))
+    words = [choose_word(word_dict, random.Random(5)) for _ in range(3)]
+    assert len(set(words)) == 1
+    word = choose_word(word_dict, random.Random(5), (4, 5), "t", 4)
+    assert word in allowed((4, 5), "t", 4)
+    assert word == choose_word(word_dict, random.Random(5), (4, 5), "t", 4)
+
+
+def test_choose_word_difficulty():
+    store = WordStore.from_word_dict(WORD_DICT)
+    ratings = [word_id * 10 for word_id in range(store.num_words)]
+    word_dict = PatternIndex(store, Ratings(pack_ratings(ratings)))
+    rng = random.Random(0)
+    drawn = {choose_word(word_dict, rng, difficulty=(30, 100)) for _ in range(100)}
+    assert drawn == {store.word(word_id) for word_id in range(3, 11)}
+    with pytest.raises(ValueError):
+        choose_word(word_dict, rng, (4, 4), difficulty=(30, 100))
+    with pytest.raises(ValueError):
+        choose_word(PatternIndex(store), rng, difficulty=(30, 100))
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import pytest
+
+from words.wordfile import WordStore
+
+from . import solver
+from .patterns import Candidates, PatternIndex
+from .solver import (
+    answer_sizes,
+    choose_letter,
+    information_gain,
+    play_all,
+    play_words,
+    solve_word,
+)
+
+WORD_DICT = {"4": ["tact", "test", "text", "tilt", "bolt", "zest"]}
+
+TEST_CHOOSE_LETTER = [
+    ("frequency", "", "t"),
+    ("frequency", "t", "e"),
+    ("entropy", "", "e"),
+    ("entropy", "e", "t"),
+]
+
+TEST_INFORMATION_GAIN = [([4], 0.0), ([2, 2], 1.0), ([1, 1, 1, 1], 2.0), ([0, 3], 0.0)]
+
+
+@pytest.fixture
+def word_dict():
+    return PatternIndex(WordStore.from_word_dict(WORD_DICT))
+
+
+@pytest.mark.parametrize("strategy, guessed, expected", TEST_CHOOSE_LETTER)
+def test_choose_letter(word_dict, strategy, guessed, expected):
+    candidates = Candidates(word_dict, 4)
+    for letter in guessed:
+        candidates.guess(
+            letter, [i for i, other in enumerate("test") if other == letter]
+        )
+    assert choose_letter(candidates, guessed, strategy) == expected
+
+
+@pytest.mark.parametrize("letter", "tesxz")
+def test_answer_sizes(word_dict, letter):
+    candidates = Candidates(word_dict, 4)
+    sizes = answer_sizes(candidates, letter)
+    assert sum(sizes) == len(candidates)
+    patterns = [
+        tuple(i for i, other in enumerate(word) if other == letter)
+        for word in candidates.words()
+    ]
+    assert sorted(sizes) == sorted(
+        [patterns.count(pattern) for pattern in set(patterns)]
+        + ([0] if () not in patterns else [])
+    )
+
+
+@pytest.mark.parametrize("sizes, expected", TEST_INFORMATION_GAIN)
+def test_information_gain(sizes, expected):
+    assert information_gain(sizes) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("strategy", solver.STRATEGIES)
+@pytest.mark.parametrize("secret_word", WORD_DICT["4"])
+def test_solve_word(word_dict, strategy, secret_word):
+    won, guesses, wrong = solve_word(secret_word, word_dict, strategy)
+    assert won or strategy == "entropy"
+    assert guesses <= len(set(secret_word)) + wrong
+
+
+def test_solve_word_loses():
+    word_dict = PatternIndex(WordStore.from_word_dict({"1": ["a", "i", "o", "q"]}))
+    assert solve_word("q", word_dict, "frequency") == (False, 3, 3)
+
+
+def test_play_all_does_not_depend_on_chunks(monkeypatch):
+    games = play_all("frequency", 0, 100, 130)
+    monkeypatch.setattr(solver, "CHUNK_SIZE", 7)
+    solver.DECISIONS.clear()
+    assert play_all("frequency", 0, 100, 130) == games
+    assert games == play_words(100, 115, "frequency") + play_words(
+        115, 130, "frequency"
+    )
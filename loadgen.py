@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Load generator for the game server of server.py.
+
+Opens concurrency connections to the server, each playing sessions one
+after the other until the given number of sessions have been played, then
+prints the sessions played per second and the latency of the moves: the
+time from sending a line to receiving its answer. The players are simple:
+in Scrabble they try a word made of a few letters of the hand and end the
+hand, in Hangman they guess the most frequent letters first and ask for the
+hint after a few guesses.
+
+Run it from the terminal-games directory against a running server:
+
+    python loadgen.py --port 8765 --sessions 1000 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import Dict, List
+
+from server import HOST, PORT
+
+# Letters guessed in Hangman, most frequent first
+LETTER_ORDER = "etaoinshrdlucmfwypvbgkjqxz"
+
+# Hangman guesses before asking for the hint
+HINT_AFTER = 3
+
+GAMES = ("scrabble", "hangman")
+
+
+class Player:
+    """
+    One connection to the server, playing sessions and recording the
+    latency of every line it sends.
+    """
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        rng: random.Random,
+        latencies: List[float],
+    ) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.rng = rng
+        self.latencies = latencies
+
+    async def send(self, line: str) -> Dict:
+        start = time.perf_counter()
+        self.writer.write(line.encode() + b"\n")
+        await self.writer.drain()
+        reply = await self.reader.readline()
+        self.latencies.append(time.perf_counter() - start)
+        if not reply:
+            raise ConnectionError("the server closed the connection")
+        return json.loads(reply)
+
+    async def play(self, game: str) -> Dict:
+        """
+        Plays one session of the game and returns the last answer.
+        """
+        reply = await self.send(game)
+        if game == "scrabble":
+            letters = reply["hand"].replace(" ", "")
+            word = "".join(self.rng.sample(letters, min(len(letters), 3)))
+            reply = await self.send(word)
+            if not reply["over"]:
+                reply = await self.send(".")
+            return reply
+
+        guesses = 0
+        while not reply["over"]:
+            if guesses == HINT_AFTER:
+                reply = await self.send("*")
+            letter = next(
+                letter for letter in LETTER_ORDER if letter in reply["available"]
+            )
+            reply = await self.send(letter)
+            guesses += 1
+        return reply
+
+
+async def run(
+    host: str = HOST,
+    port: int = PORT,
+    sessions: int = 100,
+    concurrency: int = 10,
+    games: str = "both",
+    seed: int = 0,
+) -> Dict:
+    """
+    Plays the sessions against the server and returns the report: the
+    number of sessions, the time they took, the sessions per second and the
+    latency percentiles of the moves in milliseconds.
+    """
+    latencies: List[float] = []
+    remaining = iter(range(sessions))
+    played = 0
+    errors = 0
+
+    async def connection(number: int) -> None:
+        nonlocal played, errors
+        rng = random.Random(f"{seed}:{number}")
+        reader, writer = await asyncio.open_connection(host, port)
+        player = Player(reader, writer, rng, latencies)
+        try:
+            for session in remaining:
+                game = GAMES[session % 2] if games == "both" else games
+                reply = await player.play(game)
+                if "error" in reply:
+                    errors += 1
+                else:
+                    played += 1
+            writer.write(b"quit\n")
+            await writer.drain()
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(connection(number) for number in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    report = {
+        "sessions": played,
+        "errors": errors,
+        "moves": len(ordered),
+        "seconds": elapsed,
+        "sessions_per_second": played / elapsed,
+    }
+    for name, p in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100)):
+        # No moves at all, e.g. no sessions, are reported as 0 ms
+        latency = ordered[(len(ordered) - 1) * p // 100] if ordered else 0.0
+        report[f"{name}_ms"] = latency * 1e3
+    return report
+
+
+def print_report(report: Dict) -> None:
+    print(f"Sessions:   {report['sessions']} ({report['errors']} errors)")
+    print(
+        f"Time:       {report['seconds']:.2f} s "
+        f"({report['sessions_per_second']:.1f} sessions/s)"
+    )
+    print(
+        f"Moves:      {report['moves']}, latency "
+        + "  ".join(
+            f"{name} {report[f'{name}_ms']:.1f} ms"
+            for name in ("p50", "p90", "p99", "max")
+        )
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--host", default=HOST, help="address of the server")
+    parser.add_argument("--port", type=int, default=PORT, help="port of the server")
+    parser.add_argument("--sessions", type=int, default=100, help="sessions to play")
+    parser.add_argument(
+        "--concurrency", type=int, default=10, help="connections playing at once"
+    )
+    parser.add_argument(
+        "--game", choices=GAMES + ("both",), default="both", help="game to play"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed of the players")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        report = asyncio.run(
+            run(
+                args.host,
+                args.port,
+                args.sessions,
+                args.concurrency,
+                args.game,
+                args.seed,
+            )
+        )
+    except ConnectionError as error:
+        print(f"Error: {error}", file=sys.stderr)
+        sys.exit(1)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
@@ -1,7 +1,17 @@
 import os.path
 import sys
 
+PATH = os.path.abspath(os.path.dirname(__file__))
+# The words package is shared by the games and lives next to them
+sys.path.insert(1, os.path.dirname(PATH))
+
+from words.instrument import setup
+
+# --profile[=events.jsonl] records the time spent in the hot paths
+sys.argv[1:] = setup(sys.argv[1:])
+
 try:
+    import board
     import main
 except ImportError:
     print(
@@ -10,6 +20,9 @@ except ImportError:
     )
     sys.exit(1)
 
-PATH = os.path.abspath(os.path.dirname(__file__))
 main.WORDS_FILENAME = os.path.join(PATH, "words.json")
-main.play()
+# --board plays on the full board against the computer
+if "--board" in sys.argv[1:]:
+    board.play()
+else:
+    main.play()
@@ -0,0 +1,624 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Scrabble on the full 15x15 board against the computer: tiles are drawn
+from a bag of 100 tiles into racks of seven, every word after the first
+must connect to the tiles on the board and the premium squares multiply
+the letters and words placed on them.
+
+Start it from the terminal-games directory with `python scrabble --board`.
+
+The computer generates every legal move of its rack with the algorithm of
+Appel and Jacobson over the DAWG of the dictionary (see dawg.py): moves are
+grown from the anchors, the empty squares next to a tile, and every square
+has a cross-check, the set of letters forming a word with the tiles above
+and below it, so the letters tried at each square are the ones which can
+still lead to a word.
+"""
+import os
+import random
+from typing import List, NamedTuple, Optional, Tuple
+
+try:
+    from . import main
+    from .dawg import ROOT, Dawg, dawg_path, load_dawg
+    from .hand import Hand
+except ImportError:  # Started as a script with `python scrabble --board`
+    import main
+    from dawg import ROOT, Dawg, dawg_path, load_dawg
+    from hand import Hand
+
+BOARD_SIZE = 15
+RACK_SIZE = 7
+CENTER = BOARD_SIZE // 2
+
+# Points for playing all the tiles of a full rack in one move
+BINGO_BONUS = 50
+
+# The game ends after this many turns in a row without a word played
+MAX_SCORELESS_TURNS = 6
+
+# Premium squares: d/t double/triple the letter, D/T double/triple the word
+PREMIUM_LAYOUT = """
+T..d...T...d..T
+.D...t...t...D.
+..D...d.d...D..
+d..D...d...D..d
+....D.....D....
+.t...t...t...t.
+..d...d.d...d..
+T..d...D...d..T
+..d...d.d...d..
+.t...t...t...t.
+....D.....D....
+d..D...d...D..d
+..D...d.d...D..
+.D...t...t...D.
+T..d...T...d..T
+"""
+PREMIUMS = {".": (1, 1), "d": (2, 1), "t": (3, 1), "D": (1, 2), "T": (1, 3)}
+PREMIUM_SYMBOLS = {".": ".", "d": "'", "t": '"', "D": "-", "T": "="}
+
+# Number of tiles of each letter in the bag, '*' being the blank
+TILE_COUNTS = {
+    "a": 9,
+    "b": 2,
+    "c": 2,
+    "d": 4,
+    "e": 12,
+    "f": 2,
+    "g": 3,
+    "h": 2,
+    "i": 9,
+    "j": 1,
+    "k": 1,
+    "l": 4,
+    "m": 2,
+    "n": 6,
+    "o": 8,
+    "p": 2,
+    "q": 1,
+    "r": 6,
+    "s": 4,
+    "t": 6,
+    "u": 4,
+    "v": 2,
+    "w": 2,
+    "x": 1,
+    "y": 2,
+    "z": 1,
+    "*": 2,
+}
+
+COLUMNS = "ABCDEFGHIJKLMNO"
+
+PREMIUM_ROWS = PREMIUM_LAYOUT.split()
+
+# (letter multiplier, word multiplier) of every square, by row then column
+MULTIPLIERS = [[PREMIUMS[symbol] for symbol in line] for line in PREMIUM_ROWS]
+
+# Board squares hold the letter of the tile, in uppercase for a blank
+TILE_VALUES = dict(main.SCRABBLE_LETTER_VALUES)
+TILE_VALUES.update((letter.upper(), 0) for letter in main.VOWELS + main.CONSONANTS)
+
+
+class BoardMove(NamedTuple):
+    """
+    A word placed on the board. word is the whole word read along the line
+    from (row, col), including the tiles already on the board, with the
+    letters of blanks in uppercase. tiles are the tiles taken from the rack
+    with '*' for the blanks.
+    """
+
+    row: int
+    col: int
+    across: bool
+    word: str
+    tiles: str
+    score: int
+
+    @property
+    def square(self) -> str:
+        """
+        The square the word starts on, as H8 for across and 8H for down.
+        """
+        row, col = str(self.row + 1), COLUMNS[self.col]
+        return col + row if self.across else row + col
+
+
+class Bag:
+    """
+    The tiles left to draw, in random order.
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None) -> None:
+        self._rng = rng or random
+        self.tiles = [tile for tile, count in TILE_COUNTS.items() for _ in range(count)]
+        self._rng.shuffle(self.tiles)
+
+    def __len__(self) -> int:
+        return len(self.tiles)
+
+    def draw(self, count: int) -> str:
+        """
+        Returns up to count tiles taken from the bag.
+        """
+        drawn = self.tiles[len(self.tiles) - count :] if count > 0 else []
+        del self.tiles[len(self.tiles) - len(drawn) :]
+        return "".join(drawn)
+
+    def exchange(self, tiles: str) -> str:
+        """
+        Returns as many new tiles as there are in tiles and puts tiles back
+        into the bag.
+        """
+        drawn = self.draw(len(tiles))
+        self.tiles.extend(tiles)
+        self._rng.shuffle(self.tiles)
+        return drawn
+
+
+class Board:
+    """
+    The grid of squares, each one either empty ("") or holding a tile.
+    """
+
+    def __init__(self) -> None:
+        self.grid = [[""] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+
+    def __str__(self) -> str:
+        lines = ["   " + " ".join(COLUMNS)]
+        for row, line in enumerate(self.grid):
+            # Tiles are shown in uppercase and blanks in lowercase
+            squares = [
+                tile.swapcase() if tile else PREMIUM_SYMBOLS[symbol]
+                for tile, symbol in zip(line, PREMIUM_ROWS[row])
+            ]
+            lines.append(f"{row + 1:>2} " + " ".join(squares))
+        return "\n".join(lines)
+
+    def is_empty(self) -> bool:
+        # The first word covers the center square
+        return not self.grid[CENTER][CENTER]
+
+    def place(self, move: BoardMove) -> None:
+        """
+        Puts the tiles of move on the board.
+        """
+        for i, letter in enumerate(move.word):
+            if move.across:
+                self.grid[move.row][move.col + i] = letter
+            else:
+                self.grid[move.row + i][move.col] = letter
+
+
+def cross_checks(
+    grid: List[List[str]], row: int, dawg: Dawg
+) -> Tuple[List[Optional[set]], List[Optional[int]]]:
+    """
+    Returns the cross-check and the cross points of every square of the row
+    of grid. The cross-check of an empty square with tiles above or below
+    it is the set of letters forming a word with them, and its cross points
+    are the points of those tiles. Both are None for the other squares, any
+    letter can go there.
+    """
+    checks: List[Optional[set]] = [None] * BOARD_SIZE
+    points: List[Optional[int]] = [None] * BOARD_SIZE
+    for col in range(BOARD_SIZE):
+        if grid[row][col]:
+            continue
+        top = row
+        while top > 0 and grid[top - 1][col]:
+            top -= 1
+        bottom = row
+        while bottom < BOARD_SIZE - 1 and grid[bottom + 1][col]:
+            bottom += 1
+        if top == bottom:
+            continue
+        above = "".join(grid[r][col] for r in range(top, row))
+        below = "".join(grid[r][col] for r in range(row + 1, bottom + 1))
+        checks[col] = set()
+        points[col] = sum(TILE_VALUES[tile] for tile in above + below)
+        node = dawg.walk(above.lower())
+        if node is None:
+            continue
+        for letter, child in dawg.edges[node].items():
+            end = dawg.walk(below.lower(), child)
+            if end is not None and dawg.terminal[end]:
+                checks[col].add(letter)
+    return checks, points
+
+
+def line_moves(
+    grid: List[List[str]],
+    rack: Hand,
+    dawg: Dawg,
+    across: bool,
+    first: bool,
+    moves: List[BoardMove],
+) -> None:
+    """
+    Appends to moves every move of the rack along the rows of grid, which
+    is the board itself for the words across and the board transposed for
+    the words down.
+    """
+    edges, terminal = dawg.edges, dawg.terminal
+    counts = dict(rack.items())
+    counts.setdefault("*", 0)
+    rack_size = len(rack)
+
+    def take(tile: str) -> None:
+        counts["*" if tile.isupper() else tile] -= 1
+
+    def give_back(tile: str) -> None:
+        counts["*" if tile.isupper() else tile] += 1
+
+    def tile_choices(letter: str) -> Tuple[str, ...]:
+        # The tile of the letter and the blank standing for it, if any
+        if counts.get(letter):
+            return (letter, letter.upper()) if counts["*"] else (letter,)
+        return (letter.upper(),) if counts["*"] else ()
+
+    for row in range(BOARD_SIZE):
+        line = grid[row]
+        if first:
+            if row != CENTER:
+                continue
+            anchors = [CENTER]
+            checks, points = [None] * BOARD_SIZE, [None] * BOARD_SIZE
+        else:
+            checks, points = cross_checks(grid, row, dawg)
+            anchors = [
+                col
+                for col in range(BOARD_SIZE)
+                if not line[col]
+                and (
+                    points[col] is not None
+                    or (col > 0 and line[col - 1])
+                    or (col < BOARD_SIZE - 1 and line[col + 1])
+                )
+            ]
+        multipliers = [
+            MULTIPLIERS[row][col] if across else MULTIPLIERS[col][row]
+            for col in range(BOARD_SIZE)
+        ]
+
+        def record(start, end, word, tiles, main_points, word_mult, cross_total):
+            score = main_points * word_mult + (cross_total or 0)
+            if len(tiles) == RACK_SIZE:
+                score += BINGO_BONUS
+            if across:
+                moves.append(BoardMove(row, start, True, word, tiles, score))
+            else:
+                moves.append(BoardMove(start, row, False, word, tiles, score))
+
+        def extend_right(anchor, start, col, node, word, tiles, main, mult, cross):
+            if col < BOARD_SIZE and line[col]:
+                tile = line[col]
+                child = edges[node].get(tile.lower())
+                if child is not None:
+                    extend_right(
+                        anchor,
+                        start,
+                        col + 1,
+                        child,
+                        word + tile,
+                        tiles,
+                        main + TILE_VALUES[tile],
+                        mult,
+                        cross,
+                    )
+                return
+            if col > anchor and terminal[node]:
+                record(start, col, word, tiles, main, mult, cross)
+            if col == BOARD_SIZE or len(tiles) == rack_size:
+                return
+            check = checks[col]
+            cross_points = points[col]
+            letter_mult, word_mult = multipliers[col]
+            for letter, child in edges[node].items():
+                if check is not None and letter not in check:
+                    continue
+                for tile in tile_choices(letter):
+                    value = TILE_VALUES[tile] * letter_mult
+                    new_cross = cross
+                    if cross_points is not None:
+                        new_cross = (cross or 0) + (cross_points + value) * word_mult
+                    take(tile)
+                    extend_right(
+                        anchor,
+                        start,
+                        col + 1,
+                        child,
+                        word + tile,
+                        tiles + ("*" if tile.isupper() else tile),
+                        main + value,
+                        mult * word_mult,
+                        new_cross,
+                    )
+                    give_back(tile)
+
+        def left_part(anchor, prefix, tiles, node, limit):
+            # The prefix goes on the empty squares left of the anchor, which
+            # have no cross-checks, only their premiums count
+            start = anchor - len(prefix)
+            main, mult = 0, 1
+            for i, tile in enumerate(prefix):
+                letter_mult, word_mult = multipliers[start + i]
+                main += TILE_VALUES[tile] * letter_mult
+                mult *= word_mult
+            extend_right(anchor, start, anchor, node, prefix, tiles, main, mult, None)
+            if not limit:
+                return
+            for letter, child in edges[node].items():
+                for tile in tile_choices(letter):
+                    take(tile)
+                    left_part(
+                        anchor,
+                        prefix + tile,
+                        tiles + ("*" if tile.isupper() else tile),
+                        child,
+                        limit - 1,
+                    )
+                    give_back(tile)
+
+        previous_anchor = -1
+        for anchor in anchors:
+            if anchor > 0 and line[anchor - 1]:
+                # The tiles left of the anchor are the start of the word
+                start = anchor - 1
+                while start > 0 and line[start - 1]:
+                    start -= 1
+                prefix = "".join(line[start:anchor])
+                node = dawg.walk(prefix.lower())
+                if node is not None:
+                    main = sum(TILE_VALUES[tile] for tile in prefix)
+                    extend_right(anchor, start, anchor, node, prefix, "", main, 1, None)
+            else:
+                limit = min(anchor - previous_anchor - 1, rack_size - 1)
+                left_part(anchor, "", "", ROOT, limit)
+            previous_anchor = anchor
+
+
+def generate_moves(board: Board, rack: Hand, dawg: Dawg) -> List[BoardMove]:
+    """
+    Returns every legal move of the tiles of rack on the board, with its
+    score. A single tile forming words both ways is returned both across
+    and down, the two moves scoring the same, so that either spelling of it
+    is a legal move.
+    """
+    rack = Hand.of(rack)
+    moves: List[BoardMove] = []
+    if not len(rack):
+        return moves
+    first = board.is_empty()
+    transposed = [list(column) for column in zip(*board.grid)]
+    line_moves(board.grid, rack, dawg, True, first, moves)
+    line_moves(transposed, rack, dawg, False, first, moves)
+    return moves
+
+
+def comp_choose_board_move(board: Board, rack: Hand, dawg: Dawg) -> Optional[BoardMove]:
+    """
+    Returns the highest scoring move of the rack, or None if it has none.
+    """
+    moves = generate_moves(board, rack, dawg)
+    return max(moves, key=lambda move: move.score) if moves else None
+
+
+def parse_square(square: str) -> Tuple[int, int, bool]:
+    """
+    Returns (row, col, across) of a square written as H8 for a word across
+    starting on column H and row 8, and as 8H for a word down. Raises
+    ValueError if it isn't a square of the board.
+    """
+    square = square.upper()
+    across = square[:1].isalpha()
+    col_name, row_name = (
+        (square[:1], square[1:]) if across else (square[-1:], square[:-1])
+    )
+    if col_name not in COLUMNS or not row_name.isdigit():
+        raise ValueError(f'"{square}" is not a square, try H8 or 8H.')
+    row = int(row_name) - 1
+    if not 0 <= row < BOARD_SIZE:
+        raise ValueError(f'"{square}" is not a square, try H8 or 8H.')
+    return row, COLUMNS.index(col_name), across
+
+
+def find_move(
+    board: Board, rack: Hand, dawg: Dawg, square: str, word: str
+) -> BoardMove:
+    """
+    Returns the move placing word from square (see parse_square), the
+    letters of blanks being in uppercase in word. Raises ValueError with
+    the reason if it isn't a legal move of the rack.
+    """
+    row, col, across = parse_square(square)
+    if not word.isalpha() or not word.isascii():
+        raise ValueError(f'"{word}" is not a word.')
+    end = (col if across else row) + len(word)
+    if end > BOARD_SIZE:
+        raise ValueError(f'"{word}" doesn\'t fit on the board.')
+
+    tiles = ""
+    for i, letter in enumerate(word):
+        tile = board.grid[row][col + i] if across else board.grid[row + i][col]
+        if not tile:
+            tiles += "*" if letter.isupper() else letter
+        elif tile.lower() != letter.lower():
+            raise ValueError(f'"{word}" doesn\'t match the tiles on the board.')
+    if not tiles:
+        raise ValueError("Place at least one tile from your rack.")
+    if not Hand.of(rack).can_form(tiles):
+        raise ValueError(f"You don't have the tiles {tiles.upper()!r}.")
+    if not dawg.is_word(word.lower()):
+        raise ValueError(f'"{word}" is not in the dictionary.')
+
+    for move in generate_moves(board, Hand(tiles), dawg):
+        if (move.row, move.col, move.across) == (row, col, across) and (
+            move.word.lower() == word.lower() and move.tiles == tiles
+        ):
+            return move
+    if board.is_empty():
+        raise ValueError("The first word must cover the center square.")
+    raise ValueError(
+        "The word must connect to the tiles on the board, include the tiles "
+        "right before and after it, and form words across and down."
+    )
+
+
+class BoardGame:
+    """
+    A game on the board: the bag, the board, the rack and the score of each
+    player, whose turn it is and how many turns were played in a row
+    without a word.
+    """
+
+    def __init__(
+        self, dawg: Dawg, players: int = 2, rng: Optional[random.Random] = None
+    ) -> None:
+        self.dawg = dawg
+        self.bag = Bag(rng)
+        self.board = Board()
+        self.racks = [Hand(self.bag.draw(RACK_SIZE)) for _ in range(players)]
+        self.scores = [0] * players
+        self.turn = 0
+        self.scoreless_turns = 0
+
+    @property
+    def rack(self) -> Hand:
+        """
+        The rack of the player whose turn it is.
+        """
+        return self.racks[self.turn]
+
+    def is_over(self) -> bool:
+        return self.scoreless_turns >= MAX_SCORELESS_TURNS or (
+            not self.bag and not all(self.racks)
+        )
+
+    def play_move(self, move: BoardMove) -> None:
+        """
+        Places move for the player whose turn it is, who draws new tiles.
+        """
+        self.board.place(move)
+        rack = self.rack.minus(move.tiles)
+        self.racks[self.turn] = rack.plus(self.bag.draw(RACK_SIZE - len(rack)))
+        self.scores[self.turn] += move.score
+        self.scoreless_turns = 0
+        self._next_turn()
+
+    def exchange(self, tiles: str = "") -> None:
+        """
+        Puts tiles of the rack back into the bag for as many new ones, or
+        passes the turn without tiles.
+        """
+        if tiles:
+            self.racks[self.turn] = self.rack.minus(tiles).plus(
+                self.bag.exchange(tiles)
+            )
+        self.scoreless_turns += 1
+        self._next_turn()
+
+    def final_scores(self) -> List[int]:
+        """
+        Returns the scores with the value of the tiles left on each rack
+        taken off, and added to the score of the player who used all theirs.
+        """
+        left = [
+            sum(TILE_VALUES[tile] * count for tile, count in rack.items())
+            for rack in self.racks
+        ]
+        return [
+            score - left[player] + (sum(left) if not self.racks[player] else 0)
+            for player, score in enumerate(self.scores)
+        ]
+
+    def _next_turn(self) -> None:
+        self.turn = (self.turn + 1) % len(self.racks)
+
+
+def player_turn(game: BoardGame) -> None:
+    """
+    Asks the player for a move until it is a legal one, then plays it.
+    """
+    while True:
+        print(f"\nYour rack: {main.display_hand(game.rack)}")
+        player_input = input(
+            'Enter a move as "H8 word" (across) or "8H word" (down), "-letters" '
+            'to exchange them, or "." to pass: '
+        ).strip()
+
+        if player_input == ".":
+            game.exchange()
+            return
+
+        if player_input.startswith("-"):
+            tiles = player_input[1:].lower()
+            if len(game.bag) < RACK_SIZE:
+                print("There are not enough tiles left in the bag to exchange.")
+            elif not tiles or not game.rack.can_form(tiles):
+                print(f"You don't have the tiles {tiles.upper()!r}.")
+            else:
+                game.exchange(tiles)
+                return
+            continue
+
+        parts = player_input.split()
+        if len(parts) != 2:
+            print(f'"{player_input}": Invalid input.')
+            continue
+        try:
+            move = find_move(game.board, game.rack, game.dawg, *parts)
+        except ValueError as error:
+            print(error)
+            continue
+        game.play_move(move)
+        print(f'"{move.word}" earned {move.score} points.')
+        return
+
+
+def comp_turn(game: BoardGame) -> None:
+    """
+    Plays the best move of the computer, exchanging its rack if it has no
+    move.
+    """
+    move = comp_choose_board_move(game.board, game.rack, game.dawg)
+    if move is None:
+        if len(game.bag) >= RACK_SIZE:
+            print("Computer exchanged its tiles.")
+            game.exchange("".join(tile * count for tile, count in game.rack.items()))
+        else:
+            print("Computer passed.")
+            game.exchange()
+        return
+    game.play_move(move)
+    print(f'Computer played "{move.word}" at {move.square} for {move.score} points.')
+
+
+def play() -> None:
+    """Initialize the game"""
+    word_dict = main.load_words()
+    here = os.path.dirname(os.path.abspath(__file__))
+    path = dawg_path(os.path.join(here, main.WORDS_FILENAME))
+    game = BoardGame(load_dawg(word_dict.store, path))
+    turns = [player_turn, comp_turn]
+
+    while not game.is_over():
+        print(
+            f"{main.LINE_SEP}\n{game.board}\n\n"
+            f"Player: {game.scores[0]}  Computer: {game.scores[1]}  "
+            f"Tiles in the bag: {len(game.bag)}"
+        )
+        turns[game.turn](game)
+
+    player_score, comp_score = game.final_scores()
+    print(
+        f"{main.LINE_SEP}\n{game.board}\n{main.LINE_SEP}\nGAME OVER. Final points:\n"
+        f"Player: {player_score}\nComputer: {comp_score}\n"
+        f"Thank you for playing.\n{main.LINE_SEP}"
+    )
+
+
+if __name__ == "__main__":
+    play()
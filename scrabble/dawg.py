@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Directed acyclic word graph (DAWG) of the dictionary, used by the board
+game to generate moves (see board.py).
+
+The DAWG is the trie of the words with the equivalent subtrees merged: a
+node is reached by the prefix of one or more words and has an edge for
+every letter which can follow that prefix. Building it takes a couple of
+seconds, so it is cached next to words.json in a file of this layout (all
+integers are unsigned 32 bit little-endian):
+
+    magic       8 bytes, MAGIC
+    digest      32 bytes, digest of the words it was built from
+    counts      number of nodes, number of edges
+    first       number of nodes + 1 offsets into the edges
+    terminal    one byte per node, 1 if a word ends at the node
+    letters     one byte per edge, the letter of the edge
+    targets     one integer per edge, the node the edge leads to
+
+The edges of the node n are the ones in range(first[n], first[n + 1]) and
+the root is the node 0.
+"""
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from words.wordfile import WordStore
+
+MAGIC = b"TGDAWG\x01\x00"
+HEADER = struct.Struct("<8s32sII")
+ROOT = 0
+
+
+def dawg_path(json_path: str) -> str:
+    """
+    Returns the path of the cached DAWG for the given words.json.
+    """
+    return os.path.splitext(json_path)[0] + ".dawg"
+
+
+class Dawg:
+    """
+    Minimal DAWG of a list of words. edges[node] maps each letter which can
+    follow the prefix of node to the next node and terminal[node] is 1 if
+    the prefix is a word.
+    """
+
+    def __init__(self, edges: List[Dict[str, int]], terminal: bytes) -> None:
+        self.edges = edges
+        self.terminal = terminal
+
+    @classmethod
+    def from_words(cls, words: Iterable[str]) -> "Dawg":
+        """
+        Builds the DAWG of words in a single pass over the sorted words,
+        merging every subtree into an equal one already built as soon as no
+        word can add to it anymore.
+        """
+        edges: List[Optional[Dict[str, int]]] = [{}]
+        terminal = bytearray(1)
+        register: Dict[Tuple, int] = {}
+        # Path of the previous word, as (parent, letter, child) edges
+        unchecked: List[Tuple[int, str, int]] = []
+
+        def minimize(down_to: int) -> None:
+            while len(unchecked) > down_to:
+                parent, letter, child = unchecked.pop()
+                key = (terminal[child], tuple(edges[child].items()))
+                node = register.setdefault(key, child)
+                if node != child:
+                    edges[parent][letter] = node
+                    edges[child] = None
+
+        previous = ""
+        for word in sorted(set(words)):
+            common = 0
+            for a, b in zip(word, previous):
+                if a != b:
+                    break
+                common += 1
+            minimize(common)
+            node = unchecked[-1][2] if unchecked else ROOT
+            for letter in word[common:]:
+                edges.append({})
+                terminal.append(0)
+                edges[node][letter] = len(edges) - 1
+                unchecked.append((node, letter, len(edges) - 1))
+                node = len(edges) - 1
+            terminal[node] = 1
+            previous = word
+        minimize(0)
+
+        # Number the nodes left from 0 in the order they are reached
+        numbers = {ROOT: 0}
+        order = [ROOT]
+        for node in order:
+            for child in edges[node].values():
+                if child not in numbers:
+                    numbers[child] = len(order)
+                    order.append(child)
+        return cls(
+            [
+                {letter: numbers[child] for letter, child in edges[node].items()}
+                for node in order
+            ],
+            bytes(terminal[node] for node in order),
+        )
+
+    @classmethod
+    def from_bytes(cls, buffer: bytes, digest: Optional[bytes] = None) -> "Dawg":
+        """
+        Reads a DAWG in the cached file layout. Raises ValueError if the
+        buffer is not a DAWG or, when digest is given, if it was built from
+        other words.
+        """
+        magic, file_digest, num_nodes, num_edges = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("Not a DAWG file.")
+        if digest is not None and file_digest != digest:
+            raise ValueError("The DAWG file is out of date.")
+        pos = HEADER.size
+        first = array("I", buffer[pos : pos + (num_nodes + 1) * 4])
+        pos += (num_nodes + 1) * 4
+        terminal = bytes(buffer[pos : pos + num_nodes])
+        pos += num_nodes
+        letters = buffer[pos : pos + num_edges].decode("ascii")
+        pos += num_edges
+        targets = array("I", buffer[pos : pos + num_edges * 4])
+        if len(targets) != num_edges or len(first) != num_nodes + 1:
+            raise ValueError("Truncated DAWG file.")
+        if sys.byteorder == "big":
+            first.byteswap()
+            targets.byteswap()
+        edges = [
+            dict(zip(letters[start:stop], targets[start:stop]))
+            for start, stop in zip(first, first[1:])
+        ]
+        return cls(edges, terminal)
+
+    def to_bytes(self, digest: bytes = bytes(32)) -> bytes:
+        """
+        Returns the DAWG in the cached file layout.
+        """
+        first = array("I", [0])
+        letters = []
+        targets = array("I")
+        for node_edges in self.edges:
+            letters.extend(node_edges)
+            targets.extend(node_edges.values())
+            first.append(len(targets))
+        if sys.byteorder == "big":
+            first.byteswap()
+            targets.byteswap()
+        header = HEADER.pack(MAGIC, digest, len(self.edges), len(targets))
+        return b"".join(
+            [
+                header,
+                first.tobytes(),
+                self.terminal,
+                "".join(letters).encode("ascii"),
+                targets.tobytes(),
+            ]
+        )
+
+    def __len__(self) -> int:
+        return len(self.edges)
+
+    def walk(self, letters: str, node: int = ROOT) -> Optional[int]:
+        """
+        Returns the node reached by following letters from node, or None if
+        no word continues that way.
+        """
+        for letter in letters:
+            node = self.edges[node].get(letter)
+            if node is None:
+                return None
+        return node
+
+    def is_word(self, word: str) -> bool:
+        node = self.walk(word)
+        return node is not None and self.terminal[node] == 1
+
+
+def load_dawg(store: WordStore, path: str) -> Dawg:
+    """
+    Returns the DAWG of the words in store, read from the file at path if it
+    was built from the same words, otherwise built and written to path for
+    the next time. The DAWG is not cached if the words have no digest or if
+    the file can't be written.
+    """
+    cache = any(store.digest)
+    if cache and os.path.exists(path):
+        try:
+            with open(path, "rb") as dawg_file:
+                return Dawg.from_bytes(dawg_file.read(), store.digest)
+        except (OSError, ValueError, struct.error):
+            pass
+
+    dawg = Dawg.from_words(store.word(word_id) for word_id in range(store.num_words))
+    if cache:
+        try:
+            with open(path + ".tmp", "wb") as dawg_file:
+                dawg_file.write(dawg.to_bytes(store.digest))
+            os.replace(path + ".tmp", path)
+        except OSError:
+            pass
+    return dawg
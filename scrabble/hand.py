@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from string import ascii_lowercase
+from typing import Dict, Iterator, Mapping, Tuple, Union
+
+# Letters a hand can hold, the slot of a letter in the counts is its index
+LETTERS = ascii_lowercase + "*"
+SLOTS = {letter: slot for slot, letter in enumerate(LETTERS)}
+
+
+class Hand:
+    """
+    A hand of letters, stored as the number of times each letter of LETTERS
+    is in the hand. Hands are immutable: every operation returns a new hand,
+    so a hand can be kept as a snapshot, shared or used as a dictionary key
+    without copying it.
+
+    A hand reads like the dictionary of letter counts it replaces: hand[letter]
+    is the count of the letter (0 if it is not in the hand), iterating yields
+    the letters in the hand and letter in hand is True if its count is not 0.
+    len(hand) is the number of letters in the hand.
+    """
+
+    __slots__ = ("counts", "_length")
+
+    def __init__(self, letters: Union[str, Mapping[str, int]] = "") -> None:
+        counts = bytearray(len(LETTERS))
+        if isinstance(letters, str):
+            for letter in letters:
+                counts[SLOTS[letter]] += 1
+        else:
+            for letter, count in letters.items():
+                counts[SLOTS[letter]] += count
+        self.counts = bytes(counts)
+        self._length = sum(counts)
+
+    @classmethod
+    def of(cls, hand: Union["Hand", Mapping[str, int]]) -> "Hand":
+        """
+        Returns hand itself if it is already a Hand, otherwise builds one
+        from the dictionary of letter counts.
+        """
+        return hand if isinstance(hand, cls) else cls(hand)
+
+    @classmethod
+    def _from_counts(cls, counts: Union[bytes, bytearray], length: int) -> "Hand":
+        hand = cls.__new__(cls)
+        hand.counts = bytes(counts)
+        hand._length = length
+        return hand
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, letter: str) -> int:
+        return self.counts[SLOTS[letter]]
+
+    def __contains__(self, letter: object) -> bool:
+        return letter in SLOTS and self.counts[SLOTS[letter]] > 0
+
+    def __iter__(self) -> Iterator[str]:
+        return (letter for letter, count in zip(LETTERS, self.counts) if count)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Hand):
+            return self.counts == other.counts
+        if isinstance(other, Mapping):
+            return dict(self.items()) == {k: v for k, v in other.items() if v}
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.counts)
+
+    def __repr__(self) -> str:
+        return f"Hand({dict(self.items())!r})"
+
+    def get(self, letter: str, default: int = 0) -> int:
+        slot = SLOTS.get(letter)
+        return default if slot is None else self.counts[slot]
+
+    def keys(self) -> Iterator[str]:
+        return iter(self)
+
+    def items(self) -> Iterator[Tuple[str, int]]:
+        return ((letter, count) for letter, count in zip(LETTERS, self.counts) if count)
+
+    def to_dict(self) -> Dict[str, int]:
+        """
+        Returns the hand as a dictionary of letter counts.
+        """
+        return dict(self.items())
+
+    def can_form(self, word: str) -> bool:
+        """
+        Returns True if every letter of word, including the wildcard '*', is
+        in the hand at least as many times as in word.
+        """
+        if len(word) > self._length:
+            return False
+        counts = bytearray(self.counts)
+        for letter in word:
+            slot = SLOTS.get(letter)
+            if slot is None or not counts[slot]:
+                return False
+            counts[slot] -= 1
+        return True
+
+    def can_cover(self, word: str, wild_letters: str) -> bool:
+        """
+        Returns True if the hand can form word when its wildcards '*' stand
+        for the letters of word which are not in the hand, as long as those
+        letters are in wild_letters. Wildcards in word use wildcards of the
+        hand as well.
+        """
+        if len(word) > self._length:
+            return False
+        counts = bytearray(self.counts)
+        wild_slot = SLOTS["*"]
+        for letter in word:
+            slot = SLOTS.get(letter)
+            if slot is None:
+                return False
+            if counts[slot]:
+                counts[slot] -= 1
+            elif counts[wild_slot] and letter in wild_letters:
+                counts[wild_slot] -= 1
+            else:
+                return False
+        return True
+
+    def minus(self, word: str) -> "Hand":
+        """
+        Returns the hand without the letters of word. Letters of word which
+        are not in the hand (or not anymore) are ignored.
+        """
+        counts = bytearray(self.counts)
+        length = self._length
+        for letter in word:
+            slot = SLOTS.get(letter)
+            if slot is not None and counts[slot]:
+                counts[slot] -= 1
+                length -= 1
+        return Hand._from_counts(counts, length)
+
+    def plus(self, letters: str) -> "Hand":
+        """
+        Returns the hand with the letters added.
+        """
+        counts = bytearray(self.counts)
+        for letter in letters:
+            counts[SLOTS[letter]] += 1
+        return Hand._from_counts(counts, self._length + len(letters))
+
+    def replace(self, letter: str, new_letter: str) -> "Hand":
+        """
+        Returns the hand with every copy of letter replaced by new_letter.
+        """
+        if letter == new_letter:
+            return self
+        counts = bytearray(self.counts)
+        counts[SLOTS[new_letter]] += counts[SLOTS[letter]]
+        counts[SLOTS[letter]] = 0
+        return Hand._from_counts(counts, self._length)
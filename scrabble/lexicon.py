@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from itertools import groupby, product, repeat
+from string import ascii_lowercase
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+from words.instrument import PROFILER
+from words.wordfile import WordStore
+
+# Most words matches looks up one by one before scanning lists instead
+MAX_PATTERN_EXPANSIONS = 676
+
+
+def word_code(word: str) -> str:
+    """
+    Returns the key of the list a word belongs to in the word dictionary:
+    the length of the word followed by its first letter.
+    """
+    return str(len(word)) + word[0]
+
+
+def signature(word: str) -> str:
+    """
+    Returns the anagram signature of a word: its letters in sorted order.
+    Two words share a signature if and only if they are anagrams.
+    """
+    return "".join(sorted(word))
+
+
+def sub_signatures(
+    hand: Dict[str, int],
+    wild_letters: str = "",
+    letter_values: Optional[Dict[str, int]] = None,
+    min_length: int = 2,
+) -> Iterator[Tuple[str, str, int]]:
+    """
+    Yields (signature, wildcard letter, points) for every sub-multiset of the
+    letters in hand having at least min_length letters, in a single pass. If
+    the hand holds a wildcard '*', every sub-multiset is also yielded with one
+    of wild_letters added, the wildcard letter being the letter added.
+    Otherwise the wildcard letter is "". points is the sum of the values of
+    the letters of the signature in letter_values, or 0 without it.
+    """
+    if not hand.get("*"):
+        wild_letters = ""
+    letter_values = letter_values or {}
+    letters = sorted(letter for letter in hand if letter != "*" and hand[letter] > 0)
+
+    # Build the sub-multisets one letter at a time along with their points
+    subs = [("", 0)]
+    for letter in letters:
+        value = letter_values.get(letter, 0)
+        subs = [
+            (sub + letter * count, points + value * count)
+            for sub, points in subs
+            for count in range(hand[letter] + 1)
+        ]
+
+    wild_values = [(letter, letter_values.get(letter, 0)) for letter in wild_letters]
+    for sub, points in subs:
+        if len(sub) >= min_length:
+            yield sub, "", points
+        if len(sub) + 1 < min_length:
+            continue
+        for wild_letter, value in wild_values:
+            i = bisect_left(sub, wild_letter)
+            yield sub[:i] + wild_letter + sub[i:], wild_letter, points + value
+
+
+def count_sub_signatures(hand: Dict[str, int], wild_letters: str = "") -> int:
+    """
+    Returns about how many entries sub_signatures yields for the hand, which
+    grows exponentially with the number of different letters in the hand.
+    """
+    count = 1
+    for letter in hand:
+        if letter != "*":
+            count *= hand[letter] + 1
+    return count * (1 + len(wild_letters)) if hand.get("*") else count
+
+
+class Candidates:
+    """
+    The candidate signatures of a hand, see sub_signatures. Every entry is a
+    tuple (signature, wildcard letter, points) where points is the sum of
+    the values of the letters of the signature, which is the same for all
+    of its words.
+
+    As letters are played, the candidates of the smaller hand are narrowed
+    down from the candidates of the previous hand: the ids of the words
+    already looked up for a signature are kept, and signatures known to
+    have no words are dropped.
+
+    The entries are only enumerated when they are first read, so making the
+    candidates of a hand costs nothing if they end up not being needed.
+    """
+
+    __slots__ = ("_hand", "_entries", "_wild_letters", "_letter_values", "_word_ids")
+
+    def __init__(
+        self,
+        hand: Dict[str, int],
+        wild_letters: str = "",
+        letter_values: Optional[Dict[str, int]] = None,
+        word_ids: Optional[Dict[str, Tuple[int, ...]]] = None,
+    ) -> None:
+        """
+        Makes the candidates for every sub-multiset of the hand, with the
+        wildcard standing for each of wild_letters. Their points are counted
+        with letter_values if it is given.
+        """
+        self._hand = hand
+        self._entries: Optional[List[Tuple[str, str, int]]] = None
+        self._wild_letters = wild_letters
+        self._letter_values = letter_values
+        self._word_ids = {} if word_ids is None else word_ids
+
+    @property
+    def entries(self) -> List[Tuple[str, str, int]]:
+        if self._entries is None:
+            known = self._word_ids
+            self._entries = [
+                entry
+                for entry in sub_signatures(
+                    self._hand, self._wild_letters, self._letter_values
+                )
+                if known.get(entry[0]) != ()
+            ]
+        return self._entries
+
+    def __iter__(self) -> Iterator[Tuple[str, str, int]]:
+        return iter(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def word_ids(self, sig: str, lexicon: "Lexicon") -> Tuple[int, ...]:
+        """
+        Returns the ids of the words having the signature sig, in ascending
+        order.
+        """
+        word_ids = self._word_ids.get(sig)
+        if word_ids is None:
+            word_ids = self._word_ids[sig] = tuple(lexicon.anagram_ids(sig))
+        return word_ids
+
+    def narrow(self, hand: Dict[str, int]) -> "Candidates":
+        """
+        Returns the candidates of hand, which holds a subset of the letters
+        of the hand these candidates were made for. The candidates of the
+        smaller hand are a subset of these ones: they are enumerated from the
+        smaller hand directly, which costs less than filtering this set.
+        """
+        return Candidates(hand, self._wild_letters, self._letter_values, self._word_ids)
+
+
+class Lexicon(Mapping):
+    """
+    The word dictionary as loaded from the words file: keys are the word
+    codes (length of the word followed by its first letter) and values are
+    the list of words with that code. The words are held in a compact
+    WordStore, a word id is the position of the word in the store which is
+    also its position when iterating over all the lists in order.
+
+    On top of the store it keeps a frozenset for every list asked about for
+    constant time membership tests, and an anagram index to find the words
+    having a given signature. Both are built on first use, the anagram index
+    can be built beforehand with build_anagram_index. The indexes are built
+    under a lock, threads sharing the lexicon (see main.SpeculativePlay)
+    may ask for them at the same time.
+
+    The lexicon is built once and must not be mutated afterwards.
+    """
+
+    def __init__(self, word_dict: Dict[str, List[str]]) -> None:
+        if not isinstance(word_dict, WordStore):
+            word_dict = WordStore.from_word_dict(word_dict)
+        self.store = word_dict
+        self._buckets: Dict[str, FrozenSet[str]] = {}
+        self._sig_hashes = None
+        self._sig_ids = None
+        self._signature_index: Optional[SignatureIndex] = None
+        self._lock = threading.Lock()
+
+    def __getitem__(self, code: str) -> List[str]:
+        return self.store[code]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store)
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    @classmethod
+    def of(cls, word_dict: Dict[str, List[str]]) -> "Lexicon":
+        """
+        Returns word_dict itself if it is already a lexicon, otherwise builds
+        one from it. Build the lexicon once (see load_words) and pass it
+        around to avoid paying for the conversion on every call.
+        """
+        return word_dict if isinstance(word_dict, cls) else cls(word_dict)
+
+    def word(self, word_id: int) -> str:
+        """
+        Returns the word with the given id.
+        """
+        return self.store.word(word_id)
+
+    def is_word(self, word: str) -> bool:
+        """
+        Returns True if word is in the dictionary. Takes constant time
+        regardless of the size of the list the word belongs to.
+        """
+        if not word:
+            return False
+        code = word_code(word)
+        if code not in self._buckets:
+            if code not in self.store:
+                return False
+            self._buckets[code] = frozenset(self.store[code])
+        return word in self._buckets[code]
+
+    def matches(self, pattern: str, wild_letters: str) -> bool:
+        """
+        Returns True if a word of the dictionary matches pattern, where every
+        wildcard '*' of pattern stands for any of wild_letters. The words
+        checked are counted as scrabble.wildcard_expansions by PROFILER.
+        """
+        wildcards = pattern.count("*")
+        if len(wild_letters) ** wildcards <= MAX_PATTERN_EXPANSIONS:
+            # Few enough words to look each of them up
+            template = pattern.replace("*", "{}")
+            words = (
+                template.format(*letters)
+                for letters in product(wild_letters, repeat=wildcards)
+            )
+            is_match = self.is_word
+        else:
+            # Otherwise scan the lists the matching words belong to
+            if pattern[0] == "*":
+                codes = [str(len(pattern)) + letter for letter in wild_letters]
+            else:
+                codes = [word_code(pattern)]
+            words = (
+                word
+                for code in codes
+                if code in self.store
+                for word in self.store[code]
+            )
+            is_match = re.compile(pattern.replace("*", f"[{wild_letters}]")).fullmatch
+        checked = 0
+        found = False
+        for word in words:
+            checked += 1
+            if is_match(word):
+                found = True
+                break
+        if PROFILER.enabled:
+            PROFILER.count("scrabble.wildcard_expansions", checked)
+        return found
+
+    def build_anagram_index(self) -> None:
+        """
+        Builds the anagram index used by anagram_ids, unless it is built.
+        """
+        if self._sig_hashes is not None:
+            return
+        with self._lock:
+            if self._sig_hashes is not None:
+                return
+            # The index is two parallel arrays sorted by the hash of the
+            # signature, then by word id: 12 bytes per word instead of a dict
+            # holding a signature string and a list for every word.
+            entries = sorted(
+                (hash(signature(self.store.word(word_id))), word_id)
+                for word_id in range(self.store.num_words)
+            )
+            # The ids first, anagram_ids only checks the hashes are built
+            self._sig_ids = array("I", [word_id for _, word_id in entries])
+            self._sig_hashes = array("q", [sig_hash for sig_hash, _ in entries])
+
+    def anagram_ids(self, sig: str) -> Iterator[int]:
+        """
+        Yields the ids of the words having the signature sig in ascending
+        order.
+        """
+        self.build_anagram_index()
+        sig_hash = hash(sig)
+        i = bisect_left(self._sig_hashes, sig_hash)
+        while i < len(self._sig_hashes) and self._sig_hashes[i] == sig_hash:
+            word_id = self._sig_ids[i]
+            # Different signatures can share a hash
+            if signature(self.store.word(word_id)) == sig:
+                yield word_id
+            i += 1
+
+    def signature_index(self, letter_values: Dict[str, int]) -> "SignatureIndex":
+        """
+        Returns the signature index of the lexicon for the given letter
+        values. It is built on first use.
+        """
+        index = self._signature_index
+        if index is None or index.letter_values != letter_values:
+            with self._lock:
+                index = self._signature_index
+                if index is None or index.letter_values != letter_values:
+                    index = SignatureIndex(self, letter_values)
+                    self._signature_index = index
+        return index
+
+
+def bitset(positions: List[int], size: int) -> int:
+    """
+    Returns the int with the bits at positions set, out of size bits.
+    """
+    bits = bytearray(b"0" * size)
+    for position in positions:
+        bits[position] = 49  # "1"
+    bits.reverse()
+    return int(bits, 2)
+
+
+class SignatureIndex:
+    """
+    The different signatures of the words of a lexicon grouped by length.
+    In every group the signatures are sorted by points, the sum of the
+    values of their letters in letter_values, from the highest down.
+
+    For every letter and count k, a group has a bitset (an int) whose bit j
+    is set if signature j holds the letter at least k times. The signatures
+    of a group which a hand can make are found with a few operations on
+    these bitsets, instead of a loop over the signatures.
+    """
+
+    def __init__(self, lexicon: Lexicon, letter_values: Dict[str, int]) -> None:
+        self.letter_values = dict(letter_values)
+        by_length: Dict[int, set] = {}
+        for word_id in range(lexicon.store.num_words):
+            word = lexicon.store.word(word_id)
+            by_length.setdefault(len(word), set()).add(signature(word))
+
+        self.signatures: Dict[int, List[str]] = {}
+        self.points: Dict[int, List[int]] = {}
+        # bits[length][slot][k - 1] is the bitset of the signatures holding
+        # ascii_lowercase[slot] at least k times
+        self.bits: Dict[int, List[List[int]]] = {}
+        for length, sigs in by_length.items():
+            points = {sig: sum(map(letter_values.get, sig, repeat(0))) for sig in sigs}
+            ordered = sorted(sigs, key=lambda sig: (-points[sig], sig))
+            # positions[letter][k - 1] lists the signatures holding the
+            # letter at least k times
+            positions: Dict[str, List[List[int]]] = {
+                letter: [] for letter in ascii_lowercase
+            }
+            for j, sig in enumerate(ordered):
+                previous = ""
+                k = 0
+                for letter in sig:
+                    if letter == previous:
+                        k += 1
+                    else:
+                        k = 0
+                        previous = letter
+                        letter_positions = positions[letter]
+                    if k == len(letter_positions):
+                        letter_positions.append([])
+                    letter_positions[k].append(j)
+            self.signatures[length] = ordered
+            self.points[length] = [points[sig] for sig in ordered]
+            self.bits[length] = [
+                [bitset(js, len(ordered)) for js in positions[letter]]
+                for letter in ascii_lowercase
+            ]
+
+    def formable(
+        self, length: int, counts: List[int], wildcards: int, wild: List[bool]
+    ) -> int:
+        """
+        Returns the bitset of the signatures of the given length which can
+        be made from a hand holding counts[slot] times each letter of
+        ascii_lowercase and wildcards wildcards, where a wildcard can stand
+        for the letters whose slot is True in wild.
+        """
+        if length not in self.bits:
+            return 0
+        # A signature holding a letter more times than the hand needs that
+        # many wildcards: at_least[t] has the signatures needing more than
+        # t wildcards, forbidden the ones needing a letter no wildcard can
+        # stand for.
+        at_least = [0] * (wildcards + 1)
+        forbidden = 0
+        for slot, letter_bits in enumerate(self.bits[length]):
+            for needed in letter_bits[counts[slot] :]:
+                if not (wildcards and wild[slot]):
+                    forbidden |= needed
+                    break
+                for t in range(wildcards, 0, -1):
+                    at_least[t] |= at_least[t - 1] & needed
+                at_least[0] |= needed
+        everything = (1 << len(self.signatures[length])) - 1
+        if wildcards:
+            return everything & ~forbidden & ~at_least[wildcards]
+        return everything & ~forbidden
+
+
+class SignatureSearch:
+    """
+    Search of the best signatures which can be made from a hand, looking at
+    the signatures of the dictionary (see SignatureIndex) instead of the
+    sub-multisets of the hand, whose number explodes for large hands or
+    several wildcards.
+
+    Every wildcard '*' of the hand can stand for any of wild_letters. The
+    score of a signature is the sum of the values of its letters in
+    letter_values, the letters the wildcards stand for included, multiplied
+    by bonus(len(signature)). Iterating yields (score, signature, wildcard
+    letters) for the signatures scoring at least floor, where the wildcard
+    letters are the sorted letters the wildcards stand for: letters of the
+    hand are always used before wildcards. The caller raises floor as it
+    finds better signatures, which prunes the rest of the search; every
+    signature scoring floor or more after the last raise is yielded.
+    """
+
+    def __init__(
+        self,
+        lexicon: Lexicon,
+        hand: Dict[str, int],
+        wild_letters: str,
+        letter_values: Dict[str, int],
+        bonus: Callable[[int], int],
+    ) -> None:
+        self.floor = 0
+        self.scanned = 0
+        self._index = lexicon.signature_index(letter_values)
+        self._counts = [hand.get(letter, 0) for letter in ascii_lowercase]
+        self._wildcards = hand.get("*", 0) if wild_letters else 0
+        self._wild = [letter in wild_letters for letter in ascii_lowercase]
+        self._bonus = bonus
+        # Values of the letters of the hand and of the wildcards, as high as
+        # the highest letter they can stand for, from the highest down
+        wild_value = max(map(letter_values.get, wild_letters, repeat(0)), default=0)
+        self._values = sorted(
+            [wild_value] * self._wildcards
+            + [
+                letter_values.get(letter, 0)
+                for letter in ascii_lowercase
+                for _ in range(hand.get(letter, 0))
+            ],
+            reverse=True,
+        )
+
+    def __iter__(self) -> Iterator[Tuple[int, str, str]]:
+        # Lengths are searched from the highest score they can reach down
+        bounds = sorted(
+            (
+                (sum(self._values[:length]) * self._bonus(length), length)
+                for length in range(2, len(self._values) + 1)
+            ),
+            reverse=True,
+        )
+        for bound, length in bounds:
+            if bound < self.floor:
+                break
+            bonus = self._bonus(length)
+            sigs = self._index.signatures.get(length, [])
+            points = self._index.points.get(length, [])
+            formable = self._index.formable(
+                length, self._counts, self._wildcards, self._wild
+            )
+            # Lowest bits first: highest points first
+            while formable:
+                lowest = formable & -formable
+                formable ^= lowest
+                j = lowest.bit_length() - 1
+                score = points[j] * bonus
+                if score < self.floor:
+                    break
+                self.scanned += 1
+                yield score, sigs[j], self._wild_letters(sigs[j])
+
+    def _wild_letters(self, sig: str) -> str:
+        wild_letters = ""
+        for letter, run in groupby(sig):
+            missing = len(list(run)) - self._counts[ord(letter) - 97]
+            if missing > 0:
+                wild_letters += letter * missing
+        return wild_letters
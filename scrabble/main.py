@@ -1,21 +1,78 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import json
+import heapq
+import logging
 import os
 import random
-from itertools import chain
+import threading
+from functools import partial
 from math import ceil
 from string import ascii_lowercase
-from typing import Dict, Iterable, List, Tuple
+from typing import (
+    Collection,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from words.instrument import PROFILER, timed
+from words.wordfile import load_word_dict
+
+try:
+    from .hand import Hand
+    from .lexicon import (
+        Candidates,
+        Lexicon,
+        SignatureSearch,
+        count_sub_signatures,
+        signature,
+    )
+    from .movecache import MISSING, MoveCache, Rules, values_digest
+    from .planner import HandPlanner, Plan
+except ImportError:  # Started as a script with `python scrabble`
+    from hand import Hand
+    from lexicon import (
+        Candidates,
+        Lexicon,
+        SignatureSearch,
+        count_sub_signatures,
+        signature,
+    )
+    from movecache import MISSING, MoveCache, Rules, values_digest
+    from planner import HandPlanner, Plan
 
 # ---------------- public variables ----------------
 
-# Size of each hand
+# Size of each hand, up to 15 (the length of the longest words)
 HAND_SIZE = 7
 
+# Number of wildcards '*' in each hand
+WILDCARDS = 1
+
+# Letters a wildcard can stand for, ascii_lowercase for any letter
+WILDCARD_LETTERS = "aeiou"
+
 # Length of line separating the sections
 LINE_SEP = "-" * 70
 
+# File keeping the computer's moves from one game to the next, None to not
+# keep them
+MOVE_CACHE_FILENAME = None
+
+# Let the computer plan the words of the whole hand instead of playing the
+# best word of every turn, thinking at most PLAN_TIME_BUDGET seconds
+COMP_PLANS_HAND = False
+PLAN_TIME_BUDGET = 1.0
+
+# Number of words shown by the hint of a hand (entering "?") and by the
+# report of the best words after it, 0 to leave them out
+HINT_WORDS = 3
+
 # ------------ end of public variables -------------
 
 WORDS_FILENAME = "words.json"
@@ -23,6 +80,10 @@ WORDS_FILENAME = "words.json"
 VOWELS = "aeiou"
 CONSONANTS = "bcdfghjklmnpqrstvwxyz"
 
+# Largest number of sub-multisets of a hand for which the computer looks up
+# each of them, see search_move
+MAX_SUB_SIGNATURES = 512
+
 SCRABBLE_LETTER_VALUES = {
     "a": 1,
     "b": 3,
@@ -53,25 +114,59 @@ SCRABBLE_LETTER_VALUES = {
     "*": 0,
 }
 
-# These should be global and will be cleared with each call to comp_play_hand
-# and play_hand
-COMP_WORDS = []
-PLAYER_WORDS = []
+logger = logging.getLogger(__name__)
+
+# Best computer move of the last hands played, see comp_choose_move
+MOVE_CACHE = MoveCache()
+
+
+class GameSession:
+    """
+    The state of one game: the random number generator dealing its hands,
+    the hand being played and the words the player and the computer played
+    from it. The functions playing a game take its session, so games played
+    at once in one process share the loaded dictionary (and MOVE_CACHE)
+    but nothing else.
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None) -> None:
+        self.rng = rng if rng is not None else random.Random()
+        self.hand: Optional[Hand] = None
+        # Words played from the hand, cleared with each call to play_hand
+        # and comp_play_hand. Neither side may play a word the other played.
+        self.player_words: Set[str] = set()
+        self.comp_words: Set[str] = set()
 
 
-def load_words() -> Dict[str, List[str]]:
+@timed("scrabble.load_words")
+def load_words() -> Lexicon:
     """
     Returns a dictionary of valid words with keys being the length of the
     words. Words are strings of lowercase letters.
     """
     print(f"{LINE_SEP}\nLoading words from the file...")
     here = os.path.dirname(os.path.abspath(__file__))
-    with open(os.path.join(here, WORDS_FILENAME)) as word_file:
-        word_dict = json.load(word_file)
+    # Uses the compiled words.bin when it is up to date with words.json
+    word_dict = Lexicon(load_word_dict(os.path.join(here, WORDS_FILENAME)))
+    prepare_lexicon(word_dict)
     print(f"Words loaded. Game on!\n{LINE_SEP}")
     return word_dict
 
 
+def prepare_lexicon(lexicon: Lexicon, hand_size: Optional[int] = None) -> None:
+    """
+    Builds the anagram index of the lexicon now, and its signature index if
+    the hands of hand_size letters (HAND_SIZE by default) may need it,
+    rather than during the first move of the computer.
+    """
+    lexicon.build_anagram_index()
+    hand_size = HAND_SIZE if hand_size is None else hand_size
+    wildcards = min(WILDCARDS, hand_size)
+    largest_hand = Hand(ascii_lowercase[: hand_size - wildcards] + "*" * wildcards)
+    if uses_signature_search(largest_hand):
+        lexicon.signature_index(SCRABBLE_LETTER_VALUES)
+
+
 def get_word_score(word: str, n: int) -> int:
     """
     Returns the score for a word. Assumes the word is a valid word.
@@ -85,13 +180,20 @@ def get_word_score(word: str, n: int) -> int:
     #     of the word and n is the hand length when the word was played.
     word = word.lower()  # Only for testing
     letter_points = sum([SCRABBLE_LETTER_VALUES[letter] for letter in word])
-    other_points = (7 * len(word)) - (3 * (n - len(word)))
-    bonus_points = 1 if other_points < 1 else other_points
-    game_points = letter_points * bonus_points
+    game_points = letter_points * get_bonus_points(len(word), n)
     return game_points
 
 
-def display_hand(hand: Dict[str, int]) -> str:
+def get_bonus_points(word_length: int, n: int) -> int:
+    """
+    Returns the second component of the score of a word of the given length
+    played from a hand of length n (see get_word_score).
+    """
+    other_points = (7 * word_length) - (3 * (n - word_length))
+    return 1 if other_points < 1 else other_points
+
+
+def display_hand(hand: Hand) -> str:
     """
     Returns the string in a displayable format.
     The order of the letters is unimportant.
@@ -103,30 +205,29 @@ def display_hand(hand: Dict[str, int]) -> str:
     return letter_string
 
 
-def deal_hand(let_count: int) -> Dict[str, int]:
+def deal_hand(let_count: int, rng: Optional[random.Random] = None) -> Hand:
     """
     Returns a random hand containing lowercase letters.
-    The last string is '*' as the wildcard in the game.
-    """
-    # Hands are represented as dictionaries. The keys are
-    # letters and the values are the number of times the
-    # particular letter is repeated in that hand.
-    hand = {}
+    The last WILDCARDS letters are '*' as the wildcard in the game.
+    The letters are drawn from rng if it is given, from the global random
+    state otherwise.
+    """
+    choice = (rng or random).choice
+    # Hands are represented as Hand objects holding the number of times
+    # each letter is repeated in that hand.
+    letters = ""
     num_vowels = int(ceil(let_count / 3))
 
     for _ in range(num_vowels - 1):
-        x = random.choice(VOWELS)
-        hand[x] = hand.get(x, 0) + 1
+        letters += choice(VOWELS)
 
-    for _ in range(num_vowels, let_count):
-        x = random.choice(CONSONANTS)
-        hand[x] = hand.get(x, 0) + 1
+    for _ in range(num_vowels, let_count - WILDCARDS + 1):
+        letters += choice(CONSONANTS)
 
-    hand["*"] = 1
-    return hand
+    return Hand(letters + "*" * WILDCARDS)
 
 
-def update_hand(hand: Dict[str, int], word: str) -> Dict[str, int]:
+def update_hand(hand: Hand, word: str) -> Hand:
     """
     Updates the hand: uses up the letters in the given word
     and returns the new hand, without those letters in it.
@@ -138,166 +239,536 @@ def update_hand(hand: Dict[str, int], word: str) -> Dict[str, int]:
     # than in hand doesn't result in a negative count; instead, sets the
     # count in the returned hand to 0.
     word = word.lower()  # Only for testing
-    new_hand = dict(hand)
-    for letter in word:
-        if letter not in new_hand:
-            continue
-        if new_hand[letter] > 0:
-            new_hand[letter] -= 1
-    return new_hand
+    return Hand.of(hand).minus(word)
 
 
-def is_valid_word(
-    word: str, hand: Dict[str, int], word_dict: Dict[str, List[str]]
-) -> bool:
+def is_valid_word(word: str, hand: Hand, word_dict: Dict[str, List[str]]) -> bool:
     """
     Returns True if word is in the word_list and is entirely
     composed of letters in the hand. Otherwise, returns False.
     Does not mutate hand or word_dict.
     """
+    if PROFILER.enabled:
+        PROFILER.count("scrabble.is_valid_word")
     word = word.lower()  # Only for testing
-    word_code = str(len(word)) + word[0]
-    if word_code.startswith("1"):
+    if len(word) < 2 or not Hand.of(hand).can_form(word):
         return False
+    lexicon = Lexicon.of(word_dict)
 
-    for letter in word:
-        if letter not in hand or word.count(letter) > hand[letter]:
-            return False
-        # If the word contains the wildcard character '*', it makes a
-        # list by replacing it with each vowels and searches the word
-        # in the word_dict.
-        elif letter == "*":
-            wild_word_list = [word.replace("*", v) for v in VOWELS]
-            for wild_word in wild_word_list:
-                # If wildcard is the first letter, we have five different
-                # word codes.
-                wild_word_code = str(len(wild_word)) + wild_word[0]
-                if wild_word in word_dict[wild_word_code]:
-                    return True
-            return False
+    # If the word contains the wildcard character '*', it replaces it
+    # with each of WILDCARD_LETTERS and searches the word in the word_dict.
+    if "*" in word:
+        return lexicon.matches(word, WILDCARD_LETTERS)
 
-    return True if word in word_dict[word_code] else False
+    return lexicon.is_word(word)
 
 
-def calculate_handlen(hand: Dict[str, int]) -> int:
+def calculate_handlen(hand: Hand) -> int:
     """
     Returns the length (number of letters) in the current hand.
     """
-    return sum([num for num in hand.values()])
+    return len(Hand.of(hand))
 
 
-def comp_update_word(hand: Dict[str, int], word: str) -> str:
+@timed("scrabble.comp_choose_move")
+def comp_choose_move(
+    hand: Hand,
+    word_dict: Dict[str, List[str]],
+    hand_length: int,
+    candidates: Optional[Candidates] = None,
+    player_words: Collection[str] = (),
+) -> Optional[Tuple[str, str, int]]:
     """
-    Updates and returns the computers word if it used the wildcard '*'
-    otherwise returns the word as it is.
+    Given a hand and a word_dict, find the word that gives the maximum
+    value score and return (word, played word, score). The played word is
+    the word with '*' in place of the letter the wildcard stands for, if it
+    is needed, and score is the score of the played word.
+    If no words in the word_dict can be made from the hand, return None.
+
+    candidates are the candidates of the hand if they are already known,
+    e.g. narrowed down from the candidates of a previous hand.
+
+    The computer doesn't play the words of player_words. The moves are
+    cached in MOVE_CACHE by the letters of the hand, the ones of those words
+    it can form and move_rules, the only things which change the move.
     """
-    new_word = word
+    hand = Hand.of(hand)
+    lexicon = Lexicon.of(word_dict)
+    rules = move_rules()
+    MOVE_CACHE.bind(lexicon, lexicon.store.digest, rules)
+    key = (hand.counts, hand_length, excluded_words(hand, player_words), *rules)
+    move = MOVE_CACHE.get(key)
+    if PROFILER.enabled:
+        PROFILER.annotate(hand_length=hand_length, cached=move is not MISSING)
+    if move is MISSING:
+        move = search_move(hand, lexicon, hand_length, candidates, player_words)
+        MOVE_CACHE.put(key, move)
+    return move
 
-    for letter in word:
-        if word.count(letter) > hand.get(letter, 0):
-            new_word = new_word.replace(letter, "*", 1)
-            break
 
-    return new_word
+def move_rules() -> Rules:
+    """
+    Returns the rules the moves of the computer depend on besides the words:
+    WILDCARD_LETTERS and the digest of SCRABBLE_LETTER_VALUES.
+    """
+    return WILDCARD_LETTERS, values_digest(SCRABBLE_LETTER_VALUES)
 
 
-def comp_all_hands(hand: Dict[str, int]) -> List[Dict[str, int]]:
+def excluded_words(hand: Hand, player_words: Collection[str] = ()) -> FrozenSet[str]:
     """
-    Returns a list of hand (dictionary) which are the five possibilities
-    of a hand with the wildcard replaced with each vowels.
-    Does not mutate hand.
+    Returns the words of player_words which the computer could play from
+    the hand, with the wildcards standing for WILDCARD_LETTERS.
     """
-    result = []
+    return frozenset(
+        word for word in player_words if hand.can_cover(word, WILDCARD_LETTERS)
+    )
+
+
+def uses_signature_search(hand: Hand) -> bool:
+    """
+    Returns True if the computer searches the signature index of the
+    dictionary for the moves of the hand, rather than the sub-multisets of
+    the hand (see search_move).
+    """
+    return (
+        hand["*"] > 1
+        or count_sub_signatures(hand, WILDCARD_LETTERS) > MAX_SUB_SIGNATURES
+    )
+
+
+def search_move(
+    hand: Hand,
+    lexicon: Lexicon,
+    hand_length: int,
+    candidates: Optional[Candidates] = None,
+    player_words: Collection[str] = (),
+) -> Optional[Tuple[str, str, int]]:
+    """
+    Finds the move returned by comp_choose_move, without the cache.
+    """
+    best_score = 0
+    best_word = None
+    best_key = None
+    search = None
+
+    # Instead of checking every word in the word_dict, look up the words
+    # which can be formed from each sub-multiset of the hand, with the
+    # wildcard standing for each of WILDCARD_LETTERS. Every word of a
+    # signature has the same score, so signatures are looked up from the
+    # highest score down and the search stops at the first one which can't
+    # reach the best score found so far.
+    # The number of sub-multisets explodes with large hands and several
+    # wildcards, those hands search the signatures of the dictionary
+    # instead, pruning the ones which can't reach the best score.
+    if uses_signature_search(hand):
+        search = SignatureSearch(
+            lexicon,
+            hand,
+            WILDCARD_LETTERS,
+            SCRABBLE_LETTER_VALUES,
+            lambda length: get_bonus_points(length, hand_length),
+        )
+        ranked = search
+    else:
+        if candidates is None:
+            candidates = Candidates(hand, WILDCARD_LETTERS, SCRABBLE_LETTER_VALUES)
+        ranked = sorted(
+            (
+                (points * get_bonus_points(len(sig), hand_length), sig, wild_letter)
+                for sig, wild_letter, points in candidates
+            ),
+            key=lambda candidate: candidate[0],
+            reverse=True,
+        )
+    scanned = 0
 
-    for v in VOWELS:
-        temp_hand = hand.copy()
-        value = temp_hand.pop("*")
-        temp_hand[v] = temp_hand.get(v, 0) + value
-        result.append(temp_hand)
+    for score, sig, wild_letters in ranked:
+        if score < best_score:
+            break
+        scanned += 1
+        if search is None:
+            word_ids = candidates.word_ids(sig, lexicon)
+        else:
+            word_ids = lexicon.anagram_ids(sig)
+        for word_id in word_ids:
+            word = lexicon.word(word_id)
+            # A fair point made by my friend: If player is not allowed to enter a
+            # word played by the computer, it should be the same for the computer
+            # as well.
+            if word in player_words:
+                continue
+            # On a tie the word found first in the word_dict with the earliest
+            # letter for the wildcard wins, and a word is played without the
+            # wildcard when it can be.
+            wild_idx = WILDCARD_LETTERS.find(wild_letters[0]) if wild_letters else 0
+            key = (wild_idx, word_id, wild_letters)
+            if score > best_score or (score == best_score and key < best_key):
+                best_score = score
+                best_word = word
+                best_key = key
+        if search is not None:
+            search.floor = best_score
+
+    if search is None:
+        logger.debug(
+            "search_move: %d of %d candidates pruned",
+            len(ranked) - scanned,
+            len(ranked),
+        )
+    else:
+        logger.debug("search_move: %d signatures scanned", search.scanned)
+    if PROFILER.enabled:
+        if search is None:
+            PROFILER.annotate(
+                candidates=len(ranked),
+                scanned=scanned,
+                wildcard_scanned=sum(1 for *_, wild in ranked[:scanned] if wild),
+            )
+        else:
+            PROFILER.annotate(signatures=search.scanned, scanned=scanned)
 
-    return result
+    if best_word is None:
+        return None
+    played_word = _played_word(best_word, best_key[2])
+    return best_word, played_word, get_word_score(played_word, hand_length)
 
 
 def comp_choose_word(
-    hand: Dict[str, int], word_dict: Dict[str, List[str]], hand_length: int
+    hand: Hand,
+    word_dict: Dict[str, List[str]],
+    hand_length: int,
+    player_words: Collection[str] = (),
 ) -> str:
     """
     Given a hand and a word_dict, find the word that gives
     the maximum value score, and return it.
     If no words in the word_dict can be made from the hand, return None.
     """
-    best_score = 0
-    best_word = None
-    all_hands = comp_all_hands(hand)
+    move = comp_choose_move(hand, word_dict, hand_length, player_words=player_words)
+    return None if move is None else move[0]
 
-    # No need to loop over words of size longer than the current hand length
-    possible_words = list(word_dict.values())[: 26 * (hand_length - 1)]
 
-    for vhand in all_hands:
-        word_chain = chain(*possible_words)
-        for word in word_chain:
-            if is_valid_word(word, vhand, word_dict):
-                # A fair point made by my friend: If player is not allowed to enter a
-                # word played by the computer, it should be the same for the computer
-                # as well.
-                if word in PLAYER_WORDS:
-                    continue
-                score = get_word_score(word, hand_length)
-                if score > best_score:
-                    best_score = score
-                    best_word = word
+def _playable_entries(
+    hand: Hand, lexicon: Lexicon
+) -> Iterator[Tuple[str, str, Iterable[int]]]:
+    # (signature, letters the wildcards stand for, ids of its words) of every
+    # multiset of letters of the hand which can be played, as they are found
+    if uses_signature_search(hand):
+        # Every signature the hand can form scores at least 0
+        search = SignatureSearch(
+            lexicon, hand, WILDCARD_LETTERS, SCRABBLE_LETTER_VALUES, lambda n: 1
+        )
+        for _, sig, wild_letters in search:
+            yield sig, wild_letters, lexicon.anagram_ids(sig)
+    else:
+        candidates = Candidates(hand, WILDCARD_LETTERS)
+        for sig, wild_letter, _ in candidates:
+            yield sig, wild_letter, candidates.word_ids(sig, lexicon)
+
+
+def _played_word(word: str, wild_letters: str) -> str:
+    # The word with '*' in place of the letters the wildcards stand for
+    for wild_letter in wild_letters:
+        word = word.replace(wild_letter, "*", 1)
+    return word
+
+
+def playable_words(
+    hand: Hand, lexicon: Lexicon, player_words: Collection[str] = ()
+) -> Dict[str, Tuple[str, str]]:
+    """
+    Returns (word, played word) for every multiset of letters of the hand
+    which can be played as a word, keyed by the signature of the played
+    word. Words of player_words are left out and among the words of a
+    multiset, the one search_move would pick on a tie is kept.
+    """
+    best: Dict[str, Tuple[Tuple, str, str]] = {}
+    for sig, wild_letters, word_ids in _playable_entries(hand, lexicon):
+        for word_id in word_ids:
+            word = lexicon.word(word_id)
+            if word in player_words:
+                continue
+            played_word = _played_word(word, wild_letters)
+            wild_idx = WILDCARD_LETTERS.find(wild_letters[0]) if wild_letters else 0
+            key = (wild_idx, word_id, wild_letters)
+            played_sig = signature(played_word)
+            if played_sig not in best or key < best[played_sig][0]:
+                best[played_sig] = key, word, played_word
+            # The words of a signature come in the order of their ids
+            break
+    return {sig: (word, played_word) for sig, (_, word, played_word) in best.items()}
+
+
+def playable_moves(
+    hand: Hand, word_dict: Dict[str, List[str]], player_words: Collection[str] = ()
+) -> Iterator[Tuple[str, str, int]]:
+    """
+    Yields (word, played word, score) for every word which can be formed
+    from the hand but the words of player_words, once for every letter its
+    wildcards can stand for, as they are found. The score is the score of
+    the played word with the whole hand left.
+    """
+    hand = Hand.of(hand)
+    lexicon = Lexicon.of(word_dict)
+    hand_length = len(hand)
+    for _, wild_letters, word_ids in _playable_entries(hand, lexicon):
+        for word_id in word_ids:
+            word = lexicon.word(word_id)
+            if word in player_words:
+                continue
+            played_word = _played_word(word, wild_letters)
+            yield word, played_word, get_word_score(played_word, hand_length)
+
+
+@timed("scrabble.top_k")
+def top_k(
+    hand: Hand,
+    word_dict: Dict[str, List[str]],
+    k: int,
+    player_words: Collection[str] = (),
+) -> List[Tuple[str, str, int]]:
+    """
+    Returns the k best moves of playable_moves, highest score first. Only
+    the k best moves found so far are kept while the moves are found.
+    """
+    return heapq.nlargest(
+        k, playable_moves(hand, word_dict, player_words), key=lambda move: move[2]
+    )
+
+
+def format_moves(moves: Iterable[Tuple[str, str, int]]) -> str:
+    """
+    Returns the moves as a line of played words and their scores.
+    """
+    return ", ".join(f'"{played_word}" {score}' for _, played_word, score in moves)
+
+
+@timed("scrabble.comp_plan_hand")
+def comp_plan_hand(
+    hand: Hand,
+    word_dict: Dict[str, List[str]],
+    time_budget: Optional[float] = None,
+    player_words: Collection[str] = (),
+) -> Plan:
+    """
+    Returns the words the computer plays over the whole hand to score the
+    most in total (see planner.py), or the best plan found in time_budget
+    seconds if it is given. Words of player_words are left out.
+    """
+    hand = Hand.of(hand)
+    planner = HandPlanner(
+        hand,
+        playable_words(hand, Lexicon.of(word_dict), player_words),
+        SCRABBLE_LETTER_VALUES,
+        get_bonus_points,
+    )
+    plan = planner.plan(time_budget)
+    logger.debug(
+        "comp_plan_hand: %d of %d hands solved, complete: %s",
+        planner.solved,
+        planner.size,
+        plan.complete,
+    )
+    if PROFILER.enabled:
+        PROFILER.annotate(
+            words=len(planner.moves), solved=planner.solved, complete=plan.complete
+        )
+    return plan
+
+
+def comp_moves(
+    hand: Hand,
+    word_dict: Dict[str, List[str]],
+    player_words: Collection[str] = (),
+    plans_hand: Optional[bool] = None,
+) -> Iterator[Tuple[Hand, Optional[str], int]]:
+    """
+    Plays the given hand for the computer without any output, yielding
+    (hand, played word, score) for every turn where hand is the hand the
+    word is played from. If the computer stops with letters left, because
+    no word can be made from them or no word adds to the plan of the hand
+    (see COMP_PLANS_HAND), the last turn yields (hand, None, 0). The words
+    of player_words are not played. plans_hand overrides COMP_PLANS_HAND
+    if it is given.
+    """
+    for turn_hand, _, comp_word, comp_score in comp_turns(
+        hand, word_dict, player_words, plans_hand
+    ):
+        yield turn_hand, comp_word, comp_score
+
+
+def comp_turns(
+    hand: Hand,
+    word_dict: Dict[str, List[str]],
+    player_words: Collection[str] = (),
+    plans_hand: Optional[bool] = None,
+) -> Iterator[Tuple[Hand, Optional[str], Optional[str], int]]:
+    """
+    Same as comp_moves, yielding (hand, word, played word, score) for every
+    turn: the word is the word of the dictionary the played word stands for.
+    """
+    hand = Hand.of(hand)
+    if COMP_PLANS_HAND if plans_hand is None else plans_hand:
+        plan = comp_plan_hand(hand, word_dict, PLAN_TIME_BUDGET, player_words)
+        for word, comp_word, comp_score in plan.moves:
+            yield hand, word, comp_word, comp_score
+            hand = update_hand(hand, comp_word)
+        if calculate_handlen(hand) > 0:
+            yield hand, None, None, 0
+        return
+
+    # Each word leaves a smaller hand which can only form some of the words
+    # of the previous one, so the candidates are narrowed down every turn
+    # instead of starting over from the whole hand. They are only enumerated
+    # if the move of the hand is not cached.
+    candidates = Candidates(hand, WILDCARD_LETTERS, SCRABBLE_LETTER_VALUES)
 
-    return best_word
+    while (hand_length := calculate_handlen(hand)) > 0:
+        move = comp_choose_move(hand, word_dict, hand_length, candidates, player_words)
+        if move is None:
+            yield hand, None, None, 0
+            break
+        word, comp_word, comp_score = move
+        yield hand, word, comp_word, comp_score
+        hand = update_hand(hand, comp_word)
+        candidates = candidates.narrow(hand)
 
 
-def comp_play_hand(hand: Dict[str, int], word_dict: Dict[str, List[str]]) -> int:
+class SpeculativePlay:
+    """
+    The computer's play of a hand, worked out in a background thread while
+    the player plays the same hand so that the computer's turn doesn't make
+    the player wait (see play_series). The player's words aren't known yet,
+    so the computer plays as if the player played none: the play stays the
+    one comp_moves finds unless the player played one of its words, as the
+    words the player played only rule out words for the computer.
+    """
+
+    def __init__(self, hand: Hand, word_dict: Dict[str, List[str]]) -> None:
+        self.hand = Hand.of(hand)
+        self.turns: List[Tuple[Hand, Optional[str], Optional[str], int]] = []
+        self.complete = False
+        self._word_dict = word_dict
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            for turn in comp_turns(self.hand, self._word_dict):
+                if self._cancelled.is_set():
+                    return
+                self.turns.append(turn)
+            self.complete = True
+        except Exception:
+            logger.exception("SpeculativePlay: the computer's play failed")
+        finally:
+            self._done.set()
+
+    def cancel(self) -> None:
+        """
+        Stops the play after the turn being worked out, e.g. when the hand
+        is substituted.
+        """
+        self._cancelled.set()
+
+    def moves(
+        self, hand: Hand, player_words: Collection[str]
+    ) -> Optional[List[Tuple[Hand, Optional[str], int]]]:
+        """
+        Waits for the play to end and returns its turns as comp_moves yields
+        them, or None if it doesn't hold for the hand once the player played
+        player_words: it is for another hand, was cancelled or failed, or
+        plays a word of player_words.
+        """
+        if Hand.of(hand) != self.hand:
+            return None
+        self._done.wait()
+        if not self.complete or self._cancelled.is_set():
+            return None
+        if any(word in player_words for _, word, _, _ in self.turns):
+            return None
+        return [
+            (turn_hand, comp_word, comp_score)
+            for turn_hand, _, comp_word, comp_score in self.turns
+        ]
+
+
+def comp_play_hand(
+    hand: Hand,
+    word_dict: Dict[str, List[str]],
+    session: Optional[GameSession] = None,
+    speculation: Optional[SpeculativePlay] = None,
+) -> int:
     """
     Allows the computer to play the given hand, following the same procedure
     as playHand, except instead of the user choosing a word, the computer
-    chooses it.
+    chooses it. The words are recorded in the session, a new one if it is
+    None.
+
+    The computer plays the moves of speculation if it was started for the
+    hand and still holds once the player played the words of the session,
+    otherwise it works them out now.
     """
+    if session is None:
+        session = GameSession()
     comp_total_score = 0
     # Reset computer's played words
-    COMP_WORDS.clear()
+    session.comp_words.clear()
+
+    moves = None
+    if speculation is not None:
+        moves = speculation.moves(hand, session.player_words)
+        PROFILER.count(
+            "scrabble.speculation_used"
+            if moves is not None
+            else "scrabble.speculation_missed"
+        )
+    if moves is None:
+        moves = comp_moves(hand, word_dict, session.player_words)
 
     print(f"{LINE_SEP}\nComputer's game:")
 
-    while (hand_length := calculate_handlen(hand)) > 0:
-        print(f"\nCurrent hand: {display_hand(hand)}")
-        comp_word = comp_choose_word(hand, word_dict, hand_length)
-
+    for turn_hand, comp_word, comp_score in moves:
+        print(f"\nCurrent hand: {display_hand(turn_hand)}")
         if comp_word is None:
             break
-        else:
-            comp_word = comp_update_word(hand, comp_word)
-            comp_score = get_word_score(comp_word, hand_length)
-            comp_total_score += comp_score
-            print(
-                f'"{comp_word}" earned {comp_score} points. '
-                f"Total: {comp_total_score} points."
-            )
-
-        COMP_WORDS.append(comp_word)
-        hand = update_hand(hand, comp_word)
+        comp_total_score += comp_score
+        print(
+            f'"{comp_word}" earned {comp_score} points. '
+            f"Total: {comp_total_score} points."
+        )
+        session.comp_words.add(comp_word)
 
     print(f"\nComputer's game ended. Total score: {comp_total_score} points.")
 
     return comp_total_score
 
 
-def play_hand(hand: Dict[str, int], word_dict: Dict[str, List[str]]) -> int:
+def play_hand(
+    hand: Hand,
+    word_dict: Dict[str, List[str]],
+    session: Optional[GameSession] = None,
+) -> int:
     """
-    Allows the user to play the given hand.
+    Allows the user to play the given hand. The words are recorded in the
+    session, a new one if it is None. Entering "?" once per hand shows the
+    HINT_WORDS best words of the hand left.
 
     NOTE:
     When any word is entered (valid or invalid), it uses up letters
     from the hand. An invalid word is rejected, and a message is displayed
     asking the user to choose another word.
     """
+    if session is None:
+        session = GameSession()
+    hand = Hand.of(hand)
     total_score = 0
     player_input = None
+    hint_count = 1 if HINT_WORDS > 0 else 0
     # Reset player's played words
-    PLAYER_WORDS.clear()
+    session.player_words.clear()
 
     while (hand_length := calculate_handlen(hand)) > 0:
         print(f"\nCurrent hand: {display_hand(hand)}")
@@ -310,15 +781,22 @@ def play_hand(hand: Dict[str, int], word_dict: Dict[str, List[str]]) -> int:
         if player_input == ".":
             break
 
+        elif player_input == "?" and hint_count > 0:
+            hint_count -= 1
+            # The words played by the computer can't be played
+            moves = top_k(hand, word_dict, HINT_WORDS, session.comp_words)
+            print(f"Hint: {format_moves(moves) or 'no word can be played.'}")
+            continue
+
         # Player cannot input the same word played by the computer
         # when replaying the hand.
-        elif player_input in COMP_WORDS:
+        elif player_input in session.comp_words:
             print(f"You cannot input a word played by the computer.")
             continue
 
         elif is_valid_word(player_input, hand, word_dict):
             player_input_score = get_word_score(player_input, hand_length)
-            PLAYER_WORDS.append(player_input)
+            session.player_words.add(player_input)
             total_score += player_input_score
 
             print(
@@ -340,25 +818,28 @@ def play_hand(hand: Dict[str, int], word_dict: Dict[str, List[str]]) -> int:
     return total_score
 
 
-def substitute_hand(hand: Dict[str, int], letter: str) -> Dict[str, int]:
+def substitute_hand(
+    hand: Hand, letter: str, rng: Optional[random.Random] = None
+) -> Hand:
     """
     Allows the user to replace all copies of one letter in the hand
     (chosen by user) with a new letter chosen from the VOWELS and CONSONANTS
     at random. The new letter will be different from user's choice, and won't
     be any of the letters already in the hand. If user provides a letter not
-    in the hand, the hand will be the same.
+    in the hand, the hand will be the same. The new letter is drawn from rng
+    if it is given, from the global random state otherwise.
 
     Has no side effects: does not mutate hand.
     """
-    new_hand = dict(hand)
+    choice = (rng or random).choice
+    new_hand = Hand.of(hand)
 
     while letter in new_hand:
-        rand_letter = random.choice(ascii_lowercase)
+        rand_letter = choice(ascii_lowercase)
         if rand_letter in new_hand:
             continue
         else:
-            letter_value = new_hand.pop(letter)
-            new_hand[rand_letter] = letter_value
+            new_hand = new_hand.replace(letter, rand_letter)
 
     return new_hand
 
@@ -396,20 +877,28 @@ def input_handling(
 
 
 def play_series(
-    num_hands: int, word_dict: Dict[str, List[str]], comp_choice: str
+    num_hands: int,
+    word_dict: Dict[str, List[str]],
+    comp_choice: str,
+    session: Optional[GameSession] = None,
 ) -> Tuple[int, int]:
     """
     Allow the user to play a series of hands. If the user opted to play
     against computer, it will play along with the user and return the computer's
-    score as well.
+    score as well. The hands are dealt and played in the session, a new one
+    if it is None.
     Returns the total score for the series of hands.
     """
+    if session is None:
+        session = GameSession()
     series_count = 0
     comp_series_count = comp_hand_count = 0
 
     while num_hands > 0:
         num_hands -= 1
-        hand = deal_hand(HAND_SIZE)
+        hand = session.hand = deal_hand(HAND_SIZE, session.rng)
+        # The computer works out its play while the player plays the hand
+        speculation = SpeculativePlay(hand, word_dict) if comp_choice == "y" else None
         # Resetting the replay message
         replay_msg = "Do you want to improve your score by replaying the hand? [y/n]"
         print(f"{LINE_SEP}\nCurrent hand: {display_hand(hand)}")
@@ -423,13 +912,17 @@ def play_series(
             sub_letter = input_handling(
                 "Which letter would you like to " "replace?", ascii_lowercase
             )
-            hand = substitute_hand(hand, sub_letter)
+            new_hand = substitute_hand(hand, sub_letter, session.rng)
+            if speculation is not None and new_hand != hand:
+                speculation.cancel()
+                speculation = SpeculativePlay(new_hand, word_dict)
+            hand = session.hand = new_hand
 
-        hand_count = play_hand(hand, word_dict)
+        hand_count = play_hand(hand, word_dict, session)
 
         # Computer plays
         if comp_choice == "y":
-            comp_hand_count = comp_play_hand(hand, word_dict)
+            comp_hand_count = comp_play_hand(hand, word_dict, session, speculation)
 
             if comp_hand_count > hand_count:
                 print(f"{LINE_SEP}\nComputer wins!\n")
@@ -446,7 +939,7 @@ def play_series(
         replay_choice = input_handling(replay_msg, "yn")
 
         if replay_choice == "y":
-            replay_hand_count = play_hand(hand, word_dict)
+            replay_hand_count = play_hand(hand, word_dict, session)
             hand_count = (
                 replay_hand_count if replay_hand_count > hand_count else hand_count
             )
@@ -458,6 +951,10 @@ def play_series(
             else:
                 print("It's a tie! You're on par with the computer.")
 
+        if HINT_WORDS > 0:
+            moves = top_k(hand, word_dict, HINT_WORDS)
+            print(f"\nBest words of the hand: {format_moves(moves)}")
+
         series_count += hand_count
         comp_series_count += comp_hand_count
 
@@ -467,6 +964,10 @@ def play_series(
 def play() -> None:
     """Initialize the game"""
     WORD_DICT = load_words()
+    session = GameSession()
+    if MOVE_CACHE_FILENAME:
+        MOVE_CACHE.bind(WORD_DICT, WORD_DICT.store.digest, move_rules())
+        MOVE_CACHE.load(MOVE_CACHE_FILENAME)
     total_series_points = 0
     comp_series_points = 0
     game_choice = "y"
@@ -481,7 +982,7 @@ def play() -> None:
         )
 
         total_points, comp_total_points = play_series(
-            total_hands, WORD_DICT, comp_choice
+            total_hands, WORD_DICT, comp_choice, session
         )
 
         if comp_choice == "y":
@@ -514,6 +1015,9 @@ def play() -> None:
             f"Thank you for playing.\n{LINE_SEP}"
         )
 
+    if MOVE_CACHE_FILENAME:
+        MOVE_CACHE.save(MOVE_CACHE_FILENAME)
+
 
 if __name__ == "__main__":
     play()
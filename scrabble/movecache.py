@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, NamedTuple, Optional, Tuple
+
+# A move as returned by comp_choose_move: (word, played word, score)
+Move = Tuple[str, str, int]
+# The rules a move depends on besides the words: (letters the wildcard
+# stands for, digest of the letter values, see values_digest)
+Rules = Tuple[str, str]
+# (letter counts of the hand, hand length, excluded words the hand can form,
+# wildcard letters, digest of the letter values)
+MoveKey = Tuple[bytes, int, FrozenSet[str], str, str]
+
+# Returned by MoveCache.get when the key is not cached, None being a move
+MISSING = object()
+
+
+def values_digest(values: Dict[str, int]) -> str:
+    """
+    Returns a short digest of the letter values, to tell apart the moves
+    found with different values.
+    """
+    items = json.dumps(sorted(values.items()), separators=(",", ":"))
+    return hashlib.sha256(items.encode("ascii")).hexdigest()[:16]
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+class MoveCache:
+    """
+    Bounded cache of the best computer move for a hand, evicting the least
+    recently used move once it holds maxsize moves.
+
+    A key is the canonical form of a hand (its letter counts, see Hand)
+    together with the length of the hand the score is computed for and the
+    excluded words the hand could form, and the rules of the game the move
+    depends on (see Rules). Two hands with the same letters map to the same
+    key whatever the order the letters were dealt in, and a move found while
+    some words were excluded, or with other wildcard letters or letter
+    values, is never reused once they change.
+
+    The moves depend on the dictionary they were found in, the cache is
+    bound to one dictionary at a time and cleared when it is bound to
+    another one (see bind). Saved moves are only loaded back with the same
+    dictionary and rules.
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._moves: "OrderedDict[MoveKey, Optional[Move]]" = OrderedDict()
+        self._owner = None
+        self._digest = bytes(32)
+        self._rules: Rules = ("", "")
+        # Sessions sharing the dictionary may share its cache across threads
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._moves)
+
+    def bind(
+        self, owner: object, digest: bytes = bytes(32), rules: Rules = ("", "")
+    ) -> None:
+        """
+        Binds the cache to the dictionary owner, whose content has the given
+        digest, and to the rules of the moves saved and loaded. The cached
+        moves are dropped if the cache was bound to another dictionary.
+        """
+        self._rules = rules
+        if owner is self._owner:
+            return
+        with self._lock:
+            if digest != self._digest or digest == bytes(32):
+                self._moves.clear()
+            self._owner = owner
+            self._digest = digest
+
+    def get(self, key: MoveKey) -> object:
+        """
+        Returns the move cached for key, MISSING if there is none.
+        """
+        with self._lock:
+            move = self._moves.get(key, MISSING)
+            if move is MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._moves.move_to_end(key)
+            return move
+
+    def put(self, key: MoveKey, move: Optional[Move]) -> None:
+        """
+        Caches the move for key, evicting the least recently used moves if
+        the cache is full.
+        """
+        with self._lock:
+            self._moves[key] = move
+            self._moves.move_to_end(key)
+            while len(self._moves) > self.maxsize:
+                self._moves.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        Drops every cached move and resets the counters.
+        """
+        with self._lock:
+            self._moves.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(
+            self.hits, self.misses, self.evictions, self.maxsize, len(self._moves)
+        )
+
+    def save(self, path: str) -> None:
+        """
+        Writes the cached moves to the file at path, from the least to the
+        most recently used, along with the digest of the dictionary and the
+        rules the cache is bound to. Moves found with other rules are left
+        out.
+        """
+        with self._lock:
+            moves = [
+                [counts.hex(), hand_length, sorted(excluded), move]
+                for (counts, hand_length, excluded, *rules), move in self._moves.items()
+                if tuple(rules) == self._rules
+            ]
+            wildcards, values = self._rules
+            data = {
+                "digest": self._digest.hex(),
+                "wildcards": wildcards,
+                "values": values,
+                "moves": moves,
+            }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as cache_file:
+            json.dump(data, cache_file, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> int:
+        """
+        Adds the moves saved in the file at path and returns how many were
+        added. Nothing is added if the file doesn't exist, can't be read or
+        was saved for another dictionary or other rules than the ones the
+        cache is bound to.
+        """
+        if self._digest == bytes(32):
+            # Moves of a dictionary built in memory can't be told apart
+            return 0
+        try:
+            with open(path) as cache_file:
+                data = json.load(cache_file)
+            if bytes.fromhex(data["digest"]) != self._digest:
+                return 0
+            if (data["wildcards"], data["values"]) != self._rules:
+                return 0
+            entries = [
+                (
+                    (
+                        bytes.fromhex(counts),
+                        hand_length,
+                        frozenset(excluded),
+                        *self._rules,
+                    ),
+                    None if move is None else tuple(move),
+                )
+                for counts, hand_length, excluded, move in data["moves"]
+            ]
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0
+        for key, move in entries:
+            self.put(key, move)
+        return len(entries)
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Planning of the words the computer plays over a whole hand.
+
+Playing the best word of every turn can leave letters which no word takes,
+while a lower scoring first word sometimes leaves a hand scoring more. The
+planner finds the sequence of words scoring the most in total: the best
+total of a hand is the best, over the words it can form, of the score of
+the word plus the best total of the hand left. The hands left are sub-
+multisets of the hand, so every one of them is solved once and shared by
+all the sequences reaching it.
+
+A sub-multiset is keyed by its position in the mixed-radix numbering of
+the sub-multisets of the hand (the count of each letter being one digit),
+so the tables are flat arrays of one entry per sub-multiset: at most 2^n
+entries for a hand of n letters, 32768 for 15 letters, whatever the order
+the search visits them in.
+"""
+
+import time
+from array import array
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# Bits per letter count in a packed multiset, the highest bit of each field
+# is a guard catching the borrow of a letter missing from the hand
+FIELD_BITS = 5
+
+# Calls of the search between two looks at the clock
+CLOCK_INTERVAL = 256
+
+# A planned word: (word, played word, score)
+PlannedMove = Tuple[str, str, int]
+
+
+class Plan(NamedTuple):
+    """
+    The words to play in order and their total score. complete is False if
+    the time budget ran out before the search was done, the plan is then the
+    best one found so far.
+    """
+
+    score: int
+    moves: Tuple[PlannedMove, ...]
+    complete: bool
+
+
+class OutOfTime(Exception):
+    pass
+
+
+class HandPlanner:
+    """
+    Finds the best plan of a hand among the words it can play. words maps
+    the signature of every multiset of letters which can be played (with
+    '*' for the wildcards) to the word played for it and the played word,
+    the ones the hand can't form are left out. The score of a played word
+    is the sum of the values of its letters in letter_values multiplied by
+    bonus(word length, hand length).
+    """
+
+    def __init__(
+        self,
+        hand: Dict[str, int],
+        words: Dict[str, Tuple[str, str]],
+        letter_values: Dict[str, int],
+        bonus: Callable[[int, int], int],
+    ) -> None:
+        self.letters = [letter for letter in sorted(hand) if hand[letter] > 0]
+        self.length = sum(hand[letter] for letter in self.letters)
+        self.guard = 0
+        self._radix = {}
+        self._shift = {}
+        stride = 1
+        for i, letter in enumerate(self.letters):
+            self._radix[letter] = stride
+            self._shift[letter] = FIELD_BITS * i
+            self.guard |= 1 << (FIELD_BITS * i + FIELD_BITS - 1)
+            stride *= hand[letter] + 1
+        self.size = stride
+        self.root = self._key(hand)
+
+        # (packed, index, length, points, number, played word, word) of every
+        # move, shortest first, the number being its position in the list
+        played_words = sorted(
+            (
+                (word, played)
+                for word, played in words.values()
+                if all(
+                    hand.get(letter, 0) >= n for letter, n in _counts(played).items()
+                )
+            ),
+            key=lambda move: len(move[1]),
+        )
+        self.moves = [
+            (
+                *self._key(_counts(played)),
+                len(played),
+                sum(letter_values.get(letter, 0) for letter in played),
+                number,
+                played,
+                word,
+            )
+            for number, (word, played) in enumerate(played_words)
+        ]
+        self._bonus = [
+            [bonus(length, hand_length) for hand_length in range(self.length + 1)]
+            for length in range(self.length + 1)
+        ]
+        # Best total of every sub-multiset (-1 until solved) and the number
+        # of the move it starts with (-1 for none)
+        self.totals = array("i", [-1]) * self.size
+        self.choices = array("i", [-1]) * self.size
+        self.solved = 0
+        self._deadline = float("inf")
+        self._calls = 0
+
+    def _key(self, counts: Dict[str, int]) -> Tuple[int, int]:
+        # (packed counts, mixed-radix index) of a sub-multiset
+        packed = index = 0
+        for letter, count in counts.items():
+            packed |= count << self._shift[letter]
+            index += count * self._radix[letter]
+        return packed, index
+
+    def plan(self, time_budget: Optional[float] = None) -> Plan:
+        """
+        Returns the best plan of the hand, or the best plan found in
+        time_budget seconds if the search takes longer: at worst, the plan
+        playing the best word of every turn.
+        """
+        if time_budget is not None:
+            self._deadline = time.perf_counter() + time_budget
+        packed, index = self.root
+        best_score, best_moves = self._greedy(packed, self.length)
+        complete = True
+
+        # At the top, the words are tried from the highest scoring one down
+        # and the plan is kept after each of them, so running out of time
+        # leaves the best plan among the first words tried
+        fitting = [
+            move
+            for move in self.moves
+            if move[2] <= self.length and self._fits(move[0], packed)
+        ]
+        fitting.sort(key=lambda move: -move[3] * self._bonus[move[2]][self.length])
+        try:
+            for move in fitting:
+                score = move[3] * self._bonus[move[2]][self.length]
+                score += self._solve(
+                    packed - move[0], index - move[1], self.length - move[2], fitting
+                )
+                if score > best_score:
+                    best_score = score
+                    best_moves = [self._planned(move, self.length)]
+                    best_moves += self._follow(
+                        packed - move[0], index - move[1], self.length - move[2]
+                    )
+        except OutOfTime:
+            complete = False
+        return Plan(best_score, tuple(best_moves), complete)
+
+    def _fits(self, packed: int, hand_packed: int) -> bool:
+        # No field borrows from the guard bit above it
+        return ((hand_packed | self.guard) - packed) & self.guard == self.guard
+
+    def _solve(self, packed: int, index: int, length: int, moves: List[Tuple]) -> int:
+        # moves hold every move fitting in the sub-multiset, the moves which
+        # fit in the hand it was left from
+        total = self.totals[index]
+        if total >= 0:
+            return total
+        self._calls += 1
+        if self._calls % CLOCK_INTERVAL == 0 and time.perf_counter() > self._deadline:
+            raise OutOfTime
+        guard = self.guard
+        fitting = [
+            move
+            for move in moves
+            if move[2] <= length and ((packed | guard) - move[0]) & guard == guard
+        ]
+        best, choice = 0, -1
+        bonus = self._bonus
+        for move in fitting:
+            move_packed, move_index, move_length, points = move[:4]
+            score = points * bonus[move_length][length] + self._solve(
+                packed - move_packed, index - move_index, length - move_length, fitting
+            )
+            if score > best:
+                best, choice = score, move[4]
+        self.totals[index] = best
+        self.choices[index] = choice
+        self.solved += 1
+        return best
+
+    def _follow(self, packed: int, index: int, length: int) -> List[PlannedMove]:
+        # The moves of the solved sub-multiset, from its table entries
+        moves = []
+        while self.choices[index] >= 0:
+            move = self.moves[self.choices[index]]
+            moves.append(self._planned(move, length))
+            packed, index, length = packed - move[0], index - move[1], length - move[2]
+        return moves
+
+    def _greedy(self, packed: int, length: int) -> Tuple[int, List[PlannedMove]]:
+        # The plan taking the best word of every turn
+        total, moves = 0, []
+        while True:
+            fitting = [
+                move
+                for move in self.moves
+                if move[2] <= length and self._fits(move[0], packed)
+            ]
+            if not fitting:
+                return total, moves
+            move = max(fitting, key=lambda move: move[3] * self._bonus[move[2]][length])
+            moves.append(self._planned(move, length))
+            total += moves[-1][2]
+            packed, length = packed - move[0], length - move[2]
+
+    def _planned(self, move: Tuple, hand_length: int) -> PlannedMove:
+        _, _, length, points, _, played, word = move
+        return word, played, points * self._bonus[length][hand_length]
+
+
+def _counts(word: str) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for letter in word:
+        counts[letter] = counts.get(letter, 0) + 1
+    return counts
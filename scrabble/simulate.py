@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Headless self-play of the computer player, to evaluate it offline.
+
+Deals the given number of hands and lets the computer play each of them
+without any prompt or output, spread over worker processes which load the
+dictionary once each. Every hand is dealt from its own random generator
+seeded from the seed and the number of the hand, so the hands and the
+scores only depend on the seed, not on the number of workers.
+
+Run it from the terminal-games directory:
+
+    python -m scrabble.simulate --hands 100000 --seed 42 --workers 4
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from words.wordfile import load_word_dict
+
+from . import main
+from .lexicon import Lexicon
+
+# Number of hands a worker plays per task
+CHUNK_SIZE = 500
+
+# Dictionary of the worker process, loaded once by init_worker
+WORD_DICT: Optional[Lexicon] = None
+
+
+def init_worker(hand_size: Optional[int] = None) -> None:
+    """
+    Loads the dictionary of a worker process, ready for hands of hand_size
+    letters (see main.prepare_lexicon).
+    """
+    global WORD_DICT
+    here = os.path.dirname(os.path.abspath(__file__))
+    WORD_DICT = Lexicon(load_word_dict(os.path.join(here, main.WORDS_FILENAME)))
+    main.prepare_lexicon(WORD_DICT, hand_size)
+
+
+def hand_rng(seed: int, hand_number: int) -> random.Random:
+    """
+    Returns the random generator the hand number hand_number is dealt from.
+    """
+    return random.Random(f"{seed}:{hand_number}")
+
+
+def play_hands(
+    seed: int, start: int, stop: int, hand_size: int, plan: bool = False
+) -> List[int]:
+    """
+    Deals the hands numbered start to stop - 1 and returns the score of the
+    computer for each of them. With plan the computer plans the words of the
+    whole hand (see main.COMP_PLANS_HAND), without changing that setting.
+    """
+    if WORD_DICT is None:
+        init_worker(hand_size)
+    scores = []
+    for hand_number in range(start, stop):
+        hand = main.deal_hand(hand_size, hand_rng(seed, hand_number))
+        moves = main.comp_moves(hand, WORD_DICT, plans_hand=plan)
+        scores.append(sum(score for _, _, score in moves))
+    return scores
+
+
+def simulate(
+    hands: int, seed: int, workers: int, hand_size: int, plan: bool = False
+) -> List[int]:
+    """
+    Returns the scores of the computer for the hands dealt from seed, in the
+    order of the hands. With workers set to 0 the hands are played in this
+    process.
+    """
+    chunks = [
+        (seed, start, min(start + CHUNK_SIZE, hands), hand_size, plan)
+        for start in range(0, hands, CHUNK_SIZE)
+    ]
+    if workers == 0:
+        return [score for chunk in chunks for score in play_hands(*chunk)]
+
+    scores = []
+    with ProcessPoolExecutor(
+        workers, initializer=init_worker, initargs=(hand_size,)
+    ) as executor:
+        for chunk_scores in executor.map(play_hands, *zip(*chunks)):
+            scores.extend(chunk_scores)
+    return scores
+
+
+def print_report(scores: List[int], elapsed: float, bins: int = 10) -> None:
+    """
+    Prints the distribution of the scores and the number of hands played
+    per second.
+    """
+    print(f"Hands:      {len(scores)}")
+    print(f"Time:       {elapsed:.2f} s ({len(scores) / elapsed:.1f} hands/s)")
+    if not scores:
+        return
+    stdev = statistics.pstdev(scores)
+    print(f"Mean score: {statistics.mean(scores):.2f} (stdev {stdev:.2f})")
+    ordered = sorted(scores)
+    percentiles = ("min", 0), ("p10", 10), ("p50", 50), ("p90", 90), ("max", 100)
+    print(
+        "Scores:     "
+        + "  ".join(
+            f"{name} {ordered[(len(ordered) - 1) * p // 100]}"
+            for name, p in percentiles
+        )
+    )
+
+    low, high = ordered[0], ordered[-1]
+    width = max(1, -(-(high - low + 1) // bins))
+    counts = [0] * bins
+    for score in scores:
+        counts[(score - low) // width] += 1
+    print()
+    for i, count in enumerate(counts):
+        if not count:
+            continue
+        start = low + i * width
+        bar = "#" * round(50 * count / len(scores))
+        print(f"{start:>5}-{start + width - 1:<5} {count:>8}  {bar}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Let the computer play Scrabble hands without prompts."
+    )
+    parser.add_argument("--hands", type=int, default=1000, help="hands to play")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the deals")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="worker processes, 0 to play in this process",
+    )
+    parser.add_argument(
+        "--hand-size", type=int, default=main.HAND_SIZE, help="letters per hand"
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="plan the words of the whole hand instead of the best word first",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    start_time = time.perf_counter()
+    scores = simulate(args.hands, args.seed, args.workers, args.hand_size, args.plan)
+    print_report(scores, time.perf_counter() - start_time)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batch solver of Scrabble hands, to analyse many deals offline.
+
+Reads one hand per line of JSONL, from a file or stdin, and writes one line
+of JSON per hand with its best word (see top_k), the score of the word
+and the next best words. A hand is either a JSON string of its
+letters, e.g. "aehlp*t", or an object with the letters (or the letter
+counts) under "hand" and any "id", which is copied to the output:
+
+    {"id": 7, "hand": "aehlp*t"}
+
+gives
+
+    {"id": 7, "hand": "aehlp*t", "word": "heeltap", "played": "h*eltap",
+     "score": 539, "alternatives": [{"word": "haplite", "played": ...,
+     "score": 539}, ...]}
+
+Lines which aren't hands are answered with an "error". The lines are
+solved in chunks by worker processes, which load the dictionary once each.
+At most a few chunks per worker are read ahead of the output, so memory
+stays bounded however long the input is, and the output comes in the
+order of the input.
+
+Run it from the terminal-games directory:
+
+    python -m scrabble.solve hands.jsonl --top 5 --workers 4 > solved.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+from words.wordfile import load_word_dict
+
+from . import main
+from .hand import Hand
+from .lexicon import Lexicon
+
+# Number of lines a worker solves per task
+CHUNK_SIZE = 200
+
+# Chunks read ahead of the output per worker
+CHUNKS_AHEAD = 2
+
+# Dictionary of the worker process, loaded once by init_worker
+WORD_DICT: Optional[Lexicon] = None
+
+
+def init_worker() -> None:
+    """
+    Loads the dictionary of a worker process, ready for hands of HAND_SIZE
+    letters (see main.prepare_lexicon).
+    """
+    global WORD_DICT
+    here = os.path.dirname(os.path.abspath(__file__))
+    WORD_DICT = Lexicon(load_word_dict(os.path.join(here, main.WORDS_FILENAME)))
+    main.prepare_lexicon(WORD_DICT)
+
+
+def solve_hand(hand: Hand, top: int) -> Dict:
+    """
+    Returns the best move of the hand, its played word and score, and the
+    top next best moves. All of them come from the same top_k, so that they
+    are scored the same way.
+    """
+    if WORD_DICT is None:
+        init_worker()
+    moves = main.top_k(hand, WORD_DICT, top + 1)
+    if not moves:
+        return {"word": None, "played": None, "score": 0, "alternatives": []}
+    (word, played_word, score), *alternatives = moves
+    return {
+        "word": word,
+        "played": played_word,
+        "score": score,
+        "alternatives": [
+            {"word": other, "played": played, "score": other_score}
+            for other, played, other_score in alternatives
+        ],
+    }
+
+
+def solve_line(line: str, top: int) -> Dict:
+    """
+    Returns the answer to a line of the input.
+    """
+    try:
+        request = json.loads(line)
+        if isinstance(request, str):
+            request = {"hand": request}
+        letters = request["hand"]
+        hand = Hand(letters.lower() if isinstance(letters, str) else letters)
+    except (ValueError, KeyError, TypeError, AttributeError) as error:
+        return {"error": f"not a hand: {error!r}", "line": line.rstrip("\n")}
+    answer = {"id": request["id"]} if "id" in request else {}
+    answer["hand"] = letters
+    answer.update(solve_hand(hand, top))
+    return answer
+
+
+def solve_lines(lines: List[str], top: int) -> List[str]:
+    """
+    Returns the lines of JSON answering the lines of the input, skipping
+    the blank ones.
+    """
+    return [json.dumps(solve_line(line, top)) for line in lines if line.strip()]
+
+
+def solve(
+    lines: Iterable[str],
+    top: int = 3,
+    workers: int = 0,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[str]:
+    """
+    Yields the lines of JSON answering the lines of the input, in order.
+    With workers set to 0 the lines are solved in this process.
+    """
+    lines = iter(lines)
+    chunks = iter(lambda: list(islice(lines, chunk_size)), [])
+    if workers == 0:
+        for chunk in chunks:
+            yield from solve_lines(chunk, top)
+        return
+
+    with ProcessPoolExecutor(workers, initializer=init_worker) as executor:
+        # The oldest chunk is written out before the next one is submitted,
+        # so that no more than CHUNKS_AHEAD chunks per worker are in memory
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(solve_lines, chunk, top))
+            if len(pending) >= workers * CHUNKS_AHEAD:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def write_lines(answers: Iterable[str], output: TextIO) -> int:
+    """
+    Writes the answers to output as they come and returns their number.
+    """
+    count = 0
+    for answer in answers:
+        output.write(answer + "\n")
+        count += 1
+    return count
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Find the best words of Scrabble hands read as JSONL."
+    )
+    parser.add_argument(
+        "input",
+        nargs="?",
+        type=argparse.FileType("r"),
+        default=sys.stdin,
+        help="file of hands, stdin if - or missing",
+    )
+    parser.add_argument(
+        "--output",
+        type=argparse.FileType("w"),
+        default=sys.stdout,
+        help="file to write the answers to, stdout if missing",
+    )
+    parser.add_argument(
+        "--top", type=int, default=3, help="next best words given for each hand"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="worker processes, 0 to solve in this process",
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=CHUNK_SIZE, help="lines per task"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    write_lines(solve(args.input, args.top, args.workers, args.chunk_size), args.output)
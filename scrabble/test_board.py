@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import random
+from collections import Counter
+
+import pytest
+
+from .board import (
+    BOARD_SIZE,
+    PREMIUM_ROWS,
+    RACK_SIZE,
+    Bag,
+    Board,
+    BoardGame,
+    BoardMove,
+    find_move,
+    generate_moves,
+    parse_square,
+)
+from .dawg import Dawg
+from .hand import Hand
+
+WORDS = ["hello", "rapture", "ah", "ha", "eh", "he", "la", "at", "ta", "tea", "eta"]
+
+TEST_PARSE_SQUARE = [
+    ("H8", (7, 7, True)),
+    ("8h", (7, 7, False)),
+    ("a15", (14, 0, True)),
+    ("15O", (14, 14, False)),
+]
+
+TEST_PARSE_SQUARE_INVALID = ["P1", "A16", "A0", "8", "HH", ""]
+
+TEST_FIRST_MOVES = [
+    ("hello", BoardMove(7, 7, True, "hello", "hello", 18)),
+    ("hello", BoardMove(7, 3, True, "hello", "hello", 24)),
+    ("hello", BoardMove(3, 7, False, "hello", "hello", 24)),
+    ("rapture", BoardMove(7, 7, True, "rapture", "rapture", 70)),
+    ("*ello", BoardMove(7, 7, True, "Hello", "*ello", 10)),
+]
+
+TEST_NEXT_MOVES = [
+    # Both tiles form a word down with the tiles above them
+    ("ah", BoardMove(8, 7, True, "ah", "ah", 23)),
+    ("*h", BoardMove(8, 7, True, "Ah", "*h", 21)),
+    ("a", BoardMove(7, 9, False, "la", "a", 2)),
+]
+
+TEST_FIND_MOVE_INVALID = [
+    ("H8", "zzz", "tiles"),
+    ("H9", "ha", "connect"),
+    ("H8", "jello", "match"),
+    ("H8", "hello", "at least one"),
+    ("H9", "aa", "dictionary"),
+    ("O9", "ah", "fit"),
+]
+
+
+def words_on_board(grid):
+    words = []
+    for lines in (grid, zip(*grid)):
+        for line in lines:
+            words += [word for word in "".join(t or " " for t in line).split()]
+    return [word.lower() for word in words if len(word) > 1]
+
+
+@pytest.fixture(scope="module")
+def dawg():
+    return Dawg.from_words(WORDS)
+
+
+@pytest.fixture
+def board():
+    board = Board()
+    board.place(BoardMove(7, 7, True, "hello", "hello", 18))
+    return board
+
+
+def test_premium_layout():
+    counts = Counter("".join(PREMIUM_ROWS))
+    assert counts == {".": 164, "d": 24, "t": 12, "D": 17, "T": 8}
+    assert PREMIUM_ROWS == ["".join(column) for column in zip(*PREMIUM_ROWS)]
+
+
+def test_bag():
+    bag = Bag(random.Random(1))
+    assert len(bag) == 100
+    assert Counter(bag.tiles)["*"] == 2
+    rack = bag.draw(RACK_SIZE)
+    assert len(rack) == RACK_SIZE and len(bag) == 93
+    assert len(bag.exchange(rack[:3])) == 3 and len(bag) == 93
+    assert len(bag.draw(200)) == 93 and not bag
+
+
+@pytest.mark.parametrize("square, expected", TEST_PARSE_SQUARE)
+def test_parse_square(square, expected):
+    assert parse_square(square) == expected
+
+
+@pytest.mark.parametrize("square", TEST_PARSE_SQUARE_INVALID)
+def test_parse_square_invalid(square):
+    with pytest.raises(ValueError):
+        parse_square(square)
+
+
+@pytest.mark.parametrize("rack, expected", TEST_FIRST_MOVES)
+def test_first_moves(rack, expected, dawg):
+    moves = generate_moves(Board(), Hand(rack), dawg)
+    assert expected in moves
+    # The first word covers the center square
+    for move in moves:
+        start = move.col if move.across else move.row
+        assert start <= BOARD_SIZE // 2 < start + len(move.word)
+
+
+@pytest.mark.parametrize("rack, expected", TEST_NEXT_MOVES)
+def test_next_moves(rack, expected, dawg, board):
+    moves = generate_moves(board, Hand(rack), dawg)
+    assert expected in moves
+    assert len(set(moves)) == len(moves)
+
+
+def test_moves_form_words(dawg, board):
+    for rack in ["ahet", "*ta", "lae*"]:
+        for move in generate_moves(board, Hand(rack), dawg):
+            after = Board()
+            after.grid = [line[:] for line in board.grid]
+            after.place(move)
+            assert all(word in WORDS for word in words_on_board(after.grid))
+            assert Hand(rack).can_form(move.tiles)
+
+
+def test_find_move(dawg, board):
+    assert find_move(board, Hand("ah"), dawg, "H9", "ah").score == 23
+    assert find_move(board, Hand("*h"), dawg, "H9", "Ah").tiles == "*h"
+
+
+def test_find_move_single_tile(dawg, board):
+    # The tile forms "at" across and "ha" down, both spellings are the move
+    board.grid[8][8] = "t"
+    across = find_move(board, Hand("a"), dawg, "H9", "at")
+    down = find_move(board, Hand("a"), dawg, "8H", "ha")
+    assert (across.row, across.col, across.across) == (8, 7, True)
+    assert (down.row, down.col, down.across) == (7, 7, False)
+    assert across.tiles == down.tiles == "a"
+    assert across.score == down.score
+
+
+@pytest.mark.parametrize("square, word, reason", TEST_FIND_MOVE_INVALID)
+def test_find_move_invalid(square, word, reason, dawg, board):
+    with pytest.raises(ValueError, match=reason):
+        find_move(board, Hand("aah"), dawg, square, word)
+
+
+def test_board_game(dawg):
+    game = BoardGame(dawg, rng=random.Random(3))
+    game.racks[0] = Hand("helloab")
+    game.play_move(BoardMove(7, 7, True, "hello", "hello", 18))
+    assert game.scores == [18, 0] and game.turn == 1
+    assert len(game.racks[0]) == RACK_SIZE and game.racks[0]["a"] >= 1
+    assert len(game.bag) == 100 - 2 * RACK_SIZE - 5
+
+    for _ in range(5):
+        game.exchange()
+    assert not game.is_over()
+    game.exchange()
+    assert game.is_over()
+
+    game.racks = [Hand(""), Hand("qz")]
+    assert game.final_scores() == [18 + 20, -20]
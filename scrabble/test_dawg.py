@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import pytest
+
+from words.wordfile import WordStore
+
+from .dawg import ROOT, Dawg, load_dawg
+
+WORDS = ["at", "ate", "eat", "tea", "teas", "tees", "ta", "seat", "sea"]
+
+TEST_IS_WORD = [
+    ("at", True),
+    ("teas", True),
+    ("tee", False),
+    ("eats", False),
+    ("a", False),
+    ("", False),
+]
+
+
+@pytest.mark.parametrize("word, expected", TEST_IS_WORD)
+def test_is_word(word, expected):
+    assert Dawg.from_words(WORDS).is_word(word) == expected
+
+
+def test_from_words_merges_suffixes():
+    dawg = Dawg.from_words(WORDS)
+    # Words which no other word goes on from all end on the same node
+    assert dawg.walk("eat") == dawg.walk("ate") == dawg.walk("ta")
+    assert dawg.walk("tea") != dawg.walk("sea")
+    assert list(dawg.edges[ROOT]) == ["a", "e", "s", "t"]
+    assert dawg.walk("x") is None
+
+
+def test_load_dawg_caches_the_dawg(tmp_path):
+    path = str(tmp_path / "words.dawg")
+    store = WordStore.from_word_dict({"2a": ["at"], "3t": ["tea"]}, bytes(range(32)))
+    dawg = load_dawg(store, path)
+    cached = load_dawg(store, path)
+    assert (cached.edges, cached.terminal) == (dawg.edges, dawg.terminal)
+
+    other = WordStore.from_word_dict({"2a": ["at"]}, bytes(32 * [1]))
+    assert not load_dawg(other, path).is_word("tea")
+    with pytest.raises(ValueError):
+        Dawg.from_bytes(open(path, "rb").read(), store.digest)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import pytest
+
+from .hand import Hand
+
+TEST_CAN_FORM = [
+    ("hello", "hello", True),
+    ("hello", "hell", True),
+    ("helo", "hello", False),
+    ("h*llo", "h*llo", True),
+    ("h*llo", "hello", False),
+    ("abc", "ab1", False),
+    ("abc", "", True),
+]
+
+TEST_CAN_COVER = [
+    ("h*llo", "hello", "aeiou", True),
+    ("h*llo", "hallo", "aeiou", True),
+    ("h*llo", "hullo", "e", False),
+    ("h**lo", "hello", "el", True),
+    ("h*llo", "h*llo", "aeiou", True),
+    ("h*llo", "h*lla", "aeiou", False),
+    ("hello", "hellos", "s", False),
+]
+
+TEST_MINUS = [
+    ("quaillm", "quail", "lm"),
+    ("evvnill", "evil", "vnl"),
+    ("hello", "hellos", ""),
+    ("h*llo", "h*", "llo"),
+]
+
+TEST_PLUS = [
+    ("ab", "ba*", "aabb*"),
+    ("", "xyz", "xyz"),
+    ("abc", "", "abc"),
+]
+
+TEST_REPLACE = [
+    ("ab*", "*", "a", "aab"),
+    ("abb", "b", "z", "azz"),
+    ("abc", "d", "e", "abc"),
+    ("abc", "a", "a", "abc"),
+]
+
+
+@pytest.mark.parametrize("letters, word, expected", TEST_CAN_FORM)
+def test_can_form(letters, word, expected):
+    assert Hand(letters).can_form(word) == expected
+
+
+@pytest.mark.parametrize("letters, word, wild_letters, expected", TEST_CAN_COVER)
+def test_can_cover(letters, word, wild_letters, expected):
+    assert Hand(letters).can_cover(word, wild_letters) == expected
+
+
+@pytest.mark.parametrize("letters, word, expected", TEST_MINUS)
+def test_minus(letters, word, expected):
+    hand = Hand(letters)
+    outcome = hand.minus(word)
+    assert outcome == Hand(expected)
+    assert len(outcome) == len(expected)
+    assert hand == Hand(letters), "Implementation mutated the original hand."
+
+
+@pytest.mark.parametrize("letters, added, expected", TEST_PLUS)
+def test_plus(letters, added, expected):
+    outcome = Hand(letters).plus(added)
+    assert outcome == Hand(expected)
+    assert len(outcome) == len(expected)
+
+
+@pytest.mark.parametrize("letters, letter, new_letter, expected", TEST_REPLACE)
+def test_replace(letters, letter, new_letter, expected):
+    assert Hand(letters).replace(letter, new_letter) == Hand(expected)
+
+
+def test_reads_like_a_dict():
+    hand = Hand({"a": 2, "b": 0, "*": 1})
+    assert hand == {"a": 2, "b": 0, "*": 1}
+    assert hand.to_dict() == {"a": 2, "*": 1}
+    assert len(hand) == 3
+    assert hand["a"] == 2 and hand["b"] == 0
+    assert "a" in hand and "b" not in hand and "1" not in hand
+    assert hash(hand) == hash(Hand("a*a"))
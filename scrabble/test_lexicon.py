@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from words.instrument import PROFILER
+
+from . import lexicon as lexicon_module
+from .hand import Hand
+from .lexicon import (
+    Candidates,
+    Lexicon,
+    SignatureSearch,
+    signature,
+    sub_signatures,
+)
+
+TEST_SIGNATURE = [
+    ("", ""),
+    ("tea", "aet"),
+    ("eat", "aet"),
+    ("hello", "ehllo"),
+]
+
+TEST_SUB_SIGNATURES = [
+    ({"a": 1, "t": 1}, "", [("at", "", 0)]),
+    ({"a": 1, "t": 1, "*": 1}, "", [("at", "", 0)]),
+    ({"a": 2, "b": 0}, "", [("aa", "", 0)]),
+    (
+        {"a": 1, "b": 1, "c": 1},
+        "",
+        [("bc", "", 0), ("ac", "", 0), ("ab", "", 0), ("abc", "", 0)],
+    ),
+    ({"t": 1, "*": 1}, "ae", [("at", "a", 0), ("et", "e", 0)]),
+    ({"t": 1, "*": 0}, "ae", []),
+]
+
+TEST_SUB_SIGNATURES_POINTS = [
+    ({"a": 1, "q": 1}, "", [("aq", "", 11)]),
+    ({"q": 1, "*": 1}, "ae", [("aq", "a", 11), ("eq", "e", 10)]),
+]
+
+TEST_IS_WORD = [
+    ("ate", True),
+    ("tea", True),
+    ("eta", False),
+    ("", False),
+    ("zzz", False),
+]
+
+TEST_MATCHES = [
+    ("t*a", "ae", True),
+    ("t*a", "a", False),
+    ("**a", "ae", False),
+    ("**a", "aet", True),
+    ("*t*", "ae", True),
+    ("***", "ae", False),
+    ("t**a", "ae", False),
+]
+
+
+LETTER_VALUES = {"a": 1, "e": 0, "q": 10}
+
+
+@pytest.mark.parametrize("word, expected", TEST_SIGNATURE)
+def test_signature(word, expected):
+    assert signature(word) == expected
+
+
+@pytest.mark.parametrize("hand, wild_letters, expected", TEST_SUB_SIGNATURES)
+def test_sub_signatures(hand, wild_letters, expected):
+    assert list(sub_signatures(hand, wild_letters)) == expected
+
+
+@pytest.mark.parametrize("hand, wild_letters, expected", TEST_SUB_SIGNATURES_POINTS)
+def test_sub_signatures_points(hand, wild_letters, expected):
+    assert list(sub_signatures(hand, wild_letters, LETTER_VALUES)) == expected
+
+
+def test_anagram_ids():
+    lexicon = Lexicon({"2a": ["at"], "2t": ["ta"], "3a": ["ate"], "3t": ["tea"]})
+    assert list(lexicon.anagram_ids("aet")) == [2, 3]
+    assert list(lexicon.anagram_ids("at")) == [0, 1]
+    assert list(lexicon.anagram_ids("eat")) == []
+
+
+@pytest.mark.parametrize("word, expected", TEST_IS_WORD)
+def test_is_word(word, expected):
+    lexicon = Lexicon({"3a": ["ate"], "3t": ["tea"], "3e": []})
+    assert lexicon.is_word(word) == expected
+
+
+def test_candidates_narrow():
+    lexicon = Lexicon({"2a": ["at"], "2t": ["ta"], "3a": ["ate"], "3t": ["tea"]})
+    candidates = Candidates(Hand("tea*"), "ae")
+    assert candidates.word_ids("aet", lexicon) == (2, 3)
+    assert candidates.word_ids("et", lexicon) == ()
+
+    narrowed = candidates.narrow(Hand("et*"))
+    assert [entry[0] for entry in narrowed] == ["at", "ae", "ee", "aet", "eet"]
+    assert narrowed.word_ids("aet", lexicon) == (2, 3)
+
+
+@pytest.mark.parametrize("pattern, wild_letters, expected", TEST_MATCHES)
+@pytest.mark.parametrize("max_expansions", [676, 0])
+def test_matches(pattern, wild_letters, expected, max_expansions, monkeypatch):
+    monkeypatch.setattr(lexicon_module, "MAX_PATTERN_EXPANSIONS", max_expansions)
+    lexicon = Lexicon({"3a": ["ate"], "3t": ["tea"], "4t": ["teat"]})
+    assert lexicon.matches(pattern, wild_letters) == expected
+
+
+def test_matches_counts_words_checked(monkeypatch):
+    monkeypatch.setattr(PROFILER, "enabled", True)
+    monkeypatch.setattr(PROFILER, "counters", Counter())
+    lexicon = Lexicon({"3a": ["ate"], "3t": ["tea"], "4t": ["teat"]})
+    # Looks up "taa" and "tea", then "aaa" to "eee"
+    assert lexicon.matches("t*a", "ae")
+    assert not lexicon.matches("***", "ae")
+    assert PROFILER.counters["scrabble.wildcard_expansions"] == 2 + 8
+    # Scans the 3 letter words starting with "t"
+    monkeypatch.setattr(lexicon_module, "MAX_PATTERN_EXPANSIONS", 0)
+    assert lexicon.matches("t*a", "e")
+    assert PROFILER.counters["scrabble.wildcard_expansions"] == 2 + 8 + 1
+
+
+def test_indexes_built_once_across_threads(monkeypatch):
+    lexicon = Lexicon({"2a": ["at"], "2t": ["ta"], "3a": ["ate"], "3t": ["tea"]})
+    built = []
+    build_index = lexicon_module.SignatureIndex
+
+    def slow_index(*args):
+        built.append(args)
+        time.sleep(0.01)
+        return build_index(*args)
+
+    monkeypatch.setattr(lexicon_module, "SignatureIndex", slow_index)
+    values = {"a": 1, "e": 2, "t": 3}
+    indexes = []
+    anagrams = []
+
+    def first_use():
+        indexes.append(lexicon.signature_index(values))
+        anagrams.append(list(lexicon.anagram_ids("aet")))
+
+    threads = [threading.Thread(target=first_use) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(built) == 1
+    assert all(index is indexes[0] for index in indexes)
+    assert anagrams == [[2, 3]] * 4
+
+
+def test_signature_search():
+    lexicon = Lexicon(
+        {"2a": ["at"], "2t": ["ta"], "3a": ["ate"], "3t": ["tea"], "4t": ["teat"]}
+    )
+    values = {"a": 1, "e": 2, "t": 3}
+    search = SignatureSearch(lexicon, Hand("t**"), "ae", values, lambda n: n)
+    assert list(search) == [(18, "aet", "ae"), (8, "at", "a")]
+
+    # Raising the floor prunes the signatures which can't reach it
+    search = SignatureSearch(lexicon, Hand("tte*"), "ae", values, lambda n: n)
+    found = []
+    for entry in search:
+        found.append(entry)
+        search.floor = entry[0] + 1
+    assert found == [(36, "aett", "a")]
@@ -1,8 +1,32 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import logging
+import random
+import re
+from concurrent.futures import ThreadPoolExecutor
+from string import ascii_lowercase
+
 import pytest
 
-from .main import get_word_score, is_valid_word, load_words, update_hand
+from . import main
+from .hand import Hand
+from .main import (
+    MOVE_CACHE,
+    GameSession,
+    SpeculativePlay,
+    calculate_handlen,
+    comp_choose_move,
+    comp_choose_word,
+    comp_play_hand,
+    deal_hand,
+    get_word_score,
+    is_valid_word,
+    load_words,
+    play_hand,
+    search_move,
+    substitute_hand,
+    update_hand,
+)
 
 WORD_DICT = load_words()
 
@@ -42,6 +66,8 @@ TEST_VALID_WORD = [
     ({"r": 1, "a": 3, "p": 2, "t": 1, "u": 2}, "honey", False),
     ({"e": 1, "v": 2, "n": 1, "i": 1, "l": 2}, "EVIL", True),
     ({"e": 1, "v": 2, "n": 1, "i": 1, "l": 2}, "Even", False),
+    ({"c": 2, "h": 1, "a": 2, "r": 2, "t": 1, "e": 1, "s": 1}, "characters", True),
+    ({"a": 1, "t": 1}, "", False),
 ]
 
 TEST_WILDCARD = [
@@ -51,6 +77,43 @@ TEST_WILDCARD = [
     ({"c": 1, "o": 1, "*": 1, "w": 1, "s": 1, "z": 1, "y": 2}, "c*wz", False),
 ]
 
+TEST_WILDCARDS_ANY_LETTER = [
+    ({"h": 1, "*": 2, "e": 1, "y": 1}, "h**ey", True),
+    ({"c": 1, "*": 2, "s": 1}, "c**s", True),
+    ({"*": 2, "x": 1}, "**x", True),
+    ({"h": 1, "*": 2, "e": 1, "y": 1}, "h*ey", False),
+    ({"q": 1, "*": 2}, "q**q", False),
+]
+
+TEST_COMP_CHOOSE_WORD = [
+    ({"a": 1, "c": 1, "t": 1, "*": 1}, "acta"),
+    ({"h": 1, "e": 1, "l": 2, "o": 1, "*": 0}, "hello"),
+    ({"q": 1, "z": 1, "x": 1, "*": 1}, "zax"),
+    ({"w": 1, "z": 1, "*": 1, "r": 2, "d": 1, "k": 1}, "zerk"),
+    ({"x": 1, "q": 1, "*": 0}, None),
+]
+
+TEST_COMP_PLANS_HAND = [
+    ({"a": 1, "c": 1, "p": 1, "u": 1, "v": 1, "x": 1, "*": 1}, 261, 304),
+    ({"a": 1, "c": 1, "e": 1, "x": 1, "z": 2, "*": 1}, 377, 459),
+    ({"c": 2, "k": 1, "q": 1, "u": 2, "*": 1}, 551, 551),
+]
+
+TEST_SPECULATIVE_PLAY = [
+    # (hand, words the player played, the computer keeps its play)
+    ("hello", [], True),
+    ("hello", ["zax", "hell"], True),
+    ("hello", ["hello"], False),
+    ("acpuvx*", ["cup"], True),
+]
+
+TEST_MOVE_RULES = [
+    # (hand, move with vowel wildcards, move with wildcards of any letter)
+    ("a*", ("aa", "*a", 14), ("za", "*a", 14)),
+    ("ox*", ("oxo", "*xo", 189), ("fox", "*ox", 189)),
+    ("ta*", ("ate", "at*", 42), ("qat", "*at", 42)),
+]
+
 
 @pytest.mark.parametrize("word, n, expected", TEST_SCORE)
 def test_get_word_score(word, n, expected):
@@ -80,3 +143,174 @@ def test_wildcard(handorig, word, expected):
     outcome = is_valid_word(word, handcopy, WORD_DICT)
     assert outcome == expected
     assert handcopy == handorig, "Implementation mutated the original hand."
+
+
+@pytest.mark.parametrize("handorig, expected", TEST_COMP_CHOOSE_WORD)
+def test_comp_choose_word(handorig, expected):
+    handcopy = handorig.copy()
+    outcome = comp_choose_word(handcopy, WORD_DICT, calculate_handlen(handcopy))
+    assert outcome == expected
+    assert handcopy == handorig, "Implementation mutated the original hand."
+
+
+def test_comp_choose_word_prunes(caplog):
+    hand = {"w": 1, "z": 1, "*": 1, "r": 2, "d": 1, "k": 1}
+    MOVE_CACHE.clear()
+    with caplog.at_level(logging.DEBUG, logger="scrabble.main"):
+        comp_choose_word(hand, WORD_DICT, calculate_handlen(hand))
+    pruned, total = map(int, re.findall(r"\d+", caplog.messages[-1]))
+    assert 0 < pruned < total
+
+
+def test_comp_choose_word_cache():
+    hand = {"h": 1, "e": 1, "l": 2, "o": 1}
+    MOVE_CACHE.clear()
+    assert comp_choose_word(hand, WORD_DICT, 5) == "hello"
+    assert comp_choose_word({"o": 1, "l": 2, "e": 1, "h": 1}, WORD_DICT, 5) == "hello"
+    assert MOVE_CACHE.info()[:2] == (1, 1)
+    # Words the hand can't form don't change the move
+    assert comp_choose_word(hand, WORD_DICT, 5, {"zax"}) == "hello"
+    assert MOVE_CACHE.hits == 2
+    assert comp_choose_word(hand, WORD_DICT, 5, {"zax", "hello"}) not in (
+        None,
+        "hello",
+    )
+    assert comp_choose_word(hand, WORD_DICT, 5, {"zax"}) == "hello"
+
+
+@pytest.mark.parametrize("hand, vowels_move, any_letter_move", TEST_MOVE_RULES)
+def test_comp_choose_move_cache_rules(hand, vowels_move, any_letter_move, monkeypatch):
+    MOVE_CACHE.clear()
+    assert comp_choose_move(hand, WORD_DICT, len(hand)) == vowels_move
+    monkeypatch.setattr(main, "WILDCARD_LETTERS", ascii_lowercase)
+    assert comp_choose_move(hand, WORD_DICT, len(hand)) == any_letter_move
+    monkeypatch.setitem(main.SCRABBLE_LETTER_VALUES, "x", 1)
+    assert comp_choose_move(hand, WORD_DICT, len(hand)) == search_move(
+        Hand(hand), WORD_DICT, len(hand)
+    )
+    MOVE_CACHE.clear()
+
+
+@pytest.mark.parametrize("handorig, word, expected", TEST_WILDCARDS_ANY_LETTER)
+def test_wildcards_any_letter(handorig, word, expected, monkeypatch):
+    monkeypatch.setattr(main, "WILDCARD_LETTERS", ascii_lowercase)
+    assert is_valid_word(word, handorig, WORD_DICT) == expected
+
+
+@pytest.mark.parametrize("handorig, expected", TEST_COMP_CHOOSE_WORD)
+def test_comp_choose_word_signature_search(handorig, expected, monkeypatch):
+    monkeypatch.setattr(main, "MAX_SUB_SIGNATURES", 0)
+    MOVE_CACHE.clear()
+    outcome = comp_choose_word(handorig, WORD_DICT, calculate_handlen(handorig))
+    MOVE_CACHE.clear()
+    assert outcome == expected
+
+
+def test_large_hands(monkeypatch):
+    monkeypatch.setattr(main, "WILDCARDS", 3)
+    monkeypatch.setattr(main, "WILDCARD_LETTERS", ascii_lowercase)
+    main.prepare_lexicon(WORD_DICT, 15)
+    hand = deal_hand(15, random.Random(15))
+    assert len(hand) == 15 and hand["*"] == 3
+    word, played_word, score = main.comp_choose_move(hand, WORD_DICT, len(hand))
+    assert is_valid_word(played_word, hand, WORD_DICT)
+    assert all(played in (letter, "*") for played, letter in zip(played_word, word))
+    assert score == get_word_score(played_word, len(hand))
+
+
+@pytest.mark.parametrize("handorig, greedy, planned", TEST_COMP_PLANS_HAND)
+def test_comp_plans_hand(handorig, greedy, planned, monkeypatch):
+    assert sum(score for *_, score in main.comp_moves(handorig, WORD_DICT)) == greedy
+    monkeypatch.setattr(main, "COMP_PLANS_HAND", True)
+    total = 0
+    for hand, played_word, score in main.comp_moves(handorig, WORD_DICT):
+        if played_word is not None:
+            assert is_valid_word(played_word, hand, WORD_DICT)
+            assert score == get_word_score(played_word, len(hand))
+            total += score
+    assert total == planned
+
+
+@pytest.mark.parametrize("handorig, player_words, holds", TEST_SPECULATIVE_PLAY)
+def test_speculative_play(handorig, player_words, holds):
+    speculation = SpeculativePlay(Hand(handorig), WORD_DICT)
+    moves = speculation.moves(Hand(handorig), player_words)
+    expected = list(main.comp_moves(handorig, WORD_DICT, player_words))
+    assert (moves == expected) if holds else moves is None
+    assert speculation.moves(Hand(handorig).minus(handorig[0]), []) is None
+
+
+def test_speculative_play_cancelled():
+    speculation = SpeculativePlay(Hand("hello"), WORD_DICT)
+    speculation.cancel()
+    assert speculation.moves(Hand("hello"), []) is None
+
+
+def test_comp_play_hand_speculation(capsys):
+    hand = Hand("acpuvx*")
+    expected = comp_play_hand(hand, WORD_DICT)
+    output = capsys.readouterr().out
+    speculation = SpeculativePlay(hand, WORD_DICT)
+    assert comp_play_hand(hand, WORD_DICT, speculation=speculation) == expected
+    assert capsys.readouterr().out == output
+
+
+def test_play_hand_session(monkeypatch, capsys):
+    session = GameSession()
+    session.comp_words.add("hello")
+    inputs = iter(["hello", "hell", "."])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(inputs))
+    assert play_hand(Hand("hello*"), WORD_DICT, session) == get_word_score("hell", 6)
+    assert session.player_words == {"hell"}
+    assert "played by the computer" in capsys.readouterr().out
+
+
+def test_comp_play_hand_sessions(capsys):
+    # Sessions played at once don't see each other's words
+    sessions = [GameSession() for _ in range(8)]
+    for session in sessions[::2]:
+        session.player_words.add("hello")
+    with ThreadPoolExecutor(4) as executor:
+        scores = list(
+            executor.map(
+                lambda session: comp_play_hand(Hand("hello"), WORD_DICT, session),
+                sessions,
+            )
+        )
+    for session, score in zip(sessions, scores):
+        assert ("hello" in session.comp_words) == ("hello" not in session.player_words)
+        assert score == comp_play_hand(Hand("hello"), WORD_DICT, session)
+
+
+def test_session_rng():
+    hands = []
+    for _ in range(2):
+        session = GameSession(random.Random(7))
+        hand = deal_hand(7, session.rng)
+        hands.append((hand, substitute_hand(hand, next(iter(hand)), session.rng)))
+    assert hands[0] == hands[1]
+
+
+def test_top_k():
+    hand = Hand("acpuvx*")
+    moves = list(main.playable_moves(hand, WORD_DICT))
+    assert any("*" in played_word for _, played_word, _ in moves)
+    for _, played_word, score in moves:
+        assert is_valid_word(played_word, hand, WORD_DICT)
+        assert score == get_word_score(played_word, len(hand))
+    best = main.top_k(hand, WORD_DICT, 5)
+    assert [score for *_, score in best] == sorted(
+        (score for *_, score in moves), reverse=True
+    )[:5]
+    assert best[0][0] not in [
+        word for word, *_ in main.top_k(hand, WORD_DICT, 5, {best[0][0]})
+    ]
+
+
+def test_play_hand_hint(monkeypatch, capsys):
+    inputs = iter(["?", "?", "."])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(inputs))
+    play_hand(Hand("hello*"), WORD_DICT)
+    output = capsys.readouterr().out
+    moves = main.top_k(Hand("hello*"), WORD_DICT, main.HINT_WORDS)
+    assert output.count("Hint:") == 1 and main.format_moves(moves) in output
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import pytest
+
+from .movecache import MISSING, MoveCache, values_digest
+
+DIGEST = bytes(range(32))
+
+RULES = ("aeiou", values_digest({"a": 1, "b": 3}))
+
+TEST_MOVES = [
+    ((b"\x01" * 27, 7, frozenset(), *RULES), ("hello", "hello", 98)),
+    ((b"\x02" * 27, 7, frozenset({"zax"}), *RULES), ("zerk", "ze*rk", 150)),
+    ((b"\x03" * 27, 5, frozenset(), *RULES), None),
+]
+
+TEST_OTHER_RULES = [
+    ("aeiouy", RULES[1]),
+    (RULES[0], values_digest({"a": 1, "b": 4})),
+    ("", ""),
+]
+
+
+def test_move_cache_evicts_least_recently_used():
+    cache = MoveCache(maxsize=2)
+    cache.bind(object(), DIGEST)
+    (key1, move1), (key2, move2), (key3, move3) = TEST_MOVES
+    cache.put(key1, move1)
+    cache.put(key2, move2)
+    assert cache.get(key1) == move1
+    cache.put(key3, move3)
+    assert cache.get(key2) is MISSING
+    assert cache.get(key3) is None
+    assert cache.info() == (2, 1, 1, 2, 2)
+
+
+def test_move_cache_bind():
+    cache = MoveCache()
+    cache.bind(object(), DIGEST)
+    cache.put(*TEST_MOVES[0])
+    # Another dictionary with the same content keeps the moves
+    cache.bind(object(), DIGEST)
+    assert len(cache) == 1
+    cache.bind(object(), bytes(32))
+    assert len(cache) == 0
+
+
+def test_move_cache_save_load(tmp_path):
+    path = str(tmp_path / "moves.json")
+    cache = MoveCache()
+    cache.bind(object(), DIGEST, RULES)
+    for key, move in TEST_MOVES:
+        cache.put(key, move)
+    cache.save(path)
+
+    loaded = MoveCache()
+    loaded.bind(object(), DIGEST, RULES)
+    assert loaded.load(path) == len(TEST_MOVES)
+    for key, move in TEST_MOVES:
+        assert loaded.get(key) == move
+
+    other = MoveCache()
+    other.bind(object(), bytes(reversed(DIGEST)), RULES)
+    assert other.load(path) == 0
+    assert other.load(str(tmp_path / "missing.json")) == 0
+
+
+@pytest.mark.parametrize("rules", TEST_OTHER_RULES)
+def test_move_cache_load_other_rules(tmp_path, rules):
+    path = str(tmp_path / "moves.json")
+    cache = MoveCache()
+    cache.bind(object(), DIGEST, RULES)
+    cache.put(*TEST_MOVES[0])
+    cache.save(path)
+
+    other = MoveCache()
+    other.bind(object(), DIGEST, rules)
+    assert other.load(path) == 0
+
+
+def test_values_digest():
+    assert values_digest({"a": 1, "b": 3}) == values_digest({"b": 3, "a": 1})
+    assert values_digest({"a": 1, "b": 3}) != values_digest({"a": 1, "b": 4})
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from . import planner
+from .hand import Hand
+from .planner import HandPlanner
+
+LETTER_VALUES = {"a": 1, "b": 1, "c": 1, "d": 10, "e": 1, "*": 0}
+
+WORDS = {
+    "ab": ("ab", "ab"),
+    "cd": ("cd", "cd"),
+    "abc": ("abc", "abc"),
+    "*ab": ("abe", "ab*"),
+}
+
+
+def bonus(length, hand_length):
+    return max(1, 7 * length - 3 * (hand_length - length))
+
+
+def test_plan_beats_best_word_first():
+    # "cd" scores the most first, but "ab" first leaves "cd" a higher bonus
+    plan = HandPlanner(Hand("abcd"), WORDS, LETTER_VALUES, bonus).plan()
+    assert plan == (170, (("ab", "ab", 16), ("cd", "cd", 154)), True)
+
+
+def test_plan_wildcard():
+    plan = HandPlanner(Hand("ab*"), WORDS, LETTER_VALUES, bonus).plan()
+    assert plan == (42, (("abe", "ab*", 42),), True)
+
+
+def test_plan_without_words():
+    plan = HandPlanner(Hand("xyz"), {}, LETTER_VALUES, bonus).plan()
+    assert plan == (0, (), True)
+
+
+def test_tables_hold_one_entry_per_sub_multiset():
+    hand_planner = HandPlanner(Hand("aabbc"), WORDS, LETTER_VALUES, bonus)
+    assert hand_planner.size == 3 * 3 * 2
+    hand_planner.plan()
+    assert 0 < hand_planner.solved <= hand_planner.size
+
+
+def test_plan_out_of_time(monkeypatch):
+    monkeypatch.setattr(planner, "CLOCK_INTERVAL", 1)
+    plan = HandPlanner(Hand("abcd"), WORDS, LETTER_VALUES, bonus).plan(0)
+    # The plan playing the best word of every turn
+    assert plan == (116, (("cd", "cd", 88), ("ab", "ab", 28)), False)
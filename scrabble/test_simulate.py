@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from . import main
+from .main import deal_hand
+from .simulate import hand_rng, play_hands, simulate
+
+
+def test_hand_rng_is_reproducible():
+    hands = [deal_hand(7, hand_rng(42, number)) for number in range(5)]
+    assert hands == [deal_hand(7, hand_rng(42, number)) for number in range(5)]
+    assert hands != [deal_hand(7, hand_rng(43, number)) for number in range(5)]
+
+
+def test_simulate_does_not_depend_on_chunks():
+    scores = simulate(12, 42, 0, 7)
+    assert len(scores) == 12
+    assert scores == play_hands(42, 0, 5, 7) + play_hands(42, 5, 12, 7)
+
+
+def test_simulate_plan():
+    scores = simulate(5, 42, 0, 7)
+    planned = simulate(5, 42, 0, 7, plan=True)
+    assert all(plan >= score for plan, score in zip(planned, scores))
+
+
+def test_simulate_plan_leaves_setting():
+    simulate(2, 42, 0, 7, plan=True)
+    assert main.COMP_PLANS_HAND is False
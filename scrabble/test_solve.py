@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from .main import load_words, top_k
+from .simulate import hand_rng
+from .solve import CHUNKS_AHEAD, solve, solve_line
+
+WORD_DICT = load_words()
+
+HANDS = [
+    json.dumps("".join(hand_rng(7, number).sample("abcdehilnorstu*", 7)))
+    for number in range(12)
+]
+
+TEST_SOLVE_LINE_INVALID = ["not json", '{"hand": "ab#"}', '{"id": 1}', "[1, 2]", "3"]
+
+
+def test_solve_line():
+    answer = solve_line('{"id": "a", "hand": "Hello*"}', 3)
+    assert answer["id"] == "a" and answer["hand"] == "Hello*"
+    move = top_k("hello*", WORD_DICT, 1)[0]
+    assert (answer["word"], answer["played"], answer["score"]) == move
+    scores = [alternative["score"] for alternative in answer["alternatives"]]
+    assert len(scores) == 3 and scores == sorted(scores, reverse=True)
+    assert move[:2] not in [
+        (alternative["word"], alternative["played"])
+        for alternative in answer["alternatives"]
+    ]
+
+
+@pytest.mark.parametrize("line", HANDS + ['"efy*"', '"epq*"'])
+def test_solve_line_best_first(line):
+    answer = solve_line(line, 5)
+    assert all(
+        answer["score"] >= alternative["score"]
+        for alternative in answer["alternatives"]
+    )
+
+
+@pytest.mark.parametrize("line", TEST_SOLVE_LINE_INVALID)
+def test_solve_line_invalid(line):
+    assert solve_line(line, 3)["error"].startswith("not a hand")
+
+
+def test_solve_keeps_order():
+    lines = HANDS + ["", "not json"]
+    expected = list(solve(lines, top=2))
+    assert len(expected) == len(HANDS) + 1
+    assert [json.loads(answer)["hand"] for answer in expected[:-1]] == [
+        json.loads(line) for line in HANDS
+    ]
+    assert list(solve(lines, top=2, workers=2, chunk_size=3)) == expected
+
+
+@pytest.mark.parametrize("workers", [0, 1])
+def test_solve_reads_ahead_boundedly(workers):
+    read = []
+
+    def lines():
+        for line in HANDS:
+            read.append(line)
+            yield line
+
+    answers = solve(lines(), workers=workers, chunk_size=2)
+    next(answers)
+    assert len(read) <= 2 * (max(workers, 1) * CHUNKS_AHEAD + 1)
+    assert len(list(answers)) == len(HANDS) - 1
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Game server playing many Scrabble hands and Hangman games at once.
+
+A single asyncio event loop serves every connection and the sessions share
+the dictionaries of the games, loaded once when the server starts. The
+computer's Scrabble hands and the Hangman hints, the only moves which take
+long, run in a pool of worker processes so that the event loop never waits
+for them. The computer starts working out its hand as soon as the hand is
+dealt, like the terminal game does (see main.SpeculativePlay).
+
+The protocol is line based. The client sends "scrabble" or "hangman" to
+start a session, then one move per line: a word or "." to end the hand in
+Scrabble, a letter or "*" for the hint in Hangman. "quit" closes the
+connection, even in the middle of a session. The server answers every
+line but "quit" with one JSON object on a line, whose "over" field is true
+once the session has ended.
+
+Run it from the terminal-games directory and load it with loadgen.py:
+
+    python server.py --port 8765 --workers 4
+    python loadgen.py --port 8765 --sessions 1000 --concurrency 50
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import random
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, Collection, Dict, List, Optional, Tuple
+
+from hangman import main as hangman
+from hangman.patterns import Candidates, PatternIndex
+from scrabble import main as scrabble
+from scrabble.hand import Hand
+from scrabble.lexicon import Lexicon
+from words.wordfile import load_word_dict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HOST = "127.0.0.1"
+PORT = 8765
+
+# Words of a Hangman hint sent to the client, the hint tells how many match
+MAX_MATCHES = 50
+
+# Dictionaries of the process, loaded once by load_dictionaries and only
+# ever read by the sessions. Worker processes forked from the server inherit
+# them, other workers load their own.
+SCRABBLE_WORDS: Optional[Lexicon] = None
+HANGMAN_WORDS: Optional[PatternIndex] = None
+
+# A turn of the computer: (word, played word, score)
+CompTurn = Tuple[Optional[str], Optional[str], int]
+
+
+def load_dictionaries(hand_size: Optional[int] = None) -> None:
+    """
+    Loads the dictionaries of both games, unless they are already loaded,
+    the one of Scrabble ready for hands of hand_size letters.
+    """
+    global SCRABBLE_WORDS, HANGMAN_WORDS
+    if SCRABBLE_WORDS is None:
+        path = os.path.join(HERE, "scrabble", scrabble.WORDS_FILENAME)
+        SCRABBLE_WORDS = Lexicon(load_word_dict(path))
+        scrabble.prepare_lexicon(SCRABBLE_WORDS, hand_size)
+    if HANGMAN_WORDS is None:
+        HANGMAN_WORDS = PatternIndex(
+            load_word_dict(os.path.join(HERE, "hangman", hangman.WORDS_FILENAME))
+        )
+
+
+def comp_turns(letters: str, player_words: Collection[str] = ()) -> List[CompTurn]:
+    """
+    Returns the turns of the computer playing the hand of the letters,
+    without playing the words of player_words. Runs in the worker processes.
+    """
+    load_dictionaries()
+    return [
+        (word, played_word, score)
+        for _, word, played_word, score in scrabble.comp_turns(
+            Hand(letters), SCRABBLE_WORDS, player_words
+        )
+    ]
+
+
+def hint(length: int, bits: int) -> Tuple[int, List[str]]:
+    """
+    Returns the number of candidates of a game of Hangman, the words of the
+    length whose bits are set in bits (see Candidates), and the first
+    MAX_MATCHES of them. Runs in the worker processes.
+    """
+    load_dictionaries()
+    matches = HANGMAN_WORDS.words(length, bits)
+    return len(matches), matches[:MAX_MATCHES]
+
+
+class ScrabbleSession:
+    """
+    One hand of Scrabble against the computer, played like play_hand and
+    then comp_play_hand. The computer's turns are worked out by run, which
+    runs a function in the worker pool, from the moment the hand is dealt.
+    """
+
+    def __init__(self, run: Callable, rng: random.Random, hand_size: int) -> None:
+        self.session = scrabble.GameSession(rng)
+        self.hand = self.session.hand = scrabble.deal_hand(hand_size, rng)
+        self.total_score = 0
+        self.over = False
+        self._run = run
+        self._letters = "".join(letter * count for letter, count in self.hand.items())
+        self._comp_turns = asyncio.ensure_future(run(comp_turns, self._letters))
+
+    def start(self) -> Dict:
+        return {
+            "event": "hand",
+            "hand": scrabble.display_hand(self.hand),
+            "over": False,
+        }
+
+    async def play(self, line: str) -> Dict:
+        """
+        Plays the word of the line, or ends the hand if the line is ".".
+        """
+        word = line.lower()
+        if word != ".":
+            hand_length = scrabble.calculate_handlen(self.hand)
+            valid = scrabble.is_valid_word(word, self.hand, SCRABBLE_WORDS)
+            score = scrabble.get_word_score(word, hand_length) if valid else 0
+            if valid:
+                self.session.player_words.add(word)
+                self.total_score += score
+            self.hand = scrabble.update_hand(self.hand, word)
+            if scrabble.calculate_handlen(self.hand) > 0:
+                return {
+                    "event": "word",
+                    "word": word,
+                    "valid": valid,
+                    "score": score,
+                    "total": self.total_score,
+                    "hand": scrabble.display_hand(self.hand),
+                    "over": False,
+                }
+        return await self._finish()
+
+    async def _finish(self) -> Dict:
+        turns = await self._comp_turns
+        player_words = self.session.player_words
+        # The computer's hand was worked out before the player played any
+        # word, it only changes if the player played one of its words
+        if any(word in player_words for word, _, _ in turns):
+            turns = await self._run(comp_turns, self._letters, frozenset(player_words))
+        comp_score = sum(score for _, _, score in turns)
+        self.session.comp_words.update(word for _, word, _ in turns if word)
+        self.over = True
+        if comp_score > self.total_score:
+            winner = "computer"
+        elif comp_score < self.total_score:
+            winner = "player"
+        else:
+            winner = "tie"
+        return {
+            "event": "result",
+            "score": self.total_score,
+            "computer": {
+                "words": [played for _, played, _ in turns if played],
+                "score": comp_score,
+            },
+            "winner": winner,
+            "over": True,
+        }
+
+    def close(self) -> None:
+        self._comp_turns.cancel()
+
+
+class HangmanSession:
+    """
+    One game of Hangman with hints, played like hangman_game. The words the
+    secret word can still be are narrowed after every guess and the hint
+    lists them, worked out by run, which runs a function in the worker pool.
+    """
+
+    def __init__(
+        self, run: Callable, rng: random.Random, secret_word: Optional[str] = None
+    ) -> None:
+        self.secret_word = secret_word or hangman.choose_word(HANGMAN_WORDS, rng)
+        self.candidates = Candidates(HANGMAN_WORDS, len(self.secret_word))
+        self.letters_guessed: List[str] = []
+        self.num_guess = 6
+        self.num_warnings = 3
+        self.hint_count = 1
+        self.over = False
+        self._run = run
+
+    def start(self) -> Dict:
+        return self._state("start")
+
+    def _state(self, event: str, **fields) -> Dict:
+        return {
+            "event": event,
+            "guessed": hangman.get_guessed_word(self.secret_word, self.letters_guessed),
+            "guesses": self.num_guess,
+            "warnings": self.num_warnings,
+            "available": hangman.get_available_letters(self.letters_guessed),
+            **fields,
+            "over": self.over,
+        }
+
+    def _warn(self) -> None:
+        # Same as warnings_check
+        if self.num_warnings == 0:
+            self.num_guess -= 1
+        else:
+            self.num_warnings -= 1
+
+    async def play(self, line: str) -> Dict:
+        """
+        Plays the letter of the line, or gives the hint if the line is "*".
+        """
+        user_letter = line.lower()
+        if len(user_letter) > 1 or user_letter in hangman.INPUT_CHECK:
+            if user_letter == "*" and self.hint_count == 1:
+                self.hint_count -= 1
+                count, matches = await self._run(
+                    hint, self.candidates.length, self.candidates.bits
+                )
+                return self._state("hint", count=count, matches=matches)
+            self._warn()
+            event = "invalid"
+        elif user_letter in self.letters_guessed:
+            self._warn()
+            event = "repeated"
+        elif user_letter not in self.secret_word:
+            self.letters_guessed.append(user_letter)
+            self.candidates.guess(user_letter, ())
+            self.num_guess -= 2 if user_letter in hangman.VOWELS else 1
+            event = "miss"
+        else:
+            self.letters_guessed.append(user_letter)
+            self.candidates.guess(
+                user_letter,
+                [i for i, other in enumerate(self.secret_word) if other == user_letter],
+            )
+            event = "hit"
+
+        if hangman.is_word_guessed(self.secret_word, self.letters_guessed):
+            self.over = True
+            score = self.num_guess * len(set(self.secret_word))
+            return self._state("won", word=self.secret_word, score=score)
+        if self.num_guess <= 0:
+            self.over = True
+            self.num_guess = 0
+            return self._state("lost", word=self.secret_word, score=0)
+        return self._state(event)
+
+    def close(self) -> None:
+        pass
+
+
+class GameServer:
+    """
+    Serves the sessions of the clients connected to it. With workers set to
+    0 the slow moves run in threads of this process instead of a process
+    pool, sharing its dictionaries.
+    """
+
+    def __init__(
+        self,
+        workers: int = os.cpu_count() or 1,
+        hand_size: int = scrabble.HAND_SIZE,
+        seed: Optional[int] = None,
+    ) -> None:
+        load_dictionaries(hand_size)
+        self.hand_size = hand_size
+        self.rng = random.Random(seed)
+        self.sessions = 0
+        self._executor: Optional[Executor] = None
+        if workers > 0:
+            self._executor = ProcessPoolExecutor(
+                workers, initializer=load_dictionaries, initargs=(hand_size,)
+            )
+
+    async def run(self, func: Callable, *args):
+        """
+        Runs func(*args) in the worker pool and returns its result.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args)
+        )
+
+    async def start(self, host: str = HOST, port: int = PORT) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle_client, host, port)
+
+    def new_session(self, command: str):
+        # Every session draws from its own generator, seeded from the one
+        # of the server
+        rng = random.Random(self.rng.getrandbits(64))
+        if command == "scrabble":
+            return ScrabbleSession(self.run, rng, self.hand_size)
+        if command == "hangman":
+            return HangmanSession(self.run, rng)
+        return None
+
+    async def handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        session = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                line = line.decode(errors="replace").strip()
+                if line == "quit":
+                    break
+                if session is None:
+                    session = self.new_session(line)
+                    if session is None:
+                        reply = {"error": f"unknown game {line!r}", "over": True}
+                    else:
+                        self.sessions += 1
+                        reply = session.start()
+                else:
+                    reply = await session.play(line)
+                    if session.over:
+                        session = None
+                writer.write(encode(reply))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if session is not None:
+                session.close()
+            writer.close()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+
+
+def encode(reply: Dict) -> bytes:
+    """
+    Returns the reply as a line of JSON.
+    """
+    return (json.dumps(reply, separators=(",", ":")) + "\n").encode()
+
+
+async def serve(host: str, port: int, workers: int, seed: Optional[int]) -> None:
+    game_server = GameServer(workers, seed=seed)
+    server = await game_server.start(host, port)
+    print(f"Serving Scrabble and Hangman on {host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        game_server.close()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--host", default=HOST, help="address to listen on")
+    parser.add_argument("--port", type=int, default=PORT, help="port to listen on")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="worker processes for the slow moves, 0 to use threads",
+    )
+    parser.add_argument("--seed", type=int, help="seed of the hands and words dealt")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.seed))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from benchmark import compare, time_benchmark
+
+BASELINE = {"results": {"fast": {"best": 1.0}, "slow": {"best": 1.0}}}
+
+
+def test_compare_flags_regressions():
+    results = {
+        "results": {"fast": {"best": 1.1}, "slow": {"best": 1.5}, "new": {"best": 9}}
+    }
+    assert compare(results, BASELINE, 0.25) == ["slow"]
+    assert compare(results, BASELINE, 0.5) == []
+
+
+def test_time_benchmark():
+    result = time_benchmark(lambda: None, repeat=3)
+    assert result["repeat"] == 3
+    assert 0 <= result["best"] <= result["median"]
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import random
+
+import pytest
+
+import loadgen
+import server
+from hangman.patterns import Candidates
+from server import (
+    GameServer,
+    HangmanSession,
+    ScrabbleSession,
+    comp_turns,
+    hint,
+    load_dictionaries,
+)
+
+TEST_HANGMAN = [
+    # (letters guessed, event of the last one, guesses, warnings left)
+    ("t", "hit", 6, 3),
+    ("x", "miss", 5, 3),
+    ("a", "miss", 4, 3),
+    ("tt", "repeated", 6, 2),
+    ("t1", "invalid", 6, 2),
+    ("ttttt", "repeated", 5, 0),
+    ("tes", "won", 6, 3),
+    ("aio", "lost", 0, 3),
+]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def dictionaries():
+    load_dictionaries()
+
+
+async def run_inline(func, *args):
+    return func(*args)
+
+
+def play_lines(session, lines):
+    async def play():
+        replies = []
+        for line in lines:
+            replies.append(await session.play(line))
+        return replies
+
+    return asyncio.run(play())
+
+
+@pytest.mark.parametrize("letters, event, guesses, warnings", TEST_HANGMAN)
+def test_hangman_session(letters, event, guesses, warnings):
+    session = HangmanSession(run_inline, random.Random(1), "test")
+    reply = play_lines(session, letters)[-1]
+    assert (reply["event"], reply["guesses"], reply["warnings"]) == (
+        event,
+        guesses,
+        warnings,
+    )
+    assert reply["over"] == (event in ("won", "lost"))
+
+
+def test_hangman_hint():
+    session = HangmanSession(run_inline, random.Random(1), "apple")
+    hint_reply, again = play_lines(session, ["*", "*"])
+    count, matches = hint(5, session.candidates.bits)
+    assert hint_reply["count"] == count > len(matches) > 0
+    assert hint_reply["matches"] == matches
+    # The hint is given once, then "*" is an invalid letter
+    assert again["event"] == "invalid"
+
+
+def test_hangman_hint_narrowed():
+    session = HangmanSession(run_inline, random.Random(1), "apple")
+    *_, hint_reply = play_lines(session, ["t", "p", "*"])
+    five_letters = Candidates(server.HANGMAN_WORDS, 5).words()
+    # The wrong letter rules out words too, not only the revealed ones
+    expected = [
+        word
+        for word in five_letters
+        if "t" not in word
+        and [i for i, letter in enumerate(word) if letter == "p"] == [1, 2]
+    ]
+    assert hint_reply["count"] == len(expected) == len(session.candidates)
+    assert hint_reply["matches"] == expected[: server.MAX_MATCHES]
+
+
+def test_scrabble_session():
+    async def play():
+        session = ScrabbleSession(run_inline, random.Random(9), 7)
+        letters = "".join(letter * n for letter, n in session.hand.items())
+        first_word = comp_turns(letters)[0][0]
+        word_reply = await session.play(first_word)
+        return letters, first_word, word_reply, await session.play(".")
+
+    letters, word, word_reply, result = asyncio.run(play())
+    assert word_reply["valid"] and word_reply["score"] > 0
+    # The player took the computer's first word, the computer plays others
+    assert result["over"] and result["score"] == word_reply["total"]
+    assert word not in [word for word, _, _ in comp_turns(letters, {word})]
+    expected = comp_turns(letters, {word})
+    assert result["computer"]["score"] == sum(score for *_, score in expected)
+
+
+@pytest.mark.parametrize("workers", [0, 1])
+def test_load(workers):
+    async def load():
+        game_server = GameServer(workers, seed=3)
+        server = await game_server.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await loadgen.run(port=port, sessions=12, concurrency=4)
+        finally:
+            server.close()
+            await server.wait_closed()
+            game_server.close()
+
+    report = asyncio.run(load())
+    assert report["sessions"] == 12 and report["errors"] == 0
+    assert report["sessions_per_second"] > 0
+    assert 0 <= report["p50_ms"] <= report["p99_ms"] <= report["max_ms"]
+
+
+def test_quit_during_session():
+    async def quit_game():
+        game_server = GameServer(0, seed=3)
+        server = await game_server.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"hangman\nquit\n")
+            await writer.drain()
+            start = await reader.readline()
+            closed = await reader.readline()
+            writer.close()
+            return start, closed
+        finally:
+            server.close()
+            await server.wait_closed()
+            game_server.close()
+
+    start, closed = asyncio.run(quit_game())
+    assert not json.loads(start)["over"] and closed == b""
+
+
+def test_load_no_sessions():
+    async def load():
+        game_server = GameServer(0, seed=3)
+        server = await game_server.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await loadgen.run(port=port, sessions=0, concurrency=2)
+        finally:
+            server.close()
+            await server.wait_closed()
+            game_server.close()
+
+    report = asyncio.run(load())
+    assert report["sessions"] == report["moves"] == 0
+    assert report["p50_ms"] == report["max_ms"] == 0
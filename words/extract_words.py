@@ -14,10 +14,22 @@ Sample:
         "word":"ab"
         }
 ]
+
+The words.json file is then compiled into words.bin (see wordfile.py) which
+the games load instead of parsing words.json. The games keep their own copy
+of words.json, compile those with:
+
+    python extract_words.py --compile ../scrabble/words.json ../hangman/words.json
 """
+import argparse
 import json
 from string import ascii_lowercase
 
+try:
+    from .wordfile import compile_words
+except ImportError:  # Started as a script from the words folder
+    from wordfile import compile_words
+
 
 def extract_words(to_file):
     word_dict = {}
@@ -41,5 +53,19 @@ def extract_words(to_file):
 
 
 if __name__ == "__main__":
-    with open("words.json", "w") as main_word_file:
-        extract_words(main_word_file)
+    parser = argparse.ArgumentParser(description="Build the word files.")
+    parser.add_argument(
+        "--compile",
+        nargs="+",
+        metavar="WORDS_JSON",
+        help="only compile the given words.json files into words.bin files",
+    )
+    args = parser.parse_args()
+
+    if args.compile is None:
+        with open("words.json", "w") as main_word_file:
+            extract_words(main_word_file)
+        args.compile = ["words.json"]
+
+    for json_path in args.compile:
+        print(f"Compiled {compile_words(json_path)}.")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Opt-in instrumentation of the hot paths of the games.
+
+The games time their expensive functions with the timed decorator and
+count what they do with PROFILER.count, all of which does nothing unless
+the profiler is enabled: either by starting a game with --profile (or
+--profile=events.jsonl) or by setting the TERMINAL_GAMES_PROFILE
+environment variable to 1 or to the path of the event file.
+
+Once enabled, every timed call is written as one JSON line to the event
+file as it ends, along with the fields added with PROFILER.annotate while
+it ran, and a summary table is printed to stderr when the game exits.
+"""
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional
+
+ENV_VAR = "TERMINAL_GAMES_PROFILE"
+DEFAULT_EVENTS_PATH = "profile.jsonl"
+
+
+class Profiler:
+    """
+    Collects the timed calls and the counters of a game. Every method
+    returns immediately while enabled is False, callers on hot paths check
+    enabled themselves to skip even the method call.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.events_path: Optional[str] = None
+        self.counters: Counter = Counter()
+        self.timings: Dict[str, List[float]] = defaultdict(list)
+        self._events = None
+        self._local = threading.local()
+
+    @property
+    def _open(self) -> List[dict]:
+        # Events of the timed calls running in the current thread, innermost
+        # last, so that calls in background threads don't annotate each other
+        try:
+            return self._local.open
+        except AttributeError:
+            self._local.open = []
+            return self._local.open
+
+    def enable(self, events_path: str = DEFAULT_EVENTS_PATH) -> None:
+        """
+        Starts recording, writing the events to the file at events_path, and
+        prints the summary when the interpreter exits.
+        """
+        if self.enabled:
+            return
+        self.events_path = events_path
+        self._events = open(events_path, "w")
+        self.enabled = True
+        atexit.register(self.close)
+
+    def close(self) -> None:
+        """
+        Stops recording, closes the event file and prints the summary.
+        """
+        if not self.enabled:
+            return
+        self.enabled = False
+        self._events.close()
+        print_summary(self, sys.stderr)
+
+    def count(self, name: str, n: int = 1) -> None:
+        if self.enabled:
+            self.counters[name] += n
+
+    def annotate(self, **fields) -> None:
+        """
+        Adds fields to the event of the innermost timed call running.
+        """
+        if self.enabled and self._open:
+            self._open[-1].update(fields)
+
+    def record(self, event: dict) -> None:
+        self.timings[event["event"]].append(event["seconds"])
+        self._events.write(json.dumps(event) + "\n")
+
+
+PROFILER = Profiler()
+
+
+def timed(name: str) -> Callable:
+    """
+    Decorator recording the wall time of every call of the function as an
+    event named name while PROFILER is enabled.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return func(*args, **kwargs)
+            event = {"event": name, "start": time.time()}
+            PROFILER._open.append(event)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                event["seconds"] = time.perf_counter() - start
+                PROFILER._open.pop()
+                PROFILER.record(event)
+
+        return wrapper
+
+    return decorator
+
+
+def print_summary(profiler: Profiler, file=sys.stderr) -> None:
+    """
+    Prints the number of calls and the total, mean and maximum time of
+    every timed function, then the counters.
+    """
+    print(
+        f"\n{'profile':<32}{'calls':>8}{'total ms':>12}{'mean ms':>10}{'max ms':>10}",
+        file=file,
+    )
+    for name, seconds in sorted(profiler.timings.items()):
+        total = sum(seconds)
+        print(
+            f"{name:<32}{len(seconds):>8}{total * 1e3:>12.2f}"
+            f"{total / len(seconds) * 1e3:>10.3f}{max(seconds) * 1e3:>10.3f}",
+            file=file,
+        )
+    for name, count in sorted(profiler.counters.items()):
+        print(f"{name:<32}{count:>8}", file=file)
+    if profiler.events_path:
+        print(f"Events written to {profiler.events_path}", file=file)
+
+
+def setup(argv: List[str]) -> List[str]:
+    """
+    Enables PROFILER if argv holds --profile[=PATH] or if ENV_VAR is set,
+    and returns argv without the option.
+    """
+    events_path = os.environ.get(ENV_VAR) or None
+    if events_path == "1":
+        events_path = DEFAULT_EVENTS_PATH
+    rest = []
+    for arg in argv:
+        if arg == "--profile":
+            events_path = DEFAULT_EVENTS_PATH
+        elif arg.startswith("--profile="):
+            events_path = arg.split("=", 1)[1]
+        else:
+            rest.append(arg)
+    if events_path and events_path != "0":
+        PROFILER.enable(events_path)
+    return rest
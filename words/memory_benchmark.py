@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reports the resident memory (RSS) of a process before and after loading the
+words, for each way of holding them:
+
+    json    json.load of words.json, one str object per word
+    store   words.json packed into an in-memory WordStore
+    mmap    the compiled words.bin memory-mapped as a WordStore
+
+Every loader runs in a fresh process so the numbers don't affect each other.
+The "read" column is the RSS after reading every word once, which maps all
+the pages of words.bin in the mmap case. RSS doesn't shrink back once the
+temporary objects of json.load are freed, so the "held" column reports the
+memory still allocated for the words after loading, traced in another run.
+
+Run it from the words folder: python memory_benchmark.py [path/to/words.json]
+"""
+import json
+import os
+import subprocess
+import sys
+import tracemalloc
+
+try:
+    from .wordfile import WordStore, compiled_path
+except ImportError:  # Started as a script from the words folder
+    from wordfile import WordStore, compiled_path
+
+LOADERS = ("json", "store", "mmap")
+
+
+def rss_kib() -> int:
+    """
+    Returns the current resident set size of this process in KiB.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except OSError:
+        # No procfs, fall back to the peak RSS (bytes on macOS, KiB elsewhere)
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def load(loader: str, json_path: str):
+    """
+    Returns the words of json_path loaded with the given loader.
+    """
+    if loader == "json":
+        with open(json_path) as word_file:
+            return json.load(word_file)
+    elif loader == "store":
+        with open(json_path) as word_file:
+            return WordStore.from_word_dict(json.load(word_file))
+    return WordStore.open(compiled_path(json_path))
+
+
+def measure(loader: str, json_path: str) -> None:
+    """
+    Prints the RSS in KiB before loading the words with the given loader,
+    after loading and after reading every word, then the KiB held by the
+    loaded words.
+    """
+    before = rss_kib()
+    words = load(loader, json_path)
+    loaded = rss_kib()
+    for key in words:
+        words[key]
+    read = rss_kib()
+    del words
+
+    tracemalloc.start()
+    words = load(loader, json_path)
+    held = tracemalloc.get_traced_memory()[0] // 1024
+    tracemalloc.stop()
+    print(before, loaded, read, held)
+
+
+def main(json_path: str) -> None:
+    columns = ("before", "loaded", "read", "growth", "held")
+    print(f"{'loader':<8}" + "".join(f"{column:>10}" for column in columns))
+    for loader in LOADERS:
+        output = subprocess.run(
+            [sys.executable, __file__, "--measure", loader, json_path],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        before, loaded, read, held = map(int, output.split())
+        values = (before, loaded, read, loaded - before, held)
+        print(f"{loader:<8}" + "".join(f"{value:>10}" for value in values))
+    print("(KiB)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--measure":
+        measure(sys.argv[2], sys.argv[3])
+    else:
+        main(sys.argv[1] if len(sys.argv) > 1 else "words.json")
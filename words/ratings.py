@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Difficulty ratings of the words of a words.json, in a compact file kept
+next to it (words.ratings) and memory-mapped by the game. The ratings are
+computed offline by hangman/rate_words.py.
+
+A rating is a level in range(LEVELS), one byte per word. Next to the
+ratings, the file holds the ids of the words sorted by rating and where
+every level starts in them, so the words of a band of levels are one range
+of that list and a word of the band is drawn with a single random pick.
+
+Layout (all integers are unsigned 32 bit little-endian):
+
+    magic       8 bytes, MAGIC
+    digest      32 bytes, SHA-256 of the words.json file it was rated from
+    count       number of words
+    offsets     LEVELS + 1 offsets into ids, where every level starts
+    ids         the ids of the words, sorted by rating then id
+    ratings     the rating of every word by id, one byte each
+"""
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+from typing import Optional, Sequence, Tuple
+
+try:
+    from .wordfile import file_digest
+except ImportError:  # Started as a script from the words folder
+    from wordfile import file_digest
+
+MAGIC = b"TGRATES\x01"
+HEADER = struct.Struct("<8s32sI")
+LEVELS = 256
+
+
+def ratings_path(json_path: str) -> str:
+    """
+    Returns the path of the ratings file for the given words.json.
+    """
+    return os.path.splitext(json_path)[0] + ".ratings"
+
+
+def _uint32s(values) -> bytes:
+    values = array("I", values)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def pack_ratings(ratings: Sequence[int], digest: bytes = bytes(32)) -> bytes:
+    """
+    Returns the ratings, one per word id, laid out as a ratings file.
+    """
+    # Sorting is stable, the ids stay sorted inside a level
+    ids = sorted(range(len(ratings)), key=ratings.__getitem__)
+    offsets = [0] * (LEVELS + 1)
+    for rating in ratings:
+        offsets[rating + 1] += 1
+    for level in range(LEVELS):
+        offsets[level + 1] += offsets[level]
+
+    header = HEADER.pack(MAGIC, digest, len(ratings))
+    return b"".join([header, _uint32s(offsets), _uint32s(ids), bytes(ratings)])
+
+
+class Ratings:
+    """
+    Read-only ratings backed by one buffer in the ratings file layout.
+    """
+
+    def __init__(self, buffer) -> None:
+        self._buffer = buffer
+        magic, self.digest, num_words = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("Not a ratings file.")
+        pos = HEADER.size
+        size = (LEVELS + 1 + num_words) * 4 + num_words
+        if len(buffer) < pos + size:
+            raise ValueError("Truncated ratings file.")
+
+        numbers = memoryview(buffer)[pos : pos + (LEVELS + 1 + num_words) * 4]
+        if sys.byteorder == "big":
+            numbers = array("I", numbers.tobytes())
+            numbers.byteswap()
+        else:
+            numbers = numbers.cast("I")
+        self._offsets = numbers[: LEVELS + 1]
+        self._ids = numbers[LEVELS + 1 :]
+        self._ratings = memoryview(buffer)[pos + size - num_words : pos + size]
+        self.num_words = num_words
+
+    @classmethod
+    def open(cls, path: str) -> "Ratings":
+        """
+        Memory-maps the ratings file at path.
+        """
+        with open(path, "rb") as fhand:
+            return cls(mmap.mmap(fhand.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def rating(self, word_id: int) -> int:
+        """
+        Returns the rating of the word with the given id.
+        """
+        return self._ratings[word_id]
+
+    def band_range(self, low: int, high: int) -> Tuple[int, int]:
+        """
+        Returns the (start, stop) range of the words rated from low to high
+        included, as positions in the ids sorted by rating.
+        """
+        low, high = max(low, 0), min(high, LEVELS - 1)
+        if low > high:
+            return 0, 0
+        return self._offsets[low], self._offsets[high + 1]
+
+    def choose(self, low: int, high: int, rng: Optional[random.Random] = None) -> int:
+        """
+        Returns the id of a word rated from low to high included, at random.
+        Raises ValueError if there is none.
+        """
+        start, stop = self.band_range(low, high)
+        if start >= stop:
+            raise ValueError(f"No word is rated from {low} to {high}.")
+        return self._ids[(rng or random).randrange(start, stop)]
+
+
+def write_ratings(json_path: str, ratings: Sequence[int]) -> str:
+    """
+    Writes the ratings of the words of words.json at json_path next to it
+    and returns the path of the ratings file.
+    """
+    to_path = ratings_path(json_path)
+    with open(to_path, "wb") as to_file:
+        to_file.write(pack_ratings(ratings, file_digest(json_path)))
+    return to_path
+
+
+def load_ratings(json_path: str) -> Optional[Ratings]:
+    """
+    Returns the ratings of the words of words.json at json_path, or None if
+    they haven't been computed or were computed from another content of
+    words.json.
+    """
+    path = ratings_path(json_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        ratings = Ratings.open(path)
+    except (OSError, ValueError, struct.error):
+        return None
+    return ratings if ratings.digest == file_digest(json_path) else None
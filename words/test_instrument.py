@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from .instrument import ENV_VAR, PROFILER, setup, timed
+
+
+@timed("square")
+def square(n: int) -> int:
+    PROFILER.annotate(n=n)
+    PROFILER.count("squares")
+    return n * n
+
+
+@pytest.fixture
+def profiler(tmp_path, monkeypatch):
+    monkeypatch.delenv(ENV_VAR, raising=False)
+    yield str(tmp_path / "events.jsonl")
+    PROFILER.close()
+    PROFILER.timings.clear()
+    PROFILER.counters.clear()
+    PROFILER.events_path = None
+
+
+def test_disabled_records_nothing(profiler):
+    assert setup(["-x"]) == ["-x"]
+    assert square(3) == 9
+    assert not PROFILER.timings and not PROFILER.counters
+
+
+def test_profile_option(profiler, capsys):
+    assert setup(["--profile=" + profiler, "-x"]) == ["-x"]
+    assert square(3) == 9
+    assert square(4) == 16
+    PROFILER.close()
+    with open(profiler) as events:
+        events = [json.loads(line) for line in events]
+    assert [(event["event"], event["n"]) for event in events] == [
+        ("square", 3),
+        ("square", 4),
+    ]
+    assert PROFILER.counters["squares"] == 2
+    assert "square" in capsys.readouterr().err
+
+
+def test_profile_env_var(profiler, monkeypatch):
+    monkeypatch.setenv(ENV_VAR, profiler)
+    setup([])
+    assert PROFILER.enabled
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import json
+import random
+
+import pytest
+
+from .ratings import LEVELS, Ratings, load_ratings, pack_ratings, write_ratings
+
+RATINGS = [5, 200, 5, 0, 255, 128, 200]
+
+TEST_BAND_RANGE = [
+    ((0, 255), [0, 1, 2, 3, 4, 5, 6]),
+    ((0, 0), [3]),
+    ((5, 5), [0, 2]),
+    ((6, 199), [5]),
+    ((129, 254), [1, 6]),
+    ((250, 300), [4]),
+    ((10, 20), []),
+    ((20, 10), []),
+]
+
+
+@pytest.fixture
+def json_path(tmp_path):
+    path = tmp_path / "words.json"
+    path.write_text(json.dumps({"3": ["abc", "def"]}))
+    return str(path)
+
+
+def test_pack_ratings():
+    ratings = Ratings(pack_ratings(RATINGS))
+    assert ratings.num_words == len(RATINGS)
+    assert [ratings.rating(word_id) for word_id in range(len(RATINGS))] == RATINGS
+    assert ratings.band_range(0, LEVELS - 1) == (0, len(RATINGS))
+
+
+@pytest.mark.parametrize("band, expected", TEST_BAND_RANGE)
+def test_choose(band, expected):
+    ratings = Ratings(pack_ratings(RATINGS))
+    start, stop = ratings.band_range(*band)
+    assert stop - start == len(expected)
+    if not expected:
+        with pytest.raises(ValueError):
+            ratings.choose(*band)
+        return
+    rng = random.Random(0)
+    assert {ratings.choose(*band, rng) for _ in range(100)} == set(expected)
+
+
+def test_load_ratings(json_path):
+    assert load_ratings(json_path) is None
+    write_ratings(json_path, [3, 1])
+    assert load_ratings(json_path).rating(1) == 1
+
+    # The ratings are stale once words.json changes
+    with open(json_path, "w") as word_file:
+        json.dump({"3": ["abc", "xyz"]}, word_file)
+    assert load_ratings(json_path) is None
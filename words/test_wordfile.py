@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from .wordfile import WordStore, compile_words, load_word_dict
+
+WORD_DICT = {"2a": ["at", "am"], "2b": [], "3a": ["ate", "and", "ant"], "15": ["z"]}
+
+
+@pytest.fixture
+def json_path(tmp_path):
+    path = tmp_path / "words.json"
+    path.write_text(json.dumps(WORD_DICT))
+    return str(path)
+
+
+def test_compile_words(json_path):
+    word_file = WordStore.open(compile_words(json_path))
+    assert list(word_file) == list(WORD_DICT)
+    assert {key: word_file[key] for key in word_file} == {
+        key: sorted(words) for key, words in WORD_DICT.items()
+    }
+    assert word_file.bucket_range("3a") == (2, 5)
+    assert word_file.word(2) == "and"
+
+
+def test_load_word_dict(json_path):
+    # Without a compiled word file words.json is packed in memory
+    assert load_word_dict(json_path)["3a"] == ["and", "ant", "ate"]
+    compile_words(json_path)
+    assert load_word_dict(json_path)["3a"] == ["and", "ant", "ate"]
+
+    # The compiled file is stale once words.json changes
+    with open(json_path, "w") as word_file:
+        json.dump({"2a": ["ax"]}, word_file)
+    assert dict(load_word_dict(json_path)) == {"2a": ["ax"]}
+
+
+def test_from_word_dict():
+    word_store = WordStore.from_word_dict(WORD_DICT)
+    assert word_store.num_words == 6
+    assert word_store["2a"] == ["am", "at"]
+    assert word_store["2b"] == []
+    assert [word_store.word(i) for i in range(6)] == [
+        "am",
+        "at",
+        "and",
+        "ant",
+        "ate",
+        "z",
+    ]
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compact word storage shared by the games, and its compiled file form: a
+binary version of words.json which the games can memory-map and query
+without parsing the whole JSON file.
+
+Layout (all integers are unsigned 32 bit little-endian):
+
+    magic       8 bytes, MAGIC
+    digest      32 bytes, SHA-256 of the words.json file it was compiled from
+    counts      number of buckets, number of words
+    buckets     for each bucket: key (4 bytes, NUL padded), start, stop
+    offsets     number of words + 1 offsets into the blob
+    blob        the words, each one followed by a newline
+
+A bucket is one list of words.json, its key is the key of that list
+("<len><letter>" for scrabble and "<len>" for hangman) and the words of the
+bucket are the ones with ids in range(start, stop). Words are sorted inside
+a bucket and buckets keep the order of words.json.
+
+The same layout is used in memory when words.json has to be parsed, so the
+games always hold the words as one contiguous buffer instead of one string
+object per word.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b"TGWORDS\x01"
+HEADER = struct.Struct("<8s32sII")
+BUCKET = struct.Struct("<4sII")
+
+
+def file_digest(path: str) -> bytes:
+    """
+    Returns the SHA-256 digest of the content of the file at path.
+    """
+    with open(path, "rb") as fhand:
+        return hashlib.sha256(fhand.read()).digest()
+
+
+def compiled_path(json_path: str) -> str:
+    """
+    Returns the path of the compiled word file for the given words.json.
+    """
+    return os.path.splitext(json_path)[0] + ".bin"
+
+
+def pack_words(word_dict: Dict[str, List[str]], digest: bytes = bytes(32)) -> bytes:
+    """
+    Returns the words of word_dict laid out as a compiled word file.
+    """
+    buckets = []
+    offsets = array("I", [0])
+    blob = bytearray()
+    for key, words in word_dict.items():
+        start = len(offsets) - 1
+        for word in sorted(words):
+            blob += word.encode("ascii") + b"\n"
+            offsets.append(len(blob))
+        buckets.append(BUCKET.pack(key.encode("ascii"), start, len(offsets) - 1))
+
+    if sys.byteorder == "big":
+        offsets.byteswap()
+    header = HEADER.pack(MAGIC, digest, len(buckets), len(offsets) - 1)
+    return b"".join([header, *buckets, offsets.tobytes(), blob])
+
+
+def compile_words(json_path: str, to_path: Optional[str] = None) -> str:
+    """
+    Compiles the words.json at json_path into a word file and returns the
+    path of the word file. By default it is written next to words.json.
+    """
+    to_path = to_path or compiled_path(json_path)
+    with open(json_path) as word_file:
+        word_dict = json.load(word_file)
+    with open(to_path, "wb") as to_file:
+        to_file.write(pack_words(word_dict, file_digest(json_path)))
+    return to_path
+
+
+class WordStore(Mapping):
+    """
+    Read-only word storage backed by one buffer in the compiled word file
+    layout, either memory-mapped from a file or held in memory.
+
+    Behaves like the dictionary loaded from words.json: indexing it with a
+    key returns the list of words for that key. The list is decoded on each
+    access and not kept around, use word() and bucket_range() to read words
+    without building lists.
+    """
+
+    def __init__(self, buffer) -> None:
+        self._buffer = buffer
+        magic, self.digest, num_buckets, num_words = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("Not a compiled word file.")
+
+        pos = HEADER.size
+        self._ranges: Dict[str, Tuple[int, int]] = {}
+        for _ in range(num_buckets):
+            key, start, stop = BUCKET.unpack_from(buffer, pos)
+            self._ranges[key.rstrip(b"\0").decode("ascii")] = (start, stop)
+            pos += BUCKET.size
+
+        offsets_size = (num_words + 1) * 4
+        if len(buffer) < pos + offsets_size:
+            raise ValueError("Truncated compiled word file.")
+        offsets = memoryview(buffer)[pos : pos + offsets_size]
+        if sys.byteorder == "big":
+            offsets = array("I", offsets.tobytes())
+            offsets.byteswap()
+        else:
+            offsets = offsets.cast("I")
+        self._offsets = offsets
+        self._blob = memoryview(buffer)[pos + offsets_size :]
+        if offsets[num_words] != len(self._blob):
+            raise ValueError("Truncated compiled word file.")
+        self.num_words = num_words
+
+    @classmethod
+    def open(cls, path: str) -> "WordStore":
+        """
+        Memory-maps the word file at path.
+        """
+        with open(path, "rb") as fhand:
+            return cls(mmap.mmap(fhand.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @classmethod
+    def from_word_dict(
+        cls, word_dict: Dict[str, List[str]], digest: bytes = bytes(32)
+    ) -> "WordStore":
+        """
+        Packs the words of word_dict into an in-memory store.
+        """
+        return cls(pack_words(word_dict, digest))
+
+    def __getitem__(self, key: str) -> List[str]:
+        start, stop = self._ranges[key]
+        return self.slice(start, stop)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ranges)
+
+    def __len__(self) -> int:
+        return len(self._ranges)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._ranges
+
+    def bucket_range(self, key: str) -> Tuple[int, int]:
+        """
+        Returns the (start, stop) range of the ids of the words for key.
+        """
+        return self._ranges[key]
+
+    def word(self, word_id: int) -> str:
+        """
+        Returns the word with the given id.
+        """
+        start, stop = self._offsets[word_id], self._offsets[word_id + 1] - 1
+        return str(self._blob[start:stop], "ascii")
+
+    def slice(self, start: int, stop: int) -> List[str]:
+        """
+        Returns the list of words with ids in range(start, stop).
+        """
+        if start >= stop:
+            return []
+        chunk = self._blob[self._offsets[start] : self._offsets[stop] - 1]
+        return str(chunk, "ascii").split("\n")
+
+    def raw_slice(self, start: int, stop: int) -> bytes:
+        """
+        Returns the words with ids in range(start, stop) as they are stored:
+        ASCII, each one followed by a newline.
+        """
+        if start >= stop:
+            return b""
+        return bytes(self._blob[self._offsets[start] : self._offsets[stop]])
+
+
+def load_word_dict(json_path: str) -> WordStore:
+    """
+    Returns the words of words.json at json_path. The compiled word file is
+    memory-mapped if it exists and was compiled from the current content of
+    words.json, otherwise words.json is parsed and packed in memory.
+    """
+    bin_path = compiled_path(json_path)
+    digest = file_digest(json_path)
+    if os.path.exists(bin_path):
+        try:
+            word_store = WordStore.open(bin_path)
+        except (OSError, ValueError, struct.error):
+            word_store = None
+        if word_store is not None and word_store.digest == digest:
+            return word_store
+
+    with open(json_path) as word_file:
+        return WordStore.from_word_dict(json.load(word_file), digest)